@@ -1,13 +1,253 @@
-import copy
+import functools
+import math
+
+from CSPAgent.patterns import (ONLY_A_MINES, ONLY_A_SAFE, ONLY_A_STEP, ONLY_B_MINES, ONLY_B_SAFE, ONLY_B_STEP,
+                               REM_A_STEP, SHARED_MINES, SHARED_SAFE, SHARED_STEP, load_table)
+from Probability.linear import linear_deductions
+from Probability.probability import TallyCache, game_probabilities
+
+# Constraints that can share an unknown cell with a constraint at (0, 0).
+PAIR_OFFSETS = [(dr, dc) for dr in range(-2, 3) for dc in range(-2, 3) if dr or dc]
+# Linear deduction adds the total mine count once at most this many cells are unknown.
+MINE_COUNT_CELLS = 64
+
 
 class Observer:
     def update(self, event_type, data=None):
         pass
 
-class CSPBacktrackingAgent:
+class FrontierIndex:
+    """
+    Constraints of revealed number cells that still border unknown cells.
+    Each constraint says: `remaining[cell]` mines lie among `unknown[cell]`.
+    The index follows the game's trail, so updating it only touches the
+    neighbourhoods of cells that changed since the last sync.
+    """
     def __init__(self, game):
+        self.game = game
+        self.unknown = {}
+        self.remaining = {}
+        self.dirty = set()
+        self.cursor = 0
+        self.patterns = load_table()
+
+    def neighbors(self, r, c):
+        rows, cols = self.game.rows, self.game.cols
+        for nr in range(max(r - 1, 0), min(r + 2, rows)):
+            for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                if nr != r or nc != c:
+                    yield nr, nc
+
+    def sync(self):
+        trail = self.game.trail
+        if self.cursor > len(trail):
+            # The trail was cut back under us; start over from the current state.
+            self.rebuild()
+            return
+        while self.cursor < len(trail):
+            action, cell = trail[self.cursor]
+            self.cursor += 1
+            if action == "reveal":
+                self._on_reveal(cell)
+            elif action == "flag":
+                self._on_flag(cell)
+            else:
+                self._on_unflag(cell)
+
+    def rebuild(self):
+        self.unknown.clear()
+        self.remaining.clear()
+        self.dirty.clear()
+        for cell in self.game.revealed_tiles:
+            self._add_constraint(cell)
+        self.cursor = len(self.game.trail)
+
+    def rewind(self, undone):
+        """Reverts the constraints for trail entries the game has just rolled back."""
+        applied = undone[:max(self.cursor - len(self.game.trail), 0)]
+        for action, cell in reversed(applied):
+            if action == "reveal":
+                self._undo_reveal(cell)
+            elif action == "flag":
+                self._on_unflag(cell)
+            else:
+                self._on_flag(cell)
+        self.cursor = min(self.cursor, len(self.game.trail))
+
+    def _add_constraint(self, cell):
+        value = self.game.grid[cell[0]][cell[1]]
+        if value in ("0", "M"):
+            return
+        unknown = set()
+        flagged = 0
+        for n in self.neighbors(*cell):
+            if n in self.game.flags:
+                flagged += 1
+            elif n not in self.game.revealed_tiles:
+                unknown.add(n)
+            elif self.game.grid[n[0]][n[1]] == "M":
+                flagged += 1
+        if unknown:
+            self.unknown[cell] = unknown
+            self.remaining[cell] = int(value) - flagged
+            self.dirty.add(cell)
+
+    def _drop(self, cell):
+        del self.unknown[cell]
+        del self.remaining[cell]
+        self.dirty.discard(cell)
+
+    def _on_reveal(self, cell):
+        is_mine = self.game.grid[cell[0]][cell[1]] == "M"
+        for n in self.neighbors(*cell):
+            unknown = self.unknown.get(n)
+            if unknown is None or cell not in unknown:
+                continue
+            unknown.discard(cell)
+            if is_mine:
+                self.remaining[n] -= 1
+            if unknown:
+                self.dirty.add(n)
+            else:
+                self._drop(n)
+        if cell not in self.unknown:
+            self._add_constraint(cell)
+
+    def _undo_reveal(self, cell):
+        if cell in self.unknown:
+            self._drop(cell)
+        is_mine = self.game.grid[cell[0]][cell[1]] == "M"
+        for n in self.neighbors(*cell):
+            if n not in self.game.revealed_tiles:
+                continue
+            unknown = self.unknown.get(n)
+            if unknown is None:
+                self._add_constraint(n)
+            elif cell not in unknown:
+                unknown.add(cell)
+                if is_mine:
+                    self.remaining[n] += 1
+                self.dirty.add(n)
+
+    def _on_flag(self, cell):
+        for n in self.neighbors(*cell):
+            unknown = self.unknown.get(n)
+            if unknown is None or cell not in unknown:
+                continue
+            unknown.discard(cell)
+            self.remaining[n] -= 1
+            if unknown:
+                self.dirty.add(n)
+            else:
+                self._drop(n)
+
+    def _on_unflag(self, cell):
+        for n in self.neighbors(*cell):
+            if n not in self.game.revealed_tiles:
+                continue
+            unknown = self.unknown.get(n)
+            if unknown is None:
+                # The constraint was complete; it is open again.
+                self._add_constraint(n)
+            elif cell not in unknown:
+                unknown.add(cell)
+                self.remaining[n] += 1
+                self.dirty.add(n)
+
+    def deduce(self):
+        """
+        Applies the single-cell rules, then looks every overlapping pair of
+        constraints up in the pattern table, for every constraint changed since
+        the last call.
+        """
+        safe, mines = set(), set()
+        dirty, self.dirty = self.dirty, set()
+        for a in dirty:
+            unknown_a = self.unknown.get(a)
+            if unknown_a is None:
+                continue
+            rem_a = self.remaining[a]
+            if rem_a == 0:
+                safe |= unknown_a
+                continue
+            if rem_a == len(unknown_a):
+                mines |= unknown_a
+                continue
+            if not 0 < rem_a < len(unknown_a):
+                # Only wrong flags get here; the table has no entry for it.
+                continue
+            patterns = self.patterns
+            # pattern_index() split into the part fixed by a and the parts that depend on b.
+            base = len(unknown_a) * ONLY_A_STEP + rem_a * REM_A_STEP
+            r, c = a
+            for dr, dc in PAIR_OFFSETS:
+                b = (r + dr, c + dc)
+                unknown_b = self.unknown.get(b)
+                if unknown_b is None:
+                    continue
+                rem_b = self.remaining[b]
+                shared = len(unknown_a & unknown_b)
+                if not shared or not 0 <= rem_b <= len(unknown_b):
+                    continue
+                flags = patterns[base + len(unknown_b) * ONLY_B_STEP + rem_b
+                                 + shared * (SHARED_STEP - ONLY_A_STEP - ONLY_B_STEP)]
+                if flags:
+                    self._apply_pattern(flags, unknown_a, unknown_b, safe, mines)
+        return list(safe), list(mines)
+
+    @staticmethod
+    def _apply_pattern(flags, unknown_a, unknown_b, safe, mines):
+        shared = unknown_a & unknown_b
+        if flags & ONLY_A_SAFE:
+            safe |= unknown_a - shared
+        elif flags & ONLY_A_MINES:
+            mines |= unknown_a - shared
+        if flags & SHARED_SAFE:
+            safe |= shared
+        elif flags & SHARED_MINES:
+            mines |= shared
+        if flags & ONLY_B_SAFE:
+            safe |= unknown_b - shared
+        elif flags & ONLY_B_MINES:
+            mines |= unknown_b - shared
+
+
+@functools.lru_cache(maxsize=4096)
+def number_information(probabilities):
+    """
+    (chance of a 0, entropy in bits) of the number shown by a safe cell whose
+    unknown neighbours are mines with these independent probabilities.  A 0
+    opens the neighbours as well, so callers rank on it first.
+    """
+    distribution = [1.0]
+    for p in probabilities:
+        shifted = [0.0] + [q * p for q in distribution]
+        distribution = [q * (1 - p) for q in distribution] + [0.0]
+        distribution = [a + b for a, b in zip(distribution, shifted)]
+    return distribution[0], -sum(q * math.log2(q) for q in distribution if q > 0)
+
+
+class CSPSolverAgent:
+    """
+    Makes every move the frontier constraints make certain, and guesses by exact
+    mine probability when there is none.  Guesses are never undone.
+    """
+    # Methods Simulation.metrics.instrument() times: (method, phase, counter, what the counter adds per call).
+    METRICS = [
+        ("deduce_safe_cells_and_mines", "deduce", "deductions", lambda result: len(result[0]) + len(result[1])),
+        ("propagate_constraints", "propagate", None, None),
+        ("try_guessing", "guess", "guesses", None),
+        ("notify_observers", "observers", None, None),
+    ]
+    metrics = None
+
+    def __init__(self, game, linear=False):
         self.game = game
         self.observers = []
+        self.frontier = FrontierIndex(game)
+        self.probability_cache = TallyCache()
+        # With linear, the whole frontier is reduced with NumPy when the pair rules find nothing.
+        self.linear = linear
 
     def add_observer(self, observer):
         self.observers.append(observer)
@@ -18,7 +258,21 @@ class CSPBacktrackingAgent:
             obs.update(event_type, data)
 
     def deduce_safe_cells_and_mines(self):
-        return [], []
+        self.frontier.sync()
+        safe_cells, mines = self.frontier.deduce()
+        if self.linear and not (safe_cells or mines):
+            safe_cells, mines = self.linear_deduce()
+        return safe_cells, mines
+
+    def linear_deduce(self):
+        """Certain moves from Gaussian elimination over every frontier constraint (see Probability.linear)."""
+        game = self.game
+        constraints = [(tuple(unknown), self.frontier.remaining[cell])
+                       for cell, unknown in self.frontier.unknown.items()]
+        mine_count = None
+        if game.rows * game.cols - len(game.revealed_tiles) - len(game.flags) <= MINE_COUNT_CELLS:
+            mine_count = (self.get_uncertain_cells(), game.num_mines - len(game.flags))
+        return linear_deductions(constraints, mine_count)
 
     def propagate_constraints(self, safe_cells, mines):
         for r, c in safe_cells:
@@ -38,63 +292,42 @@ class CSPBacktrackingAgent:
         return "failure" if not (safe_cells or mines) or not self.propagate_constraints(safe_cells, mines) else "success"
 
     def try_guessing(self):
+        """
+        Opens the unknown cell least likely to be a mine, judged from the visible
+        board only (see Probability.probability).  Cells tied on risk are broken by
+        the information their number would give.  Returns "failure" if that cell
+        was a mine or no cell is left.
+        """
         candidates = self.get_uncertain_cells()
-        return "failure" if not candidates else self.backtrack_guessing(candidates, 0)
-
-    def backtrack_guessing(self, candidates, index):
-        if index == len(candidates):
-            return "success"
-
-        row, col = candidates[index]
-        saved_state = self.save_state()
-
-        if self.game.flags_remaining > 0:
-            self.game.flag_tile(row, col)
-            self.notify_observers("action_performed", (row,col))
-            if self._process_and_continue(candidates, index):
-                return "success"
-            self.restore_state(saved_state)
-
-        if self.game.grid[row][col] != "M":
-            self.restore_state(saved_state)
-            if self._try_safe_guess(candidates, index, row, col):
-                return "success"
+        if not candidates:
+            return "failure"
+        row, col = self.choose_guess(candidates)
+        result = self.game.reveal_tile(row, col)
+        self.notify_observers("action_performed", (row, col))
+        return "failure" if result == "M" else "success"
 
-        return "failure"
+    def choose_guess(self, candidates):
+        frontier, interior = game_probabilities(self.game, cache=self.probability_cache)
+        lowest = min(frontier.get(cell, interior) for cell in candidates)
+        tied = [cell for cell in candidates if frontier.get(cell, interior) == lowest]
+        if len(tied) == 1:
+            return tied[0]
+        risks = {cell: float(p) for cell, p in frontier.items()}
+        interior = float(interior) if interior is not None else None
+        # max() keeps the first of equally informative cells, so ties stay in row-major order.
+        return max(tied, key=lambda cell: self._information(cell, risks, interior))
 
-    def _process_and_continue(self, candidates, index):
-        safe_cells, mines = self.deduce_safe_cells_and_mines()
-        return self.propagate_constraints(safe_cells, mines) and not self.game.check_loss() and (
-            self.game.check_win() or self.backtrack_guessing(candidates, index + 1) == "success")
-
-    def _try_safe_guess(self, candidates, index, row, col):
-        safe_state = self.save_state()
-        result = self.game.reveal_tile(row, col)
-        if result != "M":
-            self.notify_observers("action_performed", (row,col))
-            if self._process_and_continue(candidates, index):
-                return True
-            self.restore_state(safe_state)
-        else:
-            self.restore_state(safe_state)
-        return False
+    def _information(self, cell, risks, interior):
+        """What opening cell is expected to tell; see number_information()."""
+        game = self.game
+        return number_information(tuple(sorted(
+            risks.get(n, interior) for n in self.frontier.neighbors(*cell)
+            if n not in game.revealed_tiles and n not in game.flags)))
 
     def get_uncertain_cells(self):
-        return [(r, c) for r in range(self.game.grid_size) for c in range(self.game.grid_size)
+        return [(r, c) for r in range(self.game.rows) for c in range(self.game.cols)
                 if (r, c) not in self.game.revealed_tiles and (r, c) not in self.game.flags]
 
-    def save_state(self):
-        return {
-            'revealed_tiles': copy.deepcopy(self.game.revealed_tiles),
-            'flags': copy.deepcopy(self.game.flags),
-            'flags_remaining': self.game.flags_remaining,
-            'game_over': self.game.game_over,
-            'end_time': self.game.end_time
-        }
-
-    def restore_state(self, state):
-        self.game.revealed_tiles = state['revealed_tiles']
-        self.game.flags = state['flags']
-        self.game.flags_remaining = state['flags_remaining']
-        self.game.game_over = state['game_over']
-        self.game.end_time = state['end_time']
\ No newline at end of file
+
+# The agent's name before it stopped backtracking; kept so existing callers still import.
+CSPBacktrackingAgent = CSPSolverAgent
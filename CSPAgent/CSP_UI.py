@@ -2,28 +2,20 @@ import pygame
 import sys
 import time
 import os
-import csv
 import concurrent.futures
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.getcwd()).resolve().parent))
+
 from user import Minesweeper
-from CSP_BACKEND import CSPBacktrackingAgent, Observer
+from CSP_BACKEND import CSPSolverAgent, Observer
+from UserPlay.renderer import BoardRenderer, GlyphCache
+from Simulation.results import ResultStore
+from UserPlay.noguess import BoardCache
 
 pygame.init()
 
-def load_game_id():
-    if not os.path.exists("CSP_STAT.csv"):
-        return 1
-    else:
-        with open("CSP_STAT.csv", "r", newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            if len(rows) < 2:
-                return 1
-            else:
-                last_game_id = int(rows[-1][0])
-                return last_game_id + 1
-
 # Global variables for statistics
-game_id = load_game_id()
 steps_count = 0  # Count solver steps
 
 # Constants
@@ -33,6 +25,11 @@ GRID_SIZE = 6
 NUM_MINES = 12
 TILE_SIZE = SCREEN_WIDTH // GRID_SIZE
 
+# Finished games go to the shared results database; the old CSV history is imported once.
+results = ResultStore()
+if os.path.exists("CSP_STAT.csv"):
+    results.import_csv("CSP_STAT.csv", "csp", GRID_SIZE, GRID_SIZE, NUM_MINES)
+
 BACKGROUND_COLOR = (211, 211, 211)
 LINE_COLOR = (0, 0, 0)
 TEXT_COLOR = (0, 0, 0)
@@ -66,8 +63,18 @@ class UIHandler(Observer):
     def is_delay_active(self):
         return time.time() < self.delay_until
 
-game = Minesweeper(grid_size=GRID_SIZE, num_mines=NUM_MINES)
-csp_agent = CSPBacktrackingAgent(game)
+# Games are dealt from the cache of boards that need no guess (fill it with python -m UserPlay.noguess 6x6x12).
+board_cache = BoardCache()
+
+def new_game():
+    """A no-guess board with its safe first click already opened."""
+    board, first_click = board_cache.take(GRID_SIZE, GRID_SIZE, NUM_MINES)
+    new = Minesweeper(num_mines=NUM_MINES, board=board)
+    new.reveal_tile(*first_click)
+    return new
+
+game = new_game()
+csp_agent = CSPSolverAgent(game)
 ui_handler = UIHandler()
 csp_agent.add_observer(ui_handler)
 
@@ -84,8 +91,22 @@ def draw_button(text, x, y, width, height):
     screen.blit(button_text, (x + 10, y + 10))
     return pygame.Rect(x, y, width, height)
 
+GLYPHS = GlyphCache(FONT, TEXT_COLOR, FLAG_IMAGE, BOMB_IMAGE)
+HEADER_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 100)
+BUTTON_RECT = pygame.Rect(120, SCREEN_HEIGHT - 80, 140, 40)
+last_header = None
+last_highlight = None
+
 def draw_timer_and_flags():
+    global last_header
     elapsed_time = game.get_elapsed_time()
+    header = (elapsed_time, game.flags_remaining, csp_enabled)
+    if header == last_header:
+        return []
+    last_header = header
+
+    screen.set_clip(HEADER_RECT)
+    screen.fill(BACKGROUND_COLOR, HEADER_RECT)
     minutes = elapsed_time // 60
     seconds = elapsed_time % 60
     timer_text = TIMER_FONT.render(f"{minutes:02}:{seconds:02}", True, TEXT_COLOR)
@@ -94,64 +115,54 @@ def draw_timer_and_flags():
     flag_count_text = TIMER_FONT.render(str(game.flags_remaining), True, TEXT_COLOR)
     screen.blit(flag_count_text, (3 * SCREEN_WIDTH // 4 - 30, 30))
     screen.blit(FLAG_IMAGE, (3 * SCREEN_WIDTH // 4, 25))
+    screen.set_clip(None)
 
     csp_status = "ON" if csp_enabled else "OFF"
-    draw_button(f"CSP: {csp_status}", 120, SCREEN_HEIGHT - 80, 100, 40)
-
-def draw_grid():
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE + 100
-            pygame.draw.rect(screen, BACKGROUND_COLOR, (x, y, TILE_SIZE, TILE_SIZE))
-            pygame.draw.rect(screen, LINE_COLOR, (x, y, TILE_SIZE, TILE_SIZE), 1)
-
-def draw_tiles():
-    current_test_cell = ui_handler.get_current_test_cell()
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE + 100
-
-            if current_test_cell == (row, col) and (row, col) not in game.revealed_tiles:
-                pygame.draw.rect(screen, ui_handler.highlight_color, (x, y, TILE_SIZE, TILE_SIZE))
-            else:
-                if (row, col) in game.revealed_tiles:
-                    pygame.draw.rect(screen, (255, 255, 255), (x, y, TILE_SIZE, TILE_SIZE))
-                else:
-                    pygame.draw.rect(screen, BACKGROUND_COLOR, (x, y, TILE_SIZE, TILE_SIZE))
-
-            pygame.draw.rect(screen, LINE_COLOR, (x, y, TILE_SIZE, TILE_SIZE), 1)
-
-            if (row, col) in game.revealed_tiles:
-                tile = game.grid[row][col]
-                if tile.isdigit():
-                    text = FONT.render(tile, True, TEXT_COLOR)
-                    screen.blit(text, (x + TILE_SIZE // 4, y + TILE_SIZE // 4))
-                elif tile == "M":
-                    screen.blit(BOMB_IMAGE, (x + 2, y + 2))
-            elif (row, col) in game.flags:
-                screen.blit(FLAG_IMAGE, (x + 2, y + 2))
+    button_rect = draw_button(f"CSP: {csp_status}", BUTTON_RECT.x, BUTTON_RECT.y, BUTTON_RECT.width, BUTTON_RECT.height)
+    return [HEADER_RECT, button_rect]
+
+def draw_cell(surface, x, y, row, col):
+    if ui_handler.get_current_test_cell() == (row, col) and (row, col) not in game.revealed_tiles:
+        pygame.draw.rect(surface, ui_handler.highlight_color, (x, y, TILE_SIZE, TILE_SIZE))
+    elif (row, col) in game.revealed_tiles:
+        pygame.draw.rect(surface, (255, 255, 255), (x, y, TILE_SIZE, TILE_SIZE))
+    else:
+        pygame.draw.rect(surface, BACKGROUND_COLOR, (x, y, TILE_SIZE, TILE_SIZE))
+
+    pygame.draw.rect(surface, LINE_COLOR, (x, y, TILE_SIZE, TILE_SIZE), 1)
+
+    if (row, col) in game.revealed_tiles:
+        tile = game.grid[row][col]
+        if tile.isdigit():
+            surface.blit(GLYPHS.digit(tile), (x + TILE_SIZE // 4, y + TILE_SIZE // 4))
+        elif tile == "M":
+            surface.blit(GLYPHS.bomb, (x + 2, y + 2))
+    elif (row, col) in game.flags:
+        surface.blit(GLYPHS.flag, (x + 2, y + 2))
+
+renderer = BoardRenderer(screen, game, TILE_SIZE, 100, draw_cell)
+
+def refresh_screen():
+    # Only cells whose state or highlight changed are repainted and pushed to the display
+    global last_highlight
+    highlight = ui_handler.get_current_test_cell()
+    if highlight != last_highlight:
+        renderer.mark_dirty(last_highlight)
+        renderer.mark_dirty(highlight)
+        last_highlight = highlight
+    dirty_rects = renderer.draw() + draw_timer_and_flags()
+    if dirty_rects:
+        pygame.display.update(dirty_rects)
 
 def end_game_popup(win):
-    global game_id, steps_count
+    global steps_count
     result = "You Win!" if win else "Game Over!"
     time_spent = game.get_end_time()
 
     # Determine result as "win" or "lose"
     final_result = "win" if win else "lose"
 
-    # Write stats to "CSP_STAT.csv" with the given info
-    csv_file = "CSP_STAT.csv"
-    file_exists = os.path.exists(csv_file)
-    with open(csv_file, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["GameID", "Result", "Time"])
-        writer.writerow([str(game_id), final_result, str(int(time_spent))])
-
-    # Increment game_id for next game
-    game_id += 1
+    results.add("csp", GRID_SIZE, GRID_SIZE, NUM_MINES, final_result, time_spent, steps_count, source="ui")
 
     popup = pygame.Surface((400, 200))
     popup.fill((50, 50, 50))
@@ -194,21 +205,25 @@ def solver_step():
     return True
 
 def main():
-    global csp_enabled, last_algo_move_time, game_state, game, csp_agent, solver_future
+    global csp_enabled, last_algo_move_time, game_state, game, csp_agent, solver_future, last_header
 
     clock = pygame.time.Clock()
     running = True
+    screen.fill(BACKGROUND_COLOR)
+    pygame.display.flip()
 
     while running:
-        screen.fill(BACKGROUND_COLOR)
-
         if game_state in ["lost", "won"]:
             action = end_game_popup(win=(game_state=="won"))
             if action == "restart":
-                game = Minesweeper(grid_size=GRID_SIZE, num_mines=NUM_MINES)
-                csp_agent = CSPBacktrackingAgent(game)
+                game = new_game()
+                csp_agent = CSPSolverAgent(game)
                 csp_agent.add_observer(ui_handler)
                 game_state = "running"
+                # The popup covered the board: repaint everything for the new game
+                screen.fill(BACKGROUND_COLOR)
+                renderer.reset(game)
+                last_header = None
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -261,18 +276,12 @@ def main():
 
         if game.check_loss():
             game_state = "lost"
-            draw_grid()
             game.end_time = time.time()
         elif game.check_win():
             game_state = "won"
-            draw_grid()
             game.end_time = time.time()
 
-        draw_timer_and_flags()
-        draw_grid()
-        draw_tiles()
-
-        pygame.display.flip()
+        refresh_screen()
         clock.tick(30)
 
     executor.shutdown(wait=False)
@@ -0,0 +1,113 @@
+"""
+Lookup table of what two overlapping number constraints force.
+
+Two revealed numbers a and b that share unknown neighbours split those cells
+into three regions: cells only a sees, cells both see, and cells only b sees.
+Cells in one region are interchangeable, so what the pair forces depends only on
+the region sizes and the mines each number still needs.  Every common local
+pattern (1-1 and 1-2 against a wall, and 1-2-1 and 1-2-2-1 read as
+overlapping pairs) is one entry of this table.  The table is built offline by
+enumerating every case and stored as one byte per case in patterns.bin:
+
+    python -m CSPAgent.patterns
+"""
+import argparse
+import functools
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PATTERN_FILE = Path(__file__).resolve().parent / "patterns.bin"
+MAGIC = b"MSPAIR1\n"
+
+# Largest region sizes and mine counts.  Two distinct cells have at most 4 common neighbours.
+MAX_ONLY = 8
+MAX_SHARED = 4
+MAX_MINES = 8
+
+# Flags of one table entry.
+ONLY_A_SAFE = 1
+ONLY_A_MINES = 2
+SHARED_SAFE = 4
+SHARED_MINES = 8
+ONLY_B_SAFE = 16
+ONLY_B_MINES = 32
+
+# Strides of the table's dimensions (rem_b has stride 1), so callers can add up an index in parts.
+REM_A_STEP = MAX_MINES + 1
+ONLY_B_STEP = REM_A_STEP * (MAX_MINES + 1)
+SHARED_STEP = ONLY_B_STEP * (MAX_ONLY + 1)
+ONLY_A_STEP = SHARED_STEP * (MAX_SHARED + 1)
+
+
+def pattern_index(only_a, shared, only_b, rem_a, rem_b):
+    """Position of a case in the table; sizes and counts must be within the MAX_ bounds."""
+    return only_a * ONLY_A_STEP + shared * SHARED_STEP + only_b * ONLY_B_STEP + rem_a * REM_A_STEP + rem_b
+
+
+def forced(only_a, shared, only_b, rem_a, rem_b):
+    """
+    Flags for the regions every consistent split of the mines leaves empty or
+    full; 0 if nothing is forced or the pair is inconsistent.
+    """
+    splits = [(rem_a - y, y, rem_b - y) for y in range(shared + 1)
+              if 0 <= rem_a - y <= only_a and 0 <= rem_b - y <= only_b]
+    if not splits:
+        return 0
+    flags = 0
+    for region, (size, safe, mines) in enumerate(((only_a, ONLY_A_SAFE, ONLY_A_MINES),
+                                                  (shared, SHARED_SAFE, SHARED_MINES),
+                                                  (only_b, ONLY_B_SAFE, ONLY_B_MINES))):
+        if not size:
+            continue
+        counts = {split[region] for split in splits}
+        if counts == {0}:
+            flags |= safe
+        elif counts == {size}:
+            flags |= mines
+    return flags
+
+
+def build_table():
+    table = bytearray(pattern_index(MAX_ONLY, MAX_SHARED, MAX_ONLY, MAX_MINES, MAX_MINES) + 1)
+    for only_a in range(MAX_ONLY + 1):
+        for shared in range(MAX_SHARED + 1):
+            for only_b in range(MAX_ONLY + 1):
+                for rem_a in range(MAX_MINES + 1):
+                    for rem_b in range(MAX_MINES + 1):
+                        table[pattern_index(only_a, shared, only_b, rem_a, rem_b)] = \
+                            forced(only_a, shared, only_b, rem_a, rem_b)
+    return bytes(table)
+
+
+def save_table(path=PATTERN_FILE):
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(build_table())
+
+
+@functools.lru_cache(maxsize=None)
+def load_table(path=PATTERN_FILE):
+    """The table from path, read once; built in memory if the file is missing or stale."""
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return build_table()
+    table = data[len(MAGIC):]
+    if not data.startswith(MAGIC) or len(table) != pattern_index(MAX_ONLY, MAX_SHARED, MAX_ONLY,
+                                                                 MAX_MINES, MAX_MINES) + 1:
+        return build_table()
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the table of forced moves for pairs of numbers.")
+    parser.add_argument("--out", default=str(PATTERN_FILE))
+    args = parser.parse_args(argv)
+    save_table(args.out)
+    print(f"{args.out}: {Path(args.out).stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
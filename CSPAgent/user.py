@@ -1,8 +1,14 @@
 import random, time
 
+from UserPlay.boardgen import board_dimensions, board_to_grid
+from UserPlay.events import EventStream, batched
+
 class Minesweeper:
-    def __init__(self, grid_size=15, num_mines=25):
-        self.grid_size = grid_size
+    def __init__(self, grid_size=15, num_mines=25, board=None, seed=None, rows=None, cols=None):
+        # rows x cols, both defaulting to grid_size (a pre-generated board sets its own shape).
+        self.rows, self.cols = board_dimensions(grid_size, rows, cols, board)
+        # Only meaningful for square boards; None on rectangular ones.
+        self.grid_size = self.rows if self.rows == self.cols else None
         self.num_mines = num_mines
         self.start_time = None
         self.end_time = None
@@ -10,23 +16,30 @@ class Minesweeper:
         self.flags = set()
         self.flags_remaining = num_mines
         self.game_over = False
-        self.grid = self._generate_grid()
+        # Every reveal (including flood-filled tiles) and flag toggle, in order.
+        self.trail = []
+        # Batched change notifications for UIs and other listeners (see UserPlay.events).
+        self.events = EventStream()
+        # Each game has its own generator, so a seed reproduces the board exactly.
+        self.rng = random.Random(seed)
+        # A pre-generated board (see UserPlay.boardgen) skips random generation.
+        self.grid = board_to_grid(board) if board is not None else self._generate_grid()
 
     def _generate_grid(self):
-        grid = [["0" for _ in range(self.grid_size)] for _ in range(self.grid_size)]
+        grid = [["0" for _ in range(self.cols)] for _ in range(self.rows)]
 
         # Place mines
         mines = set()
         while len(mines) < self.num_mines:
-            r = random.randint(0, self.grid_size-1)
-            c = random.randint(0, self.grid_size-1)
+            r = self.rng.randint(0, self.rows-1)
+            c = self.rng.randint(0, self.cols-1)
             mines.add((r,c))
         for (r,c) in mines:
             grid[r][c] = "M"
 
         # Calculate adjacent mine counts
-        for r in range(self.grid_size):
-            for c in range(self.grid_size):
+        for r in range(self.rows):
+            for c in range(self.cols):
                 if grid[r][c] == "M":
                     continue
                 count = 0
@@ -35,7 +48,7 @@ class Minesweeper:
                         if dr == 0 and dc == 0:
                             continue
                         nr, nc = r+dr, c+dc
-                        if 0<=nr<self.grid_size and 0<=nc<self.grid_size:
+                        if 0<=nr<self.rows and 0<=nc<self.cols:
                             if grid[nr][nc] == "M":
                                 count += 1
                 grid[r][c] = str(count)
@@ -53,6 +66,13 @@ class Minesweeper:
             return self.get_elapsed_time()
         return int(self.end_time - self.start_time)
 
+    def subscribe(self, callback):
+        return self.events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.events.unsubscribe(callback)
+
+    @batched
     def reveal_tile(self, row, col):
         if self.game_over:
             return
@@ -71,6 +91,9 @@ class Minesweeper:
             self.game_over = True
             self.end_time = time.time()
             self.revealed_tiles.add((row,col))
+            self.trail.append(("reveal", (row,col)))
+            self.events.emit("reveal", (row,col), "M")
+            self.events.emit("lose", (row,col), "M")
             return "M"
 
         # Flood fill if '0'
@@ -84,35 +107,70 @@ class Minesweeper:
             if (r,c) in self.revealed_tiles:
                 continue
             self.revealed_tiles.add((r,c))
+            self.trail.append(("reveal", (r,c)))
+            self.events.emit("reveal", (r,c), self.grid[r][c])
             if self.grid[r][c] == "0":
                 for dr in [-1,0,1]:
                     for dc in [-1,0,1]:
                         if dr==0 and dc==0:
                             continue
                         nr, nc = r+dr, c+dc
-                        if 0<=nr<self.grid_size and 0<=nc<self.grid_size:
+                        if 0<=nr<self.rows and 0<=nc<self.cols:
                             if (nr,nc) not in self.revealed_tiles and (nr,nc) not in self.flags:
                                 stack.append((nr,nc))
 
+    @batched
     def flag_tile(self, row, col):
         if self.game_over:
             return
         if (row,col) in self.flags:
             self.flags.remove((row,col))
             self.flags_remaining += 1
+            self.trail.append(("unflag", (row,col)))
+            self.events.emit("unflag", (row,col))
         else:
             if (row,col) not in self.revealed_tiles:
                 self.flags.add((row,col))
                 self.flags_remaining -= 1
+                self.trail.append(("flag", (row,col)))
+                self.events.emit("flag", (row,col))
+
+    def checkpoint(self):
+        """Returns a marker that rollback() can later return the game to."""
+        return len(self.trail), self.game_over, self.end_time
+
+    @batched
+    def rollback(self, mark):
+        """Undoes every trail entry recorded after mark; returns the undone entries in trail order."""
+        length, game_over, end_time = mark
+        undone = self.trail[length:]
+        del self.trail[length:]
+        for action, cell in reversed(undone):
+            if action == "reveal":
+                self.revealed_tiles.discard(cell)
+                self.events.emit("hide", cell)
+            elif action == "flag":
+                self.flags.discard(cell)
+                self.flags_remaining += 1
+                self.events.emit("unflag", cell)
+            else:
+                self.flags.add(cell)
+                self.flags_remaining -= 1
+                self.events.emit("flag", cell)
+        self.game_over = game_over
+        self.end_time = end_time
+        return undone
 
     def check_win(self):
         if self.game_over:
             return False
         # Win if all non-mine tiles are revealed
         revealed_count = len(self.revealed_tiles)
-        total_tiles = self.grid_size * self.grid_size
+        total_tiles = self.rows * self.cols
         mine_count = self.num_mines
         if revealed_count == total_tiles - mine_count:
+            if self.end_time is None:
+                self.events.emit("win")
             self.end_time = time.time()
             return True
         return False
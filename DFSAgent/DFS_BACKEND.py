@@ -1,18 +1,29 @@
 from UserPlay.backend import Minesweeper
+from UserPlay.boardgen import grid_to_board
+import contextlib
+import io
 import time
 
 
 class DFSAgent:
-    def __init__(self, game, update_ui_callback, end_game_callback):
+    # Methods Simulation.metrics.instrument() times: (method, phase, counter, what the counter adds per call).
+    METRICS = [("dfs", "dfs", "searches", None)]
+    metrics = None
+
+    def __init__(self, game, update_ui_callback, end_game_callback, step_delay=0.05):
         """
         Initializes the DFS agent.
         :param game: An instance of the Minesweeper game.
         :param update_ui_callback: Function to update the UI after each move.
+        :param step_delay: Seconds to pause after each move; 0 runs at full speed.
         """
         self.game = game
         self.update_ui_callback = update_ui_callback  # Callback for UI updates
         self.end_game_callback = end_game_callback  # Callback for ending the game
+        self.step_delay = step_delay
         self.visited = set()
+        # Every move the agent made, in order: ("reveal", (row, col)) or ("flag", (row, col)).
+        self.moves = []
 
     def dfs(self, row, col):
         """
@@ -32,14 +43,18 @@ class DFSAgent:
 
             # Reveal tile and notify the UI
             tile_value = self.game.reveal_tile(current_row, current_col)
+            self.moves.append(("reveal", (current_row, current_col)))
             self.update_ui_callback()
-            time.sleep(0.05)  # Delay for visibility
+            if self.step_delay:
+                time.sleep(self.step_delay)  # Delay for visibility
 
             # Flag the tile if it's a mine
             if tile_value == "M":
-                self.game.place_flag(current_row, current_col)
+                self.game.flag_tile(current_row, current_col)
+                self.moves.append(("flag", (current_row, current_col)))
                 self.update_ui_callback()
-                time.sleep(0.0001)  # Delay for visibility
+                if self.step_delay:
+                    time.sleep(0.0001)  # Delay for visibility
 
             # Add neighbors for further exploration if the tile is "0"
             if tile_value == "0":
@@ -49,7 +64,7 @@ class DFSAgent:
                     (1, -1), (1, 0), (1, 1)
                 ]:
                     nr, nc = current_row + dr, current_col + dc
-                    if 0 <= nr < self.game.grid_size and 0 <= nc < self.game.grid_size:
+                    if 0 <= nr < self.game.rows and 0 <= nc < self.game.cols:
                         stack.append((nr, nc))
 
         # Check if the game is won after this move
@@ -63,8 +78,8 @@ class DFSAgent:
         """
         Plays the game using DFS. Starts from the first safe tile found.
         """
-        for row in range(self.game.grid_size):
-            for col in range(self.game.grid_size):
+        for row in range(self.game.rows):
+            for col in range(self.game.cols):
                 if (0, 0) in self.game.mine_positions:
                     success = self.dfs(0, 0)
                     if not success:
@@ -81,6 +96,264 @@ class DFSAgent:
         print("Unable to make further progress. Manual intervention needed.")
 
 
+class FrontierDFSAgent:
+    """
+    DFS agent that decides only from what a player can see: revealed numbers and flags.
+    Revealed cells whose neighbourhood changed are pushed on a stack (through the
+    game's event stream) and expanded depth-first, so each move only costs work
+    around the cells it changed instead of a pass over the whole board.
+    """
+
+    METRICS = [
+        ("expand", "expand", "expansions", None),
+        ("guess", "guess", "guesses", None),
+    ]
+    metrics = None
+
+    def __init__(self, game, update_ui_callback, end_game_callback, step_delay=0.05):
+        self.game = game
+        self.update_ui_callback = update_ui_callback
+        self.end_game_callback = end_game_callback
+        self.step_delay = step_delay
+        self.moves = []
+        # Revealed cells to re-check (each at most once at a time), and revealed
+        # numbers still bordering unknown cells.
+        self.stack = []
+        self.queued = set()
+        self.frontier = set()
+        # Cells before this index (row * cols + col) are known not to be interior cells.
+        self.cursor = 0
+        game.subscribe(self._on_events)
+
+    def _on_events(self, events):
+        for event in events:
+            if event.cell is None:
+                continue
+            if event.kind == "reveal":
+                self._push(event.cell)
+            for n in self.neighbors(*event.cell):
+                self._push(n)
+
+    def _push(self, cell):
+        if cell not in self.queued and cell in self.game.revealed_tiles:
+            self.queued.add(cell)
+            self.stack.append(cell)
+
+    def neighbors(self, row, col):
+        rows, cols = self.game.rows, self.game.cols
+        for nr in range(max(row - 1, 0), min(row + 2, rows)):
+            for nc in range(max(col - 1, 0), min(col + 2, cols)):
+                if nr != row or nc != col:
+                    yield nr, nc
+
+    def _solved(self):
+        return len(self.game.revealed_tiles) == self.game.rows * self.game.cols - self.game.num_mines
+
+    def _reveal(self, row, col):
+        self.game.reveal_tile(row, col)
+        self.moves.append(("reveal", (row, col)))
+        self.update_ui_callback()
+        if self.step_delay:
+            time.sleep(self.step_delay)
+
+    def _flag(self, row, col):
+        self.game.flag_tile(row, col)
+        self.moves.append(("flag", (row, col)))
+        self.update_ui_callback()
+
+    def _look(self, cell):
+        """Returns (unknown neighbours, mines still hidden among them) of a revealed number."""
+        value = self.game.grid[cell[0]][cell[1]]
+        remaining = int(value) if value.isdigit() else 0
+        unknown = []
+        for n in self.neighbors(*cell):
+            if n in self.game.flags:
+                remaining -= 1
+            elif n not in self.game.revealed_tiles:
+                unknown.append(n)
+        return unknown, remaining
+
+    def expand(self, cell):
+        """
+        Opens or flags the neighbours of one revealed number when they are certain,
+        from the number alone or from a nearby number it shares cells with.
+        """
+        unknown, remaining = self._look(cell)
+        if not unknown:
+            self.frontier.discard(cell)
+            return
+        if remaining == 0:
+            safe, mines = unknown, ()
+        elif remaining == len(unknown):
+            safe, mines = (), unknown
+        else:
+            self.frontier.add(cell)
+            safe, mines = self._subset_moves(cell, set(unknown), remaining)
+        for row, col in safe:
+            if self.game.game_over:
+                return
+            if (row, col) not in self.game.revealed_tiles:
+                self._reveal(row, col)
+        for row, col in mines:
+            if (row, col) not in self.game.flags:
+                self._flag(row, col)
+
+    def _subset_moves(self, cell, unknown, remaining):
+        """
+        The subset rule: when one frontier number's unknown cells all border another,
+        the other's extra cells hold the difference of their mines.  Returns (safe, mines)
+        from the first nearby number that settles its extra cells.
+        """
+        row, col = cell
+        for other in ((row + dr, col + dc) for dr in range(-2, 3) for dc in range(-2, 3) if dr or dc):
+            if other not in self.frontier:
+                continue
+            other_unknown, other_remaining = self._look(other)
+            other_unknown = set(other_unknown)
+            if unknown <= other_unknown:
+                extra, mines = other_unknown - unknown, other_remaining - remaining
+            elif other_unknown <= unknown:
+                extra, mines = unknown - other_unknown, remaining - other_remaining
+            else:
+                continue
+            if not extra:
+                continue
+            if mines == 0:
+                return sorted(extra), ()
+            if mines == len(extra):
+                return (), sorted(extra)
+        return (), ()
+
+    def _next_interior(self):
+        """Returns the first unknown cell that borders no revealed cell, or None."""
+        cols = self.game.cols
+        revealed = self.game.revealed_tiles
+        while self.cursor < self.game.rows * cols:
+            cell = divmod(self.cursor, cols)
+            if cell not in revealed and cell not in self.game.flags and \
+                    not any(n in revealed for n in self.neighbors(*cell)):
+                return cell
+            self.cursor += 1
+        return None
+
+    def guess(self):
+        """
+        Picks the cell to open when nothing is certain.  A frontier cell's risk is the
+        highest mine ratio (mines left / unknown cells) of the numbers around it; the
+        least risky one is opened, unless an untouched interior cell is less likely to
+        be a mine.
+        """
+        risks = {}
+        for cell in list(self.frontier):
+            unknown, remaining = self._look(cell)
+            if not unknown:
+                self.frontier.discard(cell)
+                continue
+            ratio = remaining / len(unknown)
+            for n in unknown:
+                if ratio > risks.get(n, -1):
+                    risks[n] = ratio
+        best, best_risk = None, None
+        if risks:
+            # Ties go to the first cell in row-major order, so a board is always played the same way.
+            best = min(risks, key=lambda n: (risks[n], n))
+            best_risk = risks[best]
+        unknown_count = self.game.rows * self.game.cols - len(self.game.revealed_tiles) - len(self.game.flags)
+        density = (self.game.num_mines - len(self.game.flags)) / max(unknown_count, 1)
+        if best is not None and best_risk <= density:
+            return best
+        return self._next_interior() or best
+
+    def play(self):
+        """Plays until the game is won, lost, or no unknown cell is left to try."""
+        for cell in self.game.revealed_tiles:
+            self._push(cell)
+        while not self.game.game_over and not self._solved():
+            if self.stack:
+                cell = self.stack.pop()
+                self.queued.discard(cell)
+                self.expand(cell)
+                continue
+            cell = self.guess()
+            if cell is None:
+                print("Unable to make further progress. Manual intervention needed.")
+                return
+            self._reveal(*cell)
+        if self._solved():
+            print("Congratulations! You've won the game!")
+        else:
+            print("Game Over: Hit a mine!")
+
+
+def record_moves(game, agent_class=DFSAgent):
+    """
+    Lets an agent_class agent solve a private copy of game at full speed and returns its move log.
+    game itself is left untouched; replay the log onto it with MoveReplay.
+    """
+    if game.is_game_over():
+        return []
+    shadow = type(game)(num_mines=game.num_mines, board=grid_to_board(game.grid))
+    # Rebuild the visible state: flood fills reopen exactly the revealed area.
+    for row, col in list(game.revealed_tiles):
+        shadow.reveal_tile(row, col)
+    for row, col in list(game.flags):
+        if (row, col) not in shadow.flags:
+            shadow.flag_tile(row, col)
+    agent = agent_class(shadow, lambda: None, lambda win: None, step_delay=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.play()
+    return agent.moves
+
+
+class MoveReplay:
+    """
+    Applies a recorded move log to a game on the caller's clock, so solving speed
+    and animation speed are independent.  Call advance() once per frame.
+    """
+
+    def __init__(self, game, moves, moves_per_second=20):
+        self.game = game
+        self.moves = moves
+        self.moves_per_second = moves_per_second
+        self.position = 0
+        self.credit = 0.0
+        self.last_time = None
+
+    def done(self):
+        return self.position >= len(self.moves)
+
+    def pause(self):
+        """Stops the clock; the next advance() resumes from here."""
+        self.last_time = None
+
+    def advance(self, now=None):
+        """Applies the moves that are due since the last call; returns how many were applied."""
+        now = time.perf_counter() if now is None else now
+        if self.last_time is None:
+            self.last_time = now
+            self.credit = 1.0
+        self.credit += (now - self.last_time) * self.moves_per_second
+        self.last_time = now
+        due = int(self.credit)
+        self.credit -= due
+        return self.step(due)
+
+    def skip_to_end(self):
+        return self.step(len(self.moves) - self.position)
+
+    def step(self, count):
+        applied = 0
+        while applied < count and not self.done():
+            action, (row, col) = self.moves[self.position]
+            self.position += 1
+            if action == "reveal":
+                self.game.reveal_tile(row, col)
+            else:
+                self.game.flag_tile(row, col)
+            applied += 1
+        return applied
+
+
 if __name__ == "__main__":
     # Example usage
     minesweeper_game = Minesweeper(grid_size=10, num_mines=10)
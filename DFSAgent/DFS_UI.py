@@ -1,15 +1,14 @@
 import os
 import sys
-import time
-import concurrent.futures
 import pygame
-import csv
 from pathlib import Path
 
 sys.path.insert(0, str(Path(os.getcwd()).resolve().parent))
 
 from UserPlay.backend import Minesweeper
-from DFSAgent.DFS_BACKEND import DFSAgent
+from DFSAgent.DFS_BACKEND import FrontierDFSAgent, MoveReplay, record_moves
+from UserPlay.renderer import BoardRenderer, GlyphCache
+from Simulation.results import ResultStore
 
 pygame.init()
 
@@ -18,6 +17,8 @@ SCREEN_HEIGHT = 750  # Extra space for timer, flags, and controls
 GRID_SIZE = 16
 NUM_MINES = 40
 TILE_SIZE = SCREEN_WIDTH // GRID_SIZE
+# How fast the agent's recorded moves are played back; Space skips to the end.
+REPLAY_MOVES_PER_SECOND = 20
 
 BACKGROUND_COLOR = (211, 211, 211)
 LINE_COLOR = (0, 0, 0)
@@ -37,54 +38,24 @@ screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Minesweeper")
 
 
-# Function to load the next game_id from stats.csv
-def load_game_id():
-    if not os.path.exists("stats.csv"):
-        return 1
-    else:
-        with open("stats.csv", "r", newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            if len(rows) < 2:
-                return 1
-            else:
-                last_game_id = int(rows[-1][0])
-                return last_game_id + 1
-
-
-game_id = load_game_id()
+# Finished games go to the shared results database; the old CSV history is imported once.
+results = ResultStore()
+if os.path.exists("stats.csv"):
+    results.import_csv("stats.csv", "dfs", GRID_SIZE, GRID_SIZE, NUM_MINES)
 
 game = Minesweeper(grid_size=GRID_SIZE, num_mines=NUM_MINES)
 
-dfs_agent = DFSAgent(
-    game,
-    lambda: (draw_tiles(), pygame.display.flip()),
-    lambda win: end_game_popup(win)
-)
-
 dfs_enabled = False
-last_dfs_move_time = time.time()
-dfs_future = None  # Replace dfs_thread with dfs_future
+replay = None  # MoveReplay of the agent's moves, created when DFS is switched on
 step_count = 0
 
-original_reveal_tile = game.reveal_tile
-original_flag_tile = game.flag_tile
-
-
-def reveal_tile_patched(row, col):
-    global step_count
-    step_count += 1
-    return original_reveal_tile(row, col)
-
 
-def flag_tile_patched(row, col):
+@game.subscribe
+def count_step(events):
+    """Counts every reveal or flag action that changed the board as one step."""
     global step_count
-    step_count += 1
-    return original_flag_tile(row, col)
-
-
-game.reveal_tile = reveal_tile_patched
-game.flag_tile = flag_tile_patched
+    if any(event.kind != "win" for event in events):
+        step_count += 1
 
 
 def draw_button(text, x, y, width, height):
@@ -94,8 +65,23 @@ def draw_button(text, x, y, width, height):
     return pygame.Rect(x, y, width, height)
 
 
+GLYPHS = GlyphCache(FONT, TEXT_COLOR, FLAG_IMAGE, BOMB_IMAGE)
+HEADER_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 100)
+BUTTON_RECT = pygame.Rect(10, SCREEN_HEIGHT - 50, 190, 40)
+last_header = None
+
+
 def draw_timer_and_flags():
+    """Draws the timer, flag counter and DFS button; returns the areas to update, if they changed."""
+    global last_header
     elapsed_time = game.get_elapsed_time()
+    header = (elapsed_time, game.flags_remaining, dfs_enabled)
+    if header == last_header:
+        return []
+    last_header = header
+
+    screen.set_clip(HEADER_RECT)
+    screen.fill(BACKGROUND_COLOR, HEADER_RECT)
     minutes = elapsed_time // 60
     seconds = elapsed_time % 60
     timer_text = TIMER_FONT.render(f"{minutes:02}:{seconds:02}", True, TEXT_COLOR)
@@ -104,34 +90,36 @@ def draw_timer_and_flags():
     flag_count_text = TIMER_FONT.render(str(game.flags_remaining), True, TEXT_COLOR)
     screen.blit(flag_count_text, (3 * SCREEN_WIDTH // 4 - 30, 30))
     screen.blit(FLAG_IMAGE, (3 * SCREEN_WIDTH // 4, 25))
+    screen.set_clip(None)
     dfs_status = "ON" if dfs_enabled else "OFF"
-    draw_button(f"DFS: {dfs_status}", 10, SCREEN_HEIGHT - 50, 100, 40)
-
-
-def draw_grid():
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE + 100
-            pygame.draw.rect(screen, BACKGROUND_COLOR, (x, y, TILE_SIZE, TILE_SIZE))
-            pygame.draw.rect(screen, LINE_COLOR, (x, y, TILE_SIZE, TILE_SIZE), 1)
-
-
-def draw_tiles():
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE + 100
-            if (row, col) in game.revealed_tiles:
-                pygame.draw.rect(screen, (255, 255, 255), (x, y, TILE_SIZE, TILE_SIZE))
-                tile = game.grid[row][col]
-                if tile.isdigit():
-                    text = FONT.render(tile, True, TEXT_COLOR)
-                    screen.blit(text, (x + TILE_SIZE // 4, y + TILE_SIZE // 4))
-                elif tile == "M":
-                    screen.blit(BOMB_IMAGE, (x + 2, y + 2))
-            elif (row, col) in game.flags:
-                screen.blit(FLAG_IMAGE, (x + 2, y + 2))
+    button_rect = draw_button(f"DFS: {dfs_status}", BUTTON_RECT.x, BUTTON_RECT.y, BUTTON_RECT.width, BUTTON_RECT.height)
+    return [HEADER_RECT, button_rect]
+
+
+def draw_cell(surface, x, y, row, col):
+    """Draws one grid cell in its current state."""
+    if (row, col) in game.revealed_tiles:
+        pygame.draw.rect(surface, (255, 255, 255), (x, y, TILE_SIZE, TILE_SIZE))
+        tile = game.grid[row][col]
+        if tile.isdigit():
+            surface.blit(GLYPHS.digit(tile), (x + TILE_SIZE // 4, y + TILE_SIZE // 4))
+        elif tile == "M":
+            surface.blit(GLYPHS.bomb, (x + 2, y + 2))
+        return
+    pygame.draw.rect(surface, BACKGROUND_COLOR, (x, y, TILE_SIZE, TILE_SIZE))
+    pygame.draw.rect(surface, LINE_COLOR, (x, y, TILE_SIZE, TILE_SIZE), 1)
+    if (row, col) in game.flags:
+        surface.blit(GLYPHS.flag, (x + 2, y + 2))
+
+
+renderer = BoardRenderer(screen, game, TILE_SIZE, 100, draw_cell)
+
+
+def refresh_screen():
+    """Pushes the cells and header areas that changed since the last frame to the display."""
+    dirty_rects = renderer.draw() + draw_timer_and_flags()
+    if dirty_rects:
+        pygame.display.update(dirty_rects)
 
 
 def end_game_popup(win):
@@ -172,35 +160,28 @@ def end_game_popup(win):
 def save_stats_and_exit(result_text, elapsed_time, steps):
     result = "win" if "Win" in result_text else "lose"
 
-    row = [str(game_id), result, str(int(elapsed_time)), str(steps)]
-    file_exists = os.path.exists("stats.csv")
-    with open("stats.csv", "a", newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["GameID", "Result", "Time", "Steps"])
-        writer.writerow(row)
+    # stats.csv came from the old DFSAgent (stored as "dfs"); this UI plays FrontierDFSAgent.
+    results.add("dfs-frontier", GRID_SIZE, GRID_SIZE, NUM_MINES, result, elapsed_time, steps, source="ui")
+    results.close()
 
     pygame.quit()
     sys.exit()
 
 
-def run_dfs():
-    dfs_agent.play()
-
-
-# Use a ThreadPoolExecutor from concurrent.futures instead of threading
-import concurrent.futures
-
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+def start_dfs():
+    """Solves the current position at full speed and starts replaying the agent's moves."""
+    global replay
+    replay = MoveReplay(game, record_moves(game, FrontierDFSAgent), REPLAY_MOVES_PER_SECOND)
 
 
 def main():
-    global dfs_enabled, last_dfs_move_time, dfs_future
+    global dfs_enabled, replay
     clock = pygame.time.Clock()
     running = True
+    screen.fill(BACKGROUND_COLOR)
+    pygame.display.flip()
 
     while running:
-        screen.fill(BACKGROUND_COLOR)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -211,69 +192,54 @@ def main():
                 mouse_x, mouse_y = pygame.mouse.get_pos()
                 if event.button == 1:
                     if 10 <= mouse_x <= 200 and SCREEN_HEIGHT - 50 <= mouse_y <= SCREEN_HEIGHT:
-                        old_state = dfs_enabled
                         dfs_enabled = not dfs_enabled
-                        # If DFS just turned on, start run_dfs if not already running
-                        if dfs_enabled and (dfs_future is None or dfs_future.done()):
-                            dfs_future = executor.submit(run_dfs)
-                        elif not dfs_enabled and old_state:
-                            # DFS disabled, will stop on next sleep call in DFSAgent
-                            pass
+                        if dfs_enabled and (replay is None or replay.done()):
+                            start_dfs()
+                        elif not dfs_enabled:
+                            # Pause the replay; manual moves make the rest of the log stale.
+                            replay.pause()
                     elif not dfs_enabled:
                         col = mouse_x // TILE_SIZE
                         row = (mouse_y - 100) // TILE_SIZE
                         if 0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE:
+                            replay = None
                             tile_state = game.reveal_tile(row, col)
                             if tile_state == "M":
-                                draw_timer_and_flags()
-                                draw_grid()
-                                draw_tiles()
-                                pygame.display.flip()
+                                refresh_screen()
                                 end_game_popup(win=False)
                             elif game.check_win():
-                                draw_timer_and_flags()
-                                draw_grid()
-                                draw_tiles()
-                                pygame.display.flip()
+                                refresh_screen()
                                 end_game_popup(win=True)
                 elif event.button == 3 and not dfs_enabled:
                     col = mouse_x // TILE_SIZE
                     row = (mouse_y - 100) // TILE_SIZE
                     if 0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE:
+                        replay = None
                         game.flag_tile(row, col)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                if dfs_enabled and replay is not None:
+                    replay.skip_to_end()
+
+        if dfs_enabled and replay is not None:
+            replay.advance()
 
         if game.is_game_over():
-            draw_timer_and_flags()
-            draw_grid()
-            draw_tiles()
-            pygame.display.flip()
+            refresh_screen()
             end_game_popup(win=game.check_win())
 
         auto_place_result = game.auto_place_flags()
         if auto_place_result == "win":
-            draw_timer_and_flags()
-            draw_grid()
-            draw_tiles()
-            pygame.display.flip()
+            refresh_screen()
             end_game_popup(win=True)
         elif auto_place_result == "lose":
-            draw_timer_and_flags()
-            draw_grid()
-            draw_tiles()
-            pygame.display.flip()
+            refresh_screen()
             end_game_popup(win=False)
 
         if game.check_win():
-            draw_timer_and_flags()
-            draw_grid()
-            draw_tiles()
-            pygame.display.flip()
+            refresh_screen()
             end_game_popup(win=True)
 
-        draw_timer_and_flags()
-        draw_grid()
-        draw_tiles()
-        pygame.display.flip()
+        refresh_screen()
         clock.tick(30)
 
 
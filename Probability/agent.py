@@ -0,0 +1,74 @@
+"""
+Agent that plays from the exact mine probabilities of Probability.probability.
+"""
+from Probability.probability import TallyCache, game_probabilities
+
+
+class ProbabilityAgent:
+    """
+    Each step flags every cell that is certainly a mine and opens every cell that
+    is certainly safe.  When nothing is certain it opens the cell least likely
+    to be a mine, preferring the frontier on ties.
+    """
+
+    METRICS = [
+        ("step", "step", None, None),
+        ("guess", "guess", "guesses", None),
+    ]
+    metrics = None
+
+    def __init__(self, game, cache=None):
+        self.game = game
+        self.moves = []
+        # Tallies of components a move did not change are reused from here.
+        self.cache = cache if cache is not None else TallyCache()
+
+    def _reveal(self, row, col):
+        self.game.reveal_tile(row, col)
+        self.moves.append(("reveal", (row, col)))
+
+    def _flag(self, row, col):
+        self.game.flag_tile(row, col)
+        self.moves.append(("flag", (row, col)))
+
+    def _interior(self, frontier):
+        """Unknown cells that no revealed number touches, in row order."""
+        game = self.game
+        return [(row, col) for row in range(game.rows) for col in range(game.cols)
+                if (row, col) not in game.revealed_tiles and (row, col) not in game.flags
+                and (row, col) not in frontier]
+
+    def _solved(self):
+        return len(self.game.revealed_tiles) == self.game.rows * self.game.cols - self.game.num_mines
+
+    def step(self):
+        """Makes every certain move, or one guess if there is none."""
+        frontier, interior = game_probabilities(self.game, cache=self.cache)
+        safe = sorted(cell for cell, p in frontier.items() if p == 0)
+        mines = sorted(cell for cell, p in frontier.items() if p == 1)
+        if interior == 0:
+            safe += self._interior(frontier)
+        elif interior == 1:
+            mines += self._interior(frontier)
+        if not safe and not mines:
+            self.guess(frontier, interior)
+            return
+        for row, col in mines:
+            self._flag(row, col)
+        for row, col in safe:
+            if self.game.game_over:
+                return
+            self._reveal(row, col)
+
+    def guess(self, frontier, interior):
+        """Opens the unknown cell with the lowest mine probability."""
+        best = min(frontier.items(), key=lambda item: (item[1], item[0]), default=None)
+        if best is None or (interior is not None and interior < best[1]):
+            self._reveal(*self._interior(frontier)[0])
+        else:
+            self._reveal(*best[0])
+
+    def play(self):
+        """Plays until the game is won or lost."""
+        while not self.game.game_over and not self._solved():
+            self.step()
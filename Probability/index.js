@@ -3,10 +3,13 @@ let numRows;
 let numColumns;
 let numMines;
 let unflaggedMines;
-let hundredCount;
 let mineGrid = [];
-let arrGrid = [];
-let edgeArr = [];
+let probabilityWorker = null;
+let probabilityJob = 0;
+let probabilityPending = false;
+let probabilityShowAll = false;
+let probabilityCells = null;
+let workerUnavailable = false;
 let firstClick;
 let table = document.createElement('table');
 let minesRemaining = document.getElementById('minesRemaining');
@@ -28,11 +31,8 @@ function getVariables() {
     console.log(showNonEdge.checked);
     console.log("mineGrid:");
     console.log(mineGrid);
-    console.log("hundredCount: " + hundredCount);
-    console.log("arrGrid:");
-    console.log(arrGrid);
-    console.log("edgeArr:");
-    console.log(edgeArr);
+    console.log("probabilityJob: " + probabilityJob);
+    console.log("probabilityPending: " + probabilityPending);
 }
 
 // Format seconds for timer
@@ -82,10 +82,8 @@ function generateGrid() {
 
     // Remove Old Table
     resetTimer();
-    hundredCount = 0;
+    cancelProbability();
     mineGrid = [];
-    arrGrid = [];
-    edgeArr = [];
     table.innerHTML = '';
     isWin = false;
     
@@ -113,71 +111,95 @@ function generateGrid() {
     for (let i = 0; i < numRows; i++) {
         mineGrid[i] = [];
         for (let j = 0; j < numColumns; j++) {
-            mineGrid[i][j] = {mine: false, open: false, neighbors: 0, flag: false, edge: false, edgeCount: 0, mineArr: 0, probability: -1};
+            mineGrid[i][j] = {mine: false, open: false, neighbors: 0, flag: false, edge: false, edgeCount: 0, probability: -1};
         }
     }
     makeTable(mineGrid, table);
     body.appendChild(table);
 }
 
-// Run all probablity calculations
-function generateProbability(isAllProbability) {
-    // Reset old probability values
+// Clear probabilities shown on the grid and drop any calculation still running
+function resetProbability() {
+    cancelProbability();
     for (let i = 0; i < mineGrid.length; i++) {
         for (let j = 0; j < mineGrid[i].length; j++) {
-            mineGrid[i][j].mineArr = 0;
             mineGrid[i][j].probability = -1;
         }
     }
-    hundredCount = 0;
-    arrGrid = [];
-    edgeArr = [];
+}
 
-    // Run basic logic rules
+// Stop a stale probability calculation; a fresh worker is started on the next request
+function cancelProbability() {
+    probabilityJob++;
+    if (probabilityPending == true && probabilityWorker != null) {
+        probabilityWorker.terminate();
+        probabilityWorker = null;
+    }
+    probabilityPending = false;
+}
+
+// Run all probablity calculations off the main thread
+function generateProbability(isAllProbability) {
+    resetProbability();
     edgeCount(mineGrid);
-    let ret1 = true;
-    let ret2 = true;
-    while (ret1 == true || ret2 == true) {
-        ret1 = ruleOne(mineGrid);
-        ret2 = ruleTwo(mineGrid);
+    probabilityShowAll = isAllProbability;
+
+    // Send only what the player can see: open numbers, -1 for every other cell
+    let cells = new Int8Array(numRows * numColumns);
+    for (let i = 0; i < numRows; i++) {
+        for (let j = 0; j < numColumns; j++) {
+            cells[i * numColumns + j] = mineGrid[i][j].open == true ? mineGrid[i][j].neighbors : -1;
+        }
     }
-    ruleThree(mineGrid);
 
-    // Calculate arrangements and probabilities
-    let index = findNextEdge(mineGrid, 0, 0);
-    let i = index[0];
-    let j = index[1];
-    while (i > -1) {
-        arrGrid.push({mine: null, r: i, c: j});
-        if (j == numColumns - 1) {
-            index = findNextEdge(mineGrid, i+1, 0);
-            i = index[0];
-            j = index[1];
+    probabilityCells = cells;
+    if (probabilityWorker == null && workerUnavailable == false && typeof Worker !== 'undefined') {
+        try {
+            probabilityWorker = new Worker('probabilityWorker.js');
+            probabilityWorker.onmessage = function(e) {
+                showProbability(e.data.id, e.data.probability);
+            };
+            // Pages opened from file:// may not be allowed to start workers
+            probabilityWorker.onerror = function(e) {
+                e.preventDefault();
+                workerUnavailable = true;
+                probabilityWorker = null;
+                if (probabilityPending == true) {
+                    showProbability(probabilityJob, computeProbability(numRows, numColumns, numMines, probabilityCells));
+                }
+            };
         }
-        else {
-            index = findNextEdge(mineGrid, i, j+1);
-            i = index[0];
-            j = index[1];
+        catch (err) {
+            workerUnavailable = true;
+            probabilityWorker = null;
         }
     }
-    if (arrGrid.length > 0) {
-        generateArrangements(mineGrid, arrGrid, 0);
-        probabilityCalculation(edgeArr, mineGrid, isAllProbability);
+    if (probabilityWorker == null) {
+        showProbability(probabilityJob, computeProbability(numRows, numColumns, numMines, cells));
+        return;
     }
-    else {
-        let nonEdge = nonEdgeCount(mineGrid);
-        let remainingMines = numMines - hundredCount;
-        for (let i = 0; i < mineGrid.length; i++) {
-            for (let j = 0; j < mineGrid[i].length; j++) {
-                if (mineGrid[i][j].open == false && mineGrid[i][j].edge == false) {
-                    mineGrid[i][j].probability = Math.round(remainingMines / nonEdge * 100);
-                }
+    probabilityPending = true;
+    probabilityWorker.postMessage({id: probabilityJob, numRows: numRows, numColumns: numColumns, numMines: numMines, cells: cells});
+}
+
+// Display the result of a probability calculation unless the board changed since it started
+function showProbability(id, probability) {
+    if (id != probabilityJob) {
+        return;
+    }
+    probabilityPending = false;
+    if (probability == null) {
+        alert('The opened cells do not match any arrangement of mines');
+        return;
+    }
+    for (let i = 0; i < numRows; i++) {
+        for (let j = 0; j < numColumns; j++) {
+            let value = probability[i * numColumns + j];
+            if (value >= 0 && (probabilityShowAll == true || value == 0 || value == 100)) {
+                mineGrid[i][j].probability = value;
             }
         }
-
     }
-
-    // Display table
     table.innerHTML = '';
     makeTable(mineGrid, table);
 }
@@ -310,16 +332,7 @@ function revealCell(e) {
                 }
             }
         }
-        // Reset old probability values
-        for (let r = 0; r < mineGrid.length; r++) {
-            for (let c = 0; c < mineGrid[i].length; c++) {
-                mineGrid[r][c].mineArr = 0;
-                mineGrid[r][c].probability = -1;
-            }
-        }
-        hundredCount = 0;
-        arrGrid = [];
-        edgeArr = [];
+        resetProbability();
 
         // Display table
         table.innerHTML = '';
@@ -327,16 +340,7 @@ function revealCell(e) {
         return;
     }
 
-    // Reset old probability values
-    for (let r = 0; r < mineGrid.length; r++) {
-        for (let c = 0; c < mineGrid[i].length; c++) {
-            mineGrid[r][c].mineArr = 0;
-            mineGrid[r][c].probability = -1;
-        }
-    }
-    hundredCount = 0;
-    arrGrid = [];
-    edgeArr = [];
+    resetProbability();
     
     // generateProbability(true);
 
@@ -403,16 +407,7 @@ function revealFlagged() {
                 }
             }
         }
-        // Reset old probability values
-        for (let r = 0; r < mineGrid.length; r++) {
-            for (let c = 0; c < mineGrid[i].length; c++) {
-                mineGrid[r][c].mineArr = 0;
-                mineGrid[r][c].probability = -1;
-            }
-        }
-        hundredCount = 0;
-        arrGrid = [];
-        edgeArr = [];
+        resetProbability();
 
         // Display table
         table.innerHTML = '';
@@ -420,16 +415,7 @@ function revealFlagged() {
         return;
     }
 
-    // Reset old probability values
-    for (let i = 0; i < mineGrid.length; i++) {
-        for (let j = 0; j < mineGrid[i].length; j++) {
-            mineGrid[i][j].mineArr = 0;
-            mineGrid[i][j].probability = -1;
-        }
-    }
-    hundredCount = 0;
-    arrGrid = [];
-    edgeArr = [];
+    resetProbability();
 
     // generateProbability(false);
 
@@ -815,675 +801,4 @@ function edgeCount(mineGrid) {
             mineGrid[i][j].edgeCount = count;
         }
     }
-}
-
-// Count how many cells with zero probability are around a cell
-function probabilityZeroCount(mineGrid, i, j) {
-    let count = 0;
-    // Left
-    if (j > 0) {
-        if (mineGrid[i][j-1].probability == 0) {
-            count++;
-        }
-    }
-    // Upper Left
-    if (i > 0 && j > 0) {
-        if (mineGrid[i-1][j-1].probability == 0) {
-            count++;
-        }
-    }
-    // Up
-    if (i > 0) {
-        if (mineGrid[i-1][j].probability == 0) {
-            count++;
-        }
-    }
-    // Upper Right
-    if (i > 0 && j < (numColumns-1)) {
-        if (mineGrid[i-1][j+1].probability == 0) {
-            count++;
-        }
-    }
-    // Right
-    if (j < (numColumns-1)) {
-        if (mineGrid[i][j+1].probability == 0) {
-            count++;
-        }
-    }
-    // Bottom Right
-    if (i < (numRows-1) && j < (numColumns-1)) {
-        if (mineGrid[i+1][j+1].probability == 0) {
-            count++;
-        }
-    }
-    // Bottom
-    if (i < (numRows-1)) {
-        if (mineGrid[i+1][j].probability == 0) {
-            count++;
-        }
-    }
-    // Bottom Left
-    if (i < (numRows-1) && j > 0) {
-        if (mineGrid[i+1][j-1].probability == 0) {
-            count++;
-        }
-    }
-    return count;
-}
-
-// Label cells that must be a mine by basic logic rules
-function ruleOne(mineGrid) {
-    let ret = false;
-    for (let i = 0; i < mineGrid.length; i++) {
-        for (let j = 0; j < mineGrid[i].length; j++) {
-            if (mineGrid[i][j].edgeCount > 0 && mineGrid[i][j].neighbors == mineGrid[i][j].edgeCount - probabilityZeroCount(mineGrid, i, j)) {
-                // Left
-                if (j > 0) {
-                    if (mineGrid[i][j-1].edge == true && mineGrid[i][j-1].probability < 0) {
-                        mineGrid[i][j-1].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Upper Left
-                if (i > 0 && j > 0) {
-                    if (mineGrid[i-1][j-1].edge == true && mineGrid[i-1][j-1].probability < 0) {
-                        mineGrid[i-1][j-1].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Up
-                if (i > 0) {
-                    if (mineGrid[i-1][j].edge == true && mineGrid[i-1][j].probability < 0) {
-                        mineGrid[i-1][j].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Upper Right
-                if (i > 0 && j < (numColumns-1)) {
-                    if(mineGrid[i-1][j+1].edge == true && mineGrid[i-1][j+1].probability < 0) {
-                        mineGrid[i-1][j+1].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Right
-                if (j < (numColumns-1)) {
-                    if (mineGrid[i][j+1].edge == true && mineGrid[i][j+1].probability < 0) {
-                        mineGrid[i][j+1].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Bottom Right
-                if (i < (numRows-1) && j < (numColumns-1)) {
-                    if (mineGrid[i+1][j+1].edge == true && mineGrid[i+1][j+1].probability < 0) {
-                        mineGrid[i+1][j+1].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Bottom
-                if (i < (numRows-1)) {
-                    if (mineGrid[i+1][j].edge == true && mineGrid[i+1][j].probability < 0) {
-                        mineGrid[i+1][j].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-                // Bottom Left
-                if (i < (numRows-1) && j > 0) {
-                    if (mineGrid[i+1][j-1].edge == true && mineGrid[i+1][j-1].probability < 0) {
-                        mineGrid[i+1][j-1].probability = 100;
-                        hundredCount++;
-                        ret = true;
-                    }
-                }
-            }
-        }
-    }
-    return ret;
-}
-
-// Count how many cells with one hundred probability are around a cell
-function probabilityHundredCount(mineGrid, i, j) {
-    let count = 0;
-    // Left
-    if (j > 0) {
-        if (mineGrid[i][j-1].probability == 100) {
-            count++;
-        }
-    }
-    // Upper Left
-    if (i > 0 && j > 0) {
-        if (mineGrid[i-1][j-1].probability == 100) {
-            count++;
-        }
-    }
-    // Up
-    if (i > 0) {
-        if (mineGrid[i-1][j].probability == 100) {
-            count++;
-        }
-    }
-    // Upper Right
-    if (i > 0 && j < (numColumns-1)) {
-        if (mineGrid[i-1][j+1].probability == 100) {
-            count++;
-        }
-    }
-    // Right
-    if (j < (numColumns-1)) {
-        if (mineGrid[i][j+1].probability == 100) {
-            count++;
-        }
-    }
-    // Bottom Right
-    if (i < (numRows-1) && j < (numColumns-1)) {
-        if (mineGrid[i+1][j+1].probability == 100) {
-            count++;
-        }
-    }
-    // Bottom
-    if (i < (numRows-1)) {
-        if (mineGrid[i+1][j].probability == 100) {
-            count++;
-        }
-    }
-    // Bottom Left
-    if (i < (numRows-1) && j > 0) {
-        if (mineGrid[i+1][j-1].probability == 100) {
-            count++;
-        }
-    }
-    return count;
-}
-
-// Label cells that must not be a mine by basic logic rules
-function ruleTwo(mineGrid) {
-    let ret = false;
-    for (let i = 0; i < mineGrid.length; i++) {
-        for (let j = 0; j < mineGrid[i].length; j++) {
-            if (mineGrid[i][j].edgeCount > 0 && mineGrid[i][j].neighbors == probabilityHundredCount(mineGrid, i, j)) {
-                // Left
-                if (j > 0) {
-                    if (mineGrid[i][j-1].edge == true && mineGrid[i][j-1].probability < 0) {
-                        mineGrid[i][j-1].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Upper Left
-                if (i > 0 && j > 0) {
-                    if (mineGrid[i-1][j-1].edge == true && mineGrid[i-1][j-1].probability < 0) {
-                        mineGrid[i-1][j-1].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Up
-                if (i > 0) {
-                    if (mineGrid[i-1][j].edge == true && mineGrid[i-1][j].probability < 0) {
-                        mineGrid[i-1][j].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Upper Right
-                if (i > 0 && j < (numColumns-1)) {
-                    if(mineGrid[i-1][j+1].edge == true && mineGrid[i-1][j+1].probability < 0) {
-                        mineGrid[i-1][j+1].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Right
-                if (j < (numColumns-1)) {
-                    if (mineGrid[i][j+1].edge == true && mineGrid[i][j+1].probability < 0) {
-                        mineGrid[i][j+1].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Bottom Right
-                if (i < (numRows-1) && j < (numColumns-1)) {
-                    if (mineGrid[i+1][j+1].edge == true && mineGrid[i+1][j+1].probability < 0) {
-                        mineGrid[i+1][j+1].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Bottom
-                if (i < (numRows-1)) {
-                    if (mineGrid[i+1][j].edge == true && mineGrid[i+1][j].probability < 0) {
-                        mineGrid[i+1][j].probability = 0;
-                        ret = true;
-                    }
-                }
-                // Bottom Left
-                if (i < (numRows-1) && j > 0) {
-                    if (mineGrid[i+1][j-1].edge == true && mineGrid[i+1][j-1].probability < 0) {
-                        mineGrid[i+1][j-1].probability = 0;
-                        ret = true;
-                    }
-                }
-            }
-        }
-    }
-    return ret;
-}
-
-// Count how many cells that are open are around a cell
-function openCount(mineGrid, i, j) {
-    let count = 0;
-    // Left
-    if (j > 0) {
-        if (mineGrid[i][j-1].open == true) {
-            count++;
-        }
-    }
-    // Upper Left
-    if (i > 0 && j > 0) {
-        if (mineGrid[i-1][j-1].open == true) {
-            count++;
-        }
-    }
-    // Up
-    if (i > 0) {
-        if (mineGrid[i-1][j].open == true) {
-            count++;
-        }
-    }
-    // Upper Right
-    if (i > 0 && j < (numColumns-1)) {
-        if (mineGrid[i-1][j+1].open == true) {
-            count++;
-        }
-    }
-    // Right
-    if (j < (numColumns-1)) {
-        if (mineGrid[i][j+1].open == true) {
-            count++;
-        }
-    }
-    // Bottom Right
-    if (i < (numRows-1) && j < (numColumns-1)) {
-        if (mineGrid[i+1][j+1].open == true) {
-            count++;
-        }
-    }
-    // Bottom
-    if (i < (numRows-1)) {
-        if (mineGrid[i+1][j].open == true) {
-            count++;
-        }
-    }
-    // Bottom Left
-    if (i < (numRows-1) && j > 0) {
-        if (mineGrid[i+1][j-1].open == true) {
-            count++;
-        }
-    }
-    return count;
-}
-
-// Label isolated cells that have independently determined probabilities
-function ruleThree(mineGrid) {
-    for (let i = 0; i < mineGrid.length; i++) {
-        for (let j = 0; j < mineGrid[i].length; j++) {
-            if (mineGrid[i][j].edgeCount > 2) {
-                let count = 0;
-                // Left
-                if (j > 0) {
-                    if (mineGrid[i][j-1].edge == true && openCount(mineGrid, i, j-1) == 1) {
-                        count++;
-                    }
-                }
-                // Upper Left
-                if (i > 0 && j > 0) {
-                    if (mineGrid[i-1][j-1].edge == true && openCount(mineGrid, i-1, j-1) == 1) {
-                        count++;
-                    }
-                }
-                // Up
-                if (i > 0) {
-                    if (mineGrid[i-1][j].edge == true && openCount(mineGrid, i-1, j) == 1) {
-                        count++;
-                    }
-                }
-                // Upper Right
-                if (i > 0 && j < (numColumns-1)) {
-                    if(mineGrid[i-1][j+1].edge == true && openCount(mineGrid, i-1, j+1) == 1) {
-                        count++;
-                    }
-                }
-                // Right
-                if (j < (numColumns-1)) {
-                    if (mineGrid[i][j+1].edge == true && openCount(mineGrid, i, j+1) == 1) {
-                        count++;
-                    }
-                }
-                // Bottom Right
-                if (i < (numRows-1) && j < (numColumns-1)) {
-                    if (mineGrid[i+1][j+1].edge == true && openCount(mineGrid, i+1, j+1) == 1) {
-                        count++;
-                    }
-                }
-                // Bottom
-                if (i < (numRows-1)) {
-                    if (mineGrid[i+1][j].edge == true && openCount(mineGrid, i+1, j) == 1) {
-                        count++;
-                    }
-                }
-                // Bottom Left
-                if (i < (numRows-1) && j > 0) {
-                    if (mineGrid[i+1][j-1].edge == true && openCount(mineGrid, i+1, j-1) == 1) {
-                        count++;
-                    }
-                }
-                if (count == mineGrid[i][j].edgeCount) {
-                    let probability = Math.round(mineGrid[i][j].neighbors / mineGrid[i][j].edgeCount * 100);
-                    // Left
-                    if (j > 0) {
-                        mineGrid[i][j-1].probability = probability;
-                    }
-                    // Upper Left
-                    if (i > 0 && j > 0) {
-                        mineGrid[i-1][j-1].probability = probability;
-                    }
-                    // Up
-                    if (i > 0) {
-                        mineGrid[i-1][j].probability = probability;
-                    }
-                    // Upper Right
-                    if (i > 0 && j < (numColumns-1)) {
-                        mineGrid[i-1][j+1].probability = probability;
-                    }
-                    // Right
-                    if (j < (numColumns-1)) {
-                        mineGrid[i][j+1].probability = probability;
-                    }
-                    // Bottom Right
-                    if (i < (numRows-1) && j < (numColumns-1)) {
-                        mineGrid[i+1][j+1].probability = probability;
-                    }
-                    // Bottom
-                    if (i < (numRows-1)) {
-                        mineGrid[i+1][j].probability = probability;
-                    }
-                    // Bottom Left
-                    if (i < (numRows-1) && j > 0) {
-                        mineGrid[i+1][j-1].probability = probability;
-                    }
-                }
-            }
-        }
-    }
-}
-
-// Find the next "edge" cell with an assigned logical probability starting from the given index
-function findNextEdge(mineGrid, x, y) {
-    for (let i = x; i < numRows; i++) {
-        for (let j = y; j < numColumns; j++) {
-            if (mineGrid[i][j].edge == true && mineGrid[i][j].probability < 0) {
-                return [i,j];
-            }
-        }
-        y = 0;
-    }
-    return [-1, -1];
-}
-
-// Count how many theoretical mines are placed around a cell when generating arrangements
-function mineCount(grid, i, j) {
-    let count = 0;
-    for (k = 0; k < grid.length; k++) {
-        if (grid[k].r >= i-1 && grid[k].r <= i+1 && grid[k].c >= j-1 && grid[k].c <= j+1) {
-            if (grid[k].mine == true) {
-                count++;
-            }
-        }
-    }
-    return count;
-}
-
-// Determine if a cell can be a mine by looking at open nearby numbers
-function canBeMine(mineGrid, grid, i, j) {
-    // Left
-    if (j > 0) {
-        if (mineGrid[i][j-1].open == true && mineGrid[i][j-1].neighbors <= mineCount(grid, i, j-1) + probabilityHundredCount(mineGrid, i, j-1)) {
-            return false;
-        }
-    }
-    // Upper Left
-    if (i > 0 && j > 0) {
-        if (mineGrid[i-1][j-1].open == true && mineGrid[i-1][j-1].neighbors <= mineCount(grid, i-1, j-1) + probabilityHundredCount(mineGrid, i-1, j-1)) {
-            return false;
-        }
-    }
-    // Up
-    if (i > 0) {
-        if (mineGrid[i-1][j].open == true && mineGrid[i-1][j].neighbors <= mineCount(grid, i-1, j) + probabilityHundredCount(mineGrid, i-1, j)) {
-            return false;
-        }
-    }
-    // Upper Right
-    if (i > 0 && j < (numColumns-1)) {
-        if(mineGrid[i-1][j+1].open == true && mineGrid[i-1][j+1].neighbors <= mineCount(grid, i-1, j+1) + probabilityHundredCount(mineGrid, i-1, j+1)) {
-            return false;
-        }
-    }
-    // Right
-    if (j < (numColumns-1)) {
-        if (mineGrid[i][j+1].open == true && mineGrid[i][j+1].neighbors <= mineCount(grid, i, j+1) + probabilityHundredCount(mineGrid, i, j+1)) {
-            return false;
-        }
-    }
-    // Bottom Right
-    if (i < (numRows-1) && j < (numColumns-1)) {
-        if (mineGrid[i+1][j+1].open == true && mineGrid[i+1][j+1].neighbors <= mineCount(grid, i+1, j+1) + probabilityHundredCount(mineGrid, i+1, j+1)) {
-            return false;
-        }
-    }
-    // Bottom
-    if (i < (numRows-1)) {
-        if (mineGrid[i+1][j].open == true && mineGrid[i+1][j].neighbors <= mineCount(grid, i+1, j) + probabilityHundredCount(mineGrid, i+1, j)) {
-            return false;
-        }
-    }
-    // Bottom Left
-    if (i < (numRows-1) && j > 0) {
-        if (mineGrid[i+1][j-1].open == true && mineGrid[i+1][j-1].neighbors <= mineCount(grid, i+1, j-1) + probabilityHundredCount(mineGrid, i+1, j-1)) {
-            return false;
-        }
-    }
-    return true;
-}
-
-// Count how many theoretical nonmines are placed around a cell when generating arrangements
-function noMineCount(grid, i, j) {
-    let count = 0;
-    for (k = 0; k < grid.length; k++) {
-        if (grid[k].r >= i-1 && grid[k].r <= i+1 && grid[k].c >= j-1 && grid[k].c <= j+1) {
-            if (grid[k].mine == false) {
-                count++;
-            }
-        }
-    }
-    return count;
-}
-
-// Determine if a cell can be not a mine by looking at open nearby numbers
-function canNotBeMine(mineGrid, grid, i, j) {
-    // Left
-    if (j > 0) {
-        if (mineGrid[i][j-1].open == true && mineGrid[i][j-1].neighbors >= mineGrid[i][j-1].edgeCount - noMineCount(grid, i, j-1) - probabilityZeroCount(mineGrid, i, j-1)) {
-            return false;
-        }
-    }
-    // Upper Left
-    if (i > 0 && j > 0) {
-        if (mineGrid[i-1][j-1].open == true && mineGrid[i-1][j-1].neighbors >= mineGrid[i-1][j-1].edgeCount - noMineCount(grid, i-1, j-1) - probabilityZeroCount(mineGrid, i-1, j-1)) {
-            return false;
-        }
-    }
-    // Up
-    if (i > 0) {
-        if (mineGrid[i-1][j].open == true && mineGrid[i-1][j].neighbors >= mineGrid[i-1][j].edgeCount - noMineCount(grid, i-1, j) - probabilityZeroCount(mineGrid, i-1, j)) {
-            return false;
-        }
-    }
-    // Upper Right
-    if (i > 0 && j < (numColumns-1)) {
-        if (mineGrid[i-1][j+1].open == true && mineGrid[i-1][j+1].neighbors >= mineGrid[i-1][j+1].edgeCount - noMineCount(grid, i-1, j+1) - probabilityZeroCount(mineGrid, i-1, j+1)) {
-            return false;
-        }
-    }
-    // Right
-    if (j < (numColumns-1)) {
-        if (mineGrid[i][j+1].open == true && mineGrid[i][j+1].neighbors >= mineGrid[i][j+1].edgeCount - noMineCount(grid, i, j+1) - probabilityZeroCount(mineGrid, i, j+1)) {
-            return false;
-        }
-    }
-    // Bottom Right
-    if (i < (numRows-1) && j < (numColumns-1)) {
-        if (mineGrid[i+1][j+1].open == true && mineGrid[i+1][j+1].neighbors >= mineGrid[i+1][j+1].edgeCount - noMineCount(grid, i+1, j+1) - probabilityZeroCount(mineGrid, i+1, j+1)) {
-            return false;
-        }
-    }
-    // Bottom
-    if (i < (numRows-1)) {
-        if (mineGrid[i+1][j].open == true && mineGrid[i+1][j].neighbors >= mineGrid[i+1][j].edgeCount - noMineCount(grid, i+1, j) - probabilityZeroCount(mineGrid, i+1, j)) {
-            return false;
-        }
-    }
-    // Bottom Left
-    if (i < (numRows-1) && j > 0) {
-        if (mineGrid[i+1][j-1].open == true && mineGrid[i+1][j-1].neighbors >= mineGrid[i+1][j-1].edgeCount - noMineCount(grid, i+1, j-1) - probabilityZeroCount(mineGrid, i+1, j-1)) {
-            return false;
-        }
-    }
-    return true;
-}
-
-// Recursively generate all possible mine arrangements for open edges
-function generateArrangements(mineGrid, grid, index) {
-    let i = grid[index].r;
-    let j = grid[index].c;
-    if (canBeMine(mineGrid, grid, i, j) == true) {
-        let patternYes = JSON.parse(JSON.stringify(grid));
-        patternYes[index].mine = true;
-        if (index < grid.length - 1) {
-            generateArrangements(mineGrid, patternYes, index+1);
-        }
-        else {
-            edgeArr.push(patternYes);
-        }
-    }
-    if (canNotBeMine(mineGrid, grid, i, j) == true) {
-        let patternNo = JSON.parse(JSON.stringify(grid));
-        patternNo[index].mine = false;
-        if (index < grid.length - 1) {
-            generateArrangements(mineGrid, patternNo, index+1);
-        }
-        else {
-            edgeArr.push(patternNo);
-        }
-    }
-}
-
-// Count how many cells are neither open nor bordering open cells
-function nonEdgeCount(mineGrid) {
-    let count = 0;
-    for (i = 0; i < mineGrid.length; i++) {
-        for (j = 0; j < mineGrid[i].length; j++) {
-            if (mineGrid[i][j].open == false && mineGrid[i][j].edge == false) {
-                count++;
-            }
-        }
-    }
-    return count;
-}
-
-// Function used for combinations calculation
-function productRange(a, b) {
-    let prd = a
-    let i = a;
-   
-    while (i++ < b) {
-      prd*=i;
-    }
-    return prd;
-  }
-  
-// Calculate combinations math
-  function combinations(n, r) 
-  {
-    if (n == r || r == 0) 
-    {
-      return 1;
-    } 
-    else 
-    {
-      if (r < n - r) {
-          r = n - r;
-      }
-      return productRange(r + 1, n) / productRange(1, n - r);
-    }
-}
-
-// Calculate probabilities from given mine arrangements
-function probabilityCalculation(edgeArr, mineGrid, allProbability) {
-    // Store where mines are placed in each arrangement and find the total number of arrangements
-    let arrCount = 0;
-    let nonEdge = nonEdgeCount(mineGrid);
-    for (let k = 0; k < edgeArr.length; k++) {
-        let minesPlaced = 0;
-        for (let i = 0; i < edgeArr[k].length; i++) {
-            if (edgeArr[k][i].mine == true) {
-                minesPlaced++;
-            }
-        }
-        let remainingMines = numMines - minesPlaced - hundredCount;
-        if (remainingMines >= 0 && remainingMines <= nonEdge) {
-            let nonEdgeCombinations = combinations(nonEdge, remainingMines);
-            for (let i = 0; i < edgeArr[k].length; i++) {
-                if (edgeArr[k][i].mine == true) {
-                    mineGrid[edgeArr[k][i].r][edgeArr[k][i].c].mineArr += nonEdgeCombinations;
-                }
-            }
-            arrCount += nonEdgeCombinations;
-            for (let i = 0; i < mineGrid.length; i++) {
-                for (let j = 0; j < mineGrid[i].length; j++) {
-                    if (mineGrid[i][j].open == false && mineGrid[i][j].edge == false) {
-                        mineGrid[i][j].mineArr += remainingMines / nonEdge * nonEdgeCombinations
-                    }
-                }
-            }
-        }
-    }
-
-    // Calculate probability of each cell by dividing the number of arrangements with mines in each cell by total arrangements
-    for (i = 0; i < mineGrid.length; i++) {
-        for (j = 0; j < mineGrid[i].length; j++) {
-            if (mineGrid[i][j].edge == true && mineGrid[i][j].probability < 0) {
-                let edgeProbability = Math.round(mineGrid[i][j].mineArr / arrCount * 100);
-                if (allProbability == false && (edgeProbability == 100 || edgeProbability == 0)) {
-                    mineGrid[i][j].probability = edgeProbability;
-                }
-                if (allProbability == true) {
-                    mineGrid[i][j].probability = edgeProbability;
-                }
-            }
-            if (mineGrid[i][j].open == false && mineGrid[i][j].edge == false && mineGrid[i][j].probability < 0) {
-                let nonEdgeProbability = Math.round(mineGrid[i][j].mineArr / arrCount * 100);
-                if (allProbability == false && (nonEdgeProbability == 100 || nonEdgeProbability == 0)) {
-                    mineGrid[i][j].probability = nonEdgeProbability;
-                }
-                if (allProbability == true) {
-                    mineGrid[i][j].probability = nonEdgeProbability;
-                }
-            }
-        }
-    }
-    // console.log("arrCount:");
-    // console.log(arrCount);
-    // console.log("nonEdge:");
-    // console.log(nonEdge);
 }
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Certain moves from the frontier constraints by linear algebra.
+
+Each frontier component becomes a 0/1 matrix (one row per revealed number, one
+column per unknown neighbour) with the mines each number still needs as the
+right-hand side.  The matrix is reduced by fraction-free integer Gaussian
+elimination, and every row, original or reduced, is then read with bounds: a
+row sum(a_j x_j) = b over cells x_j in {0, 1} can only reach its smallest value
+(every negative coefficient a mine, every positive one safe) or its largest
+value in one way.  Known cells are substituted and the pass repeats.  This finds
+what the subset rules find and more, in polynomial time.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for linear deduction.
+    np = None
+
+from Probability.probability import split_components
+
+INT64_LIMIT = (1 << 63) - 1
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("NumPy is required for linear deduction: pip install numpy")
+
+
+def reduce_rows(system):
+    """
+    Row-reduces an integer matrix whose last column is the right-hand side,
+    keeping every entry an integer; returns the non-zero rows.  Entries stay
+    int64 while a step cannot overflow and become Python ints after that.
+    """
+    system = system.copy()
+    rows, columns = system.shape
+    rank = 0
+    for column in range(columns - 1):
+        if rank == rows:
+            break
+        candidates = np.flatnonzero(system[rank:, column])
+        if not candidates.size:
+            continue
+        pivot = rank + candidates[0]
+        system[[rank, pivot]] = system[[pivot, rank]]
+        pivot_row = system[rank]
+        others = system[:, column] != 0
+        others[rank] = False
+        if others.any():
+            # Each new entry is a difference of two products of existing entries.
+            largest = int(np.abs(system).max())
+            if system.dtype != object and 2 * largest * largest > INT64_LIMIT:
+                system = system.astype(object)
+                pivot_row = system[rank]
+            # Scale instead of divide, then divide each row by its gcd to keep entries small.
+            updated = system[others] * pivot_row[column] - np.outer(system[others, column], pivot_row)
+            divisors = np.gcd.reduce(updated, axis=1)
+            divisors[divisors == 0] = 1
+            system[others] = updated // divisors[:, None]
+        rank += 1
+    return system[np.any(system != 0, axis=1)]
+
+
+def forced_cells(system):
+    """
+    Bound reasoning on the rows of system (right-hand side last).  Returns boolean
+    (safe, mine) masks over the columns.
+    """
+    coefficients, target = system[:, :-1], system[:, -1]
+    low = np.where(coefficients < 0, coefficients, 0).sum(axis=1)
+    high = np.where(coefficients > 0, coefficients, 0).sum(axis=1)
+    at_low = (target == low)[:, None]
+    at_high = (target == high)[:, None]
+    positive, negative = coefficients > 0, coefficients < 0
+    safe = np.any((at_low & positive) | (at_high & negative), axis=0)
+    mines = np.any((at_low & negative) | (at_high & positive), axis=0)
+    return safe, mines
+
+
+def component_deductions(constraints):
+    """(safe cells, mine cells) certain from one component's (cells, mines) constraints."""
+    cells = sorted({cell for constraint_cells, _ in constraints for cell in constraint_cells})
+    index = {cell: i for i, cell in enumerate(cells)}
+    system = np.zeros((len(constraints), len(cells) + 1), dtype=np.int64)
+    for row, (constraint_cells, count) in enumerate(constraints):
+        system[row, [index[cell] for cell in constraint_cells]] = 1
+        system[row, -1] = count
+
+    safe, mines = [], []
+    columns = np.arange(len(cells))
+    while columns.size:
+        safe_mask, mine_mask = forced_cells(np.vstack([system, reduce_rows(system)]))
+        known = safe_mask | mine_mask
+        if not known.any():
+            break
+        safe.extend(cells[i] for i in columns[safe_mask])
+        mines.extend(cells[i] for i in columns[mine_mask & ~safe_mask])
+        # Substitute the known cells and drop their columns.
+        system[:, -1] -= system[:, :-1][:, mine_mask & ~safe_mask].sum(axis=1)
+        keep = np.append(~known, True)
+        system = system[:, keep]
+        columns = columns[~known]
+        system = system[np.any(system[:, :-1] != 0, axis=1)]
+    return safe, mines
+
+
+def linear_deductions(constraints, mine_count=None):
+    """
+    Certain safe cells and mines from (cells, mines) constraints, each frontier
+    component reduced on its own.  mine_count is an optional (cells, mines) row
+    for the total mine count over every unknown cell; it joins all components
+    into one system, so it pays off mostly near the end of a game.
+    Returns (safe, mines) as lists of cells.
+    """
+    _require_numpy()
+    if mine_count is not None:
+        constraints = list(constraints) + [(tuple(mine_count[0]), mine_count[1])]
+    safe, mines = [], []
+    for component in split_components([constraint for constraint in constraints if constraint[0]]):
+        component_safe, component_mines = component_deductions(component)
+        safe.extend(component_safe)
+        mines.extend(component_mines)
+    return safe, mines
@@ -0,0 +1,280 @@
+"""
+Exact mine probabilities from the visible state of a Minesweeper game.
+
+Python counterpart of computeProbability in probabilityWorker.js.
+The frontier (unknown cells next to revealed numbers) is split into independent
+components; each component is enumerated on its own and its solutions are
+tallied by mine count.  The tallies are then combined with exact binomials for
+the unconstrained interior cells, so every probability is an exact Fraction.
+Pass a TallyCache to reuse the tallies of components a move did not change.
+"""
+import functools
+from collections import OrderedDict
+from fractions import Fraction
+from math import comb
+
+
+class ComponentTally:
+    """
+    Solutions of one frontier component, grouped by how many mines they use.
+    totals[k] is the number of solutions with k mines; cell_counts[k][i] is how
+    many of those put a mine on cells[i].
+    """
+
+    def __init__(self, cells, totals, cell_counts):
+        self.cells = cells
+        self.totals = totals
+        self.cell_counts = cell_counts
+
+
+def neighbors(row, col, rows, cols):
+    for nr in range(max(row - 1, 0), min(row + 2, rows)):
+        for nc in range(max(col - 1, 0), min(col + 2, cols)):
+            if nr != row or nc != col:
+                yield nr, nc
+
+
+@functools.lru_cache(maxsize=16)
+def neighbor_table(rows, cols):
+    """neighbor_table(rows, cols)[row][col] is the tuple of that cell's neighbours."""
+    return tuple(tuple(tuple(neighbors(row, col, rows, cols)) for col in range(cols)) for row in range(rows))
+
+
+def constraints_from_game(game, trust_flags=True):
+    """
+    Reads the visible state of a backend game (UserPlay or CSPAgent Minesweeper).
+    Returns (constraints, unknown_count, mines_left) where each constraint is
+    (tuple of unknown cells, mines among them).  With trust_flags, flagged cells
+    are taken to be mines; otherwise they are treated as unknown.
+    """
+    rows, cols = game.rows, game.cols
+    table = neighbor_table(rows, cols)
+    revealed = game.revealed_tiles
+    flags = game.flags if trust_flags else ()
+    constraints = []
+    for row, col in revealed:
+        value = game.grid[row][col]
+        if not value.isdigit():
+            continue
+        unknown = []
+        remaining = int(value)
+        for cell in table[row][col]:
+            if cell in revealed:
+                continue
+            if cell in flags:
+                remaining -= 1
+            else:
+                unknown.append(cell)
+        if unknown:
+            constraints.append((tuple(unknown), remaining))
+    flagged_hidden = sum(1 for cell in flags if cell not in revealed)
+    unknown_count = rows * cols - len(revealed) - flagged_hidden
+    return constraints, unknown_count, game.num_mines - flagged_hidden
+
+
+def split_components(constraints):
+    """Groups constraints that (transitively) share cells; returns a list of constraint lists."""
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            other = find(cell)
+            if other != root:
+                parent[other] = root
+
+    groups = {}
+    for constraint in constraints:
+        groups.setdefault(find(constraint[0][0]), []).append(constraint)
+    return list(groups.values())
+
+
+def enumerate_component(constraints):
+    """Counts every mine arrangement satisfying one component's constraints, by mine count."""
+    cells = []
+    index = {}
+    # Order cells constraint by constraint so each constraint closes as early as possible.
+    for constraint_cells, _ in constraints:
+        for cell in constraint_cells:
+            if cell not in index:
+                index[cell] = len(cells)
+                cells.append(cell)
+
+    need = [count for _, count in constraints]
+    open_cells = [len(constraint_cells) for constraint_cells, _ in constraints]
+    watchers = [[] for _ in cells]
+    for c, (constraint_cells, _) in enumerate(constraints):
+        for cell in constraint_cells:
+            watchers[index[cell]].append(c)
+
+    if any(n < 0 or n > o for n, o in zip(need, open_cells)):
+        return ComponentTally(cells, [0], [[0] * len(cells)])
+
+    n = len(cells)
+    totals = [0] * (n + 1)
+    cell_counts = [[0] * n for _ in range(n + 1)]
+    assignment = [0] * n
+
+    def place(i, mines):
+        if i == n:
+            totals[mines] += 1
+            counts = cell_counts[mines]
+            for j in range(n):
+                if assignment[j]:
+                    counts[j] += 1
+            return
+        watching = watchers[i]
+        for value in (0, 1):
+            feasible = True
+            for c in watching:
+                open_cells[c] -= 1
+                need[c] -= value
+                if need[c] < 0 or need[c] > open_cells[c]:
+                    feasible = False
+            if feasible:
+                assignment[i] = value
+                place(i + 1, mines + value)
+            for c in watching:
+                open_cells[c] += 1
+                need[c] += value
+        assignment[i] = 0
+
+    place(0, 0)
+    return ComponentTally(cells, totals, cell_counts)
+
+
+def component_signature(constraints):
+    """
+    Canonical form of one component: its constraints with cells relative to the
+    component's top-left corner, sorted.  Returns (signature, (top, left)).
+    """
+    top = min(row for cells, _ in constraints for row, _ in cells)
+    left = min(col for cells, _ in constraints for _, col in cells)
+    signature = tuple(sorted((tuple(sorted((row - top, col - left) for row, col in cells)), count)
+                             for cells, count in constraints))
+    return signature, (top, left)
+
+
+class TallyCache:
+    """
+    Component tallies by signature, least recently used first.  A move usually
+    changes one component, so the others are found here instead of being
+    enumerated again; a component of the same shape anywhere else on the board
+    (or in another game) is found too.  At most maxsize tallies are kept.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tally(self, constraints):
+        """The ComponentTally of one component's constraints."""
+        signature, (top, left) = component_signature(constraints)
+        tally = self.entries.get(signature)
+        if tally is None:
+            self.misses += 1
+            # Enumerated in the caller's constraint order, which prunes better than the sorted signature.
+            tally = enumerate_component([(tuple((row - top, col - left) for row, col in cells), count)
+                                         for cells, count in constraints])
+            self.entries[signature] = tally
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(signature)
+        return ComponentTally([(row + top, col + left) for row, col in tally.cells], tally.totals,
+                              tally.cell_counts)
+
+    def clear(self):
+        self.entries.clear()
+
+
+def _convolve(a, b):
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                if y:
+                    result[i + j] += x * y
+    return result
+
+
+def combine(tallies, interior_count, mines_left):
+    """
+    Combines component tallies with the interior binomials.
+    Returns (frontier, interior): a dict of exact probabilities for frontier cells
+    and the probability shared by every interior cell (None if there is none).
+    """
+    # Ways to place the mines left over for the interior once the frontier holds f of them.
+    ways_by_frontier_mines = [comb(interior_count, mines_left - f) if 0 <= mines_left - f <= interior_count else 0
+                              for f in range(sum(len(tally.cells) for tally in tallies) + 1)]
+
+    def interior_ways(frontier_mines):
+        return ways_by_frontier_mines[frontier_mines]
+
+    distributions = [tally.totals for tally in tallies]
+    # prefix[j] / suffix[j] = mine-count distribution of components before / after j.
+    prefix = [[1]]
+    for totals in distributions:
+        prefix.append(_convolve(prefix[-1], totals))
+    suffix = [[1]]
+    for totals in reversed(distributions):
+        suffix.append(_convolve(suffix[-1], totals))
+    suffix.reverse()
+
+    everything = prefix[-1]
+    total = sum(ways * interior_ways(f) for f, ways in enumerate(everything))
+    if total == 0:
+        raise ValueError("The visible board has no consistent mine arrangement")
+
+    frontier = {}
+    for j, tally in enumerate(tallies):
+        others = _convolve(prefix[j], suffix[j + 1])
+        # weight_k = arrangements of every other cell when this component holds k mines.
+        for k, counts in enumerate(tally.cell_counts):
+            if not tally.totals[k]:
+                continue
+            weight_k = sum(ways * interior_ways(k + f) for f, ways in enumerate(others))
+            if not weight_k:
+                continue
+            for cell, count in zip(tally.cells, counts):
+                frontier[cell] = frontier.get(cell, 0) + count * weight_k
+    frontier = {cell: Fraction(frontier.get(cell, 0), total)
+                for tally in tallies for cell in tally.cells}
+
+    interior = None
+    if interior_count:
+        interior_mines = sum(ways * interior_ways(f) * (mines_left - f)
+                             for f, ways in enumerate(everything))
+        interior = Fraction(interior_mines, total * interior_count)
+    return frontier, interior
+
+
+def mine_probabilities(constraints, unknown_count, mines_left, cache=None):
+    """
+    Exact mine probability of every unknown cell.
+    Returns (frontier, interior) as described in combine().  With a TallyCache,
+    only components missing from it are enumerated.
+    """
+    components = split_components(constraints)
+    if cache is not None:
+        tallies = [cache.tally(component) for component in components]
+    else:
+        tallies = [enumerate_component(component) for component in components]
+    frontier_size = sum(len(tally.cells) for tally in tallies)
+    return combine(tallies, unknown_count - frontier_size, mines_left)
+
+
+def game_probabilities(game, trust_flags=True, cache=None):
+    """Exact mine probabilities for the visible state of game; see mine_probabilities()."""
+    return mine_probabilities(*constraints_from_game(game, trust_flags), cache=cache)
@@ -0,0 +1,284 @@
+// Exact mine probabilities, computed in a Web Worker so the page stays responsive.
+// index.html also loads this file directly so the page can fall back to computing
+// on the main thread when workers are unavailable (e.g. when opened from file://).
+
+// Calculate combinations math exactly
+function bigCombinations(n, r) {
+    if (r < 0 || r > n) {
+        return 0n;
+    }
+    if (r > n - r) {
+        r = n - r;
+    }
+    let result = 1n;
+    for (let k = 1; k <= r; k++) {
+        result = result * BigInt(n - r + k) / BigInt(k);
+    }
+    return result;
+}
+
+// Multiply two mine-count distributions
+function convolve(a, b) {
+    let result = new Array(a.length + b.length - 1).fill(0n);
+    for (let i = 0; i < a.length; i++) {
+        if (a[i] == 0n) {
+            continue;
+        }
+        for (let j = 0; j < b.length; j++) {
+            result[i + j] += a[i] * b[j];
+        }
+    }
+    return result;
+}
+
+// Build one constraint per open number that borders unopened cells
+function buildConstraints(numRows, numColumns, cells) {
+    let constraints = [];
+    for (let i = 0; i < numRows; i++) {
+        for (let j = 0; j < numColumns; j++) {
+            let count = cells[i * numColumns + j];
+            if (count < 0) {
+                continue;
+            }
+            let unknown = [];
+            for (let r = Math.max(i - 1, 0); r <= Math.min(i + 1, numRows - 1); r++) {
+                for (let c = Math.max(j - 1, 0); c <= Math.min(j + 1, numColumns - 1); c++) {
+                    if (cells[r * numColumns + c] < 0) {
+                        unknown.push(r * numColumns + c);
+                    }
+                }
+            }
+            if (unknown.length > 0) {
+                constraints.push({cells: unknown, count: count});
+            }
+        }
+    }
+    return constraints;
+}
+
+// Split constraints into groups that share no cells
+function splitGroups(constraints) {
+    let parent = new Map();
+    function find(x) {
+        while (parent.get(x) != x) {
+            parent.set(x, parent.get(parent.get(x)));
+            x = parent.get(x);
+        }
+        return x;
+    }
+    for (let constraint of constraints) {
+        for (let cell of constraint.cells) {
+            if (!parent.has(cell)) {
+                parent.set(cell, cell);
+            }
+        }
+        let root = find(constraint.cells[0]);
+        for (let cell of constraint.cells) {
+            let other = find(cell);
+            if (other != root) {
+                parent.set(other, root);
+            }
+        }
+    }
+    let groups = new Map();
+    for (let constraint of constraints) {
+        let root = find(constraint.cells[0]);
+        if (!groups.has(root)) {
+            groups.set(root, []);
+        }
+        groups.get(root).push(constraint);
+    }
+    return Array.from(groups.values());
+}
+
+// Count the arrangements of one group by number of mines, without storing them
+function countGroup(constraints) {
+    let cells = [];
+    let index = new Map();
+    for (let constraint of constraints) {
+        for (let cell of constraint.cells) {
+            if (!index.has(cell)) {
+                index.set(cell, cells.length);
+                cells.push(cell);
+            }
+        }
+    }
+    let n = cells.length;
+    let need = constraints.map(constraint => constraint.count);
+    let open = constraints.map(constraint => constraint.cells.length);
+    let watchers = cells.map(() => []);
+    constraints.forEach((constraint, k) => {
+        for (let cell of constraint.cells) {
+            watchers[index.get(cell)].push(k);
+        }
+    });
+    let totals = new Array(n + 1).fill(0);
+    let cellCounts = [];
+    for (let k = 0; k <= n; k++) {
+        cellCounts.push(new Float64Array(n));
+    }
+    if (need.some((count, k) => count < 0 || count > open[k])) {
+        return {cells: cells, totals: [0], cellCounts: [new Float64Array(n)]};
+    }
+    let assignment = new Uint8Array(n);
+
+    function place(i, mines) {
+        if (i == n) {
+            totals[mines]++;
+            let counts = cellCounts[mines];
+            for (let j = 0; j < n; j++) {
+                counts[j] += assignment[j];
+            }
+            return;
+        }
+        let watching = watchers[i];
+        for (let value = 0; value <= 1; value++) {
+            let feasible = true;
+            for (let k of watching) {
+                open[k]--;
+                need[k] -= value;
+                if (need[k] < 0 || need[k] > open[k]) {
+                    feasible = false;
+                }
+            }
+            if (feasible) {
+                assignment[i] = value;
+                place(i + 1, mines + value);
+            }
+            for (let k of watching) {
+                open[k]++;
+                need[k] += value;
+            }
+        }
+        assignment[i] = 0;
+    }
+    place(0, 0);
+    return {cells: cells, totals: totals, cellCounts: cellCounts};
+}
+
+// Group counts by the shape of their constraints, least recently used first.
+// A click usually changes one group, so the others are found here instead of
+// being counted again.
+const GROUP_CACHE_LIMIT = 1024;
+let groupCache = new Map();
+
+// countGroup through groupCache. Cells are keyed relative to the group's top-left
+// corner, so the same shape anywhere on the board shares one entry.
+function countGroupCached(constraints, numColumns) {
+    let top = Infinity;
+    let left = Infinity;
+    for (let constraint of constraints) {
+        for (let cell of constraint.cells) {
+            top = Math.min(top, Math.floor(cell / numColumns));
+            left = Math.min(left, cell % numColumns);
+        }
+    }
+    let offset = top * numColumns + left;
+    let relative = constraints.map(constraint => ({
+        cells: constraint.cells.map(cell => cell - offset),
+        count: constraint.count
+    }));
+    let key = numColumns + ':' + relative
+        .map(constraint => constraint.cells.slice().sort((a, b) => a - b).join(',') + '=' + constraint.count)
+        .sort()
+        .join(';');
+    let group = groupCache.get(key);
+    if (group === undefined) {
+        // Counted in the caller's constraint order, which prunes better than the sorted key.
+        group = countGroup(relative);
+        if (groupCache.size >= GROUP_CACHE_LIMIT) {
+            groupCache.delete(groupCache.keys().next().value);
+        }
+    } else {
+        groupCache.delete(key);
+    }
+    groupCache.set(key, group);
+    return {cells: group.cells.map(cell => cell + offset), totals: group.totals, cellCounts: group.cellCounts};
+}
+
+// Combine group counts with the arrangements of the unbordered cells.
+// Returns a percentage per cell, or -1 for open cells.
+function combineGroups(groups, numMines, unknownCount, cellTotal) {
+    let interiorCount = unknownCount - groups.reduce((sum, group) => sum + group.cells.length, 0);
+    function interiorWays(frontierMines) {
+        return bigCombinations(interiorCount, numMines - frontierMines);
+    }
+    let distributions = groups.map(group => group.totals.map(BigInt));
+    let prefix = [[1n]];
+    for (let totals of distributions) {
+        prefix.push(convolve(prefix[prefix.length - 1], totals));
+    }
+    let suffix = [[1n]];
+    for (let k = distributions.length - 1; k >= 0; k--) {
+        suffix.unshift(convolve(distributions[k], suffix[0]));
+    }
+    let everything = prefix[prefix.length - 1];
+    let total = 0n;
+    let interiorMines = 0n;
+    everything.forEach((ways, f) => {
+        let weight = ways * interiorWays(f);
+        total += weight;
+        interiorMines += weight * BigInt(Math.max(numMines - f, 0));
+    });
+    if (total == 0n) {
+        return null;
+    }
+
+    let probability = new Int16Array(cellTotal).fill(-1);
+    if (interiorCount > 0) {
+        let interior = Math.round(Number(interiorMines * 10000n / (total * BigInt(interiorCount))) / 100);
+        probability.fill(interior);
+    }
+    groups.forEach((group, g) => {
+        let others = convolve(prefix[g], suffix[g + 1]);
+        let mineWeight = new Array(group.cells.length).fill(0n);
+        group.cellCounts.forEach((counts, k) => {
+            if (group.totals[k] == 0) {
+                return;
+            }
+            let weight = 0n;
+            others.forEach((ways, f) => {
+                weight += ways * interiorWays(k + f);
+            });
+            for (let j = 0; j < group.cells.length; j++) {
+                if (counts[j] > 0) {
+                    mineWeight[j] += BigInt(counts[j]) * weight;
+                }
+            }
+        });
+        group.cells.forEach((cell, j) => {
+            probability[cell] = Math.round(Number(mineWeight[j] * 10000n / total) / 100);
+        });
+    });
+    return probability;
+}
+
+// Compute the probability of every unopened cell from the visible board.
+// cells[i * numColumns + j] is the number shown on an open cell or -1 for any other cell.
+function computeProbability(numRows, numColumns, numMines, cells) {
+    let unknownCount = 0;
+    for (let k = 0; k < cells.length; k++) {
+        if (cells[k] < 0) {
+            unknownCount++;
+        }
+    }
+    let groups = splitGroups(buildConstraints(numRows, numColumns, cells))
+        .map(group => countGroupCached(group, numColumns));
+    let probability = combineGroups(groups, numMines, unknownCount, cells.length);
+    if (probability != null) {
+        for (let k = 0; k < cells.length; k++) {
+            if (cells[k] >= 0) {
+                probability[k] = -1;
+            }
+        }
+    }
+    return probability;
+}
+
+if (typeof window === 'undefined') {
+    self.onmessage = function(e) {
+        let data = e.data;
+        let probability = computeProbability(data.numRows, data.numColumns, data.numMines, data.cells);
+        self.postMessage({id: data.id, probability: probability});
+    };
+}
@@ -0,0 +1,288 @@
+"""
+Benchmarks for the game backends' hot paths and the agents' solve rate.
+
+Every case runs with fixed seeds for each board size and records per-operation
+latency percentiles; solve cases also record games/second and win rate.
+Results are written as JSON so runs can be compared over time:
+
+    python -m Simulation.benchmark --out before.json
+    python -m Simulation.benchmark --out after.json --baseline before.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from UserPlay.backend import Minesweeper
+from UserPlay.bitboard import BitboardMinesweeper
+from CSPAgent.user import Minesweeper as CSPMinesweeper
+from Simulation.runner import AGENTS
+
+BACKENDS = {
+    "set": Minesweeper,
+    "bitboard": BitboardMinesweeper,
+    "csp": CSPMinesweeper,
+}
+
+SIZES = [9, 16, 30, 100, 300, 1000]
+
+# Largest board each agent is asked to solve.  At 300x300 a game takes a few seconds for every agent;
+# dfs-bitboard stops earlier because DFSAgent scans the whole board for every cell it opens.
+SOLVE_MAX_SIZE = {"dfs": 300, "dfs-bitboard": 100, "dfs-frontier": 300, "dfs-chunked": 300, "csp": 300,
+                  "csp-linear": 300}
+
+
+def dense_mines(size):
+    return max(1, size * size * 2 // 10)
+
+
+def sparse_mines(size):
+    return max(1, size * size // 100)
+
+
+def cell_rng(seed):
+    """Generator for picking cells; seeded apart from the game's own random.Random(seed)."""
+    return random.Random(f"cells-{seed}")
+
+
+def random_cell(game, rng, accept):
+    """Draws random cells until accept(row, col) holds; gives up (None) after a bounded number of tries."""
+    for _ in range(1000):
+        row, col = rng.randrange(game.rows), rng.randrange(game.cols)
+        if accept(row, col):
+            return row, col
+    return None
+
+
+def hidden_safe(game):
+    return lambda row, col: (row, col) not in game.revealed_tiles and game.grid[row][col] != "M"
+
+
+def open_some(game, rng, count):
+    """Reveals count random safe cells (untimed) to get the game into a mid-game state."""
+    for _ in range(count):
+        cell = random_cell(game, rng, hidden_safe(game))
+        if cell is None:
+            return
+        game.reveal_tile(*cell)
+
+
+def timed(action, *args):
+    start = time.perf_counter_ns()
+    action(*args)
+    return time.perf_counter_ns() - start
+
+
+# Each case is a generator that plays one seeded game and yields one latency (ns) per timed operation.
+
+def case_construct(cls, size, seed):
+    yield timed(lambda: cls(grid_size=size, num_mines=dense_mines(size), seed=seed))
+
+
+def case_reveal_open(cls, size, seed):
+    """One reveal on a sparse board, which flood-fills most of it."""
+    game = cls(grid_size=size, num_mines=sparse_mines(size), seed=seed)
+    cell = random_cell(game, cell_rng(seed), lambda r, c: game.grid[r][c] in (" ", "0"))
+    if cell is not None:
+        yield timed(game.reveal_tile, *cell)
+
+
+def case_reveal_dense(cls, size, seed):
+    """Reveals of random safe cells on a board with 20% mines."""
+    game = cls(grid_size=size, num_mines=dense_mines(size), seed=seed)
+    rng = cell_rng(seed)
+    for _ in range(50):
+        cell = random_cell(game, rng, hidden_safe(game))
+        if cell is None:
+            return
+        yield timed(game.reveal_tile, *cell)
+
+
+def case_number_click(cls, size, seed):
+    """handle_number_click on a revealed number whose mines are all flagged."""
+    game = cls(grid_size=size, num_mines=dense_mines(size), seed=seed)
+    rng = cell_rng(seed)
+    for _ in range(20):
+        cell = random_cell(game, rng, lambda r, c: hidden_safe(game)(r, c) and game.grid[r][c].isdigit()
+                           and game.grid[r][c] != "0")
+        if cell is None or game.game_over:
+            return
+        game.reveal_tile(*cell)
+        row, col = cell
+        for nr in range(max(row - 1, 0), min(row + 2, size)):
+            for nc in range(max(col - 1, 0), min(col + 2, size)):
+                if game.grid[nr][nc] == "M" and (nr, nc) not in game.flags:
+                    game.flag_tile(nr, nc)
+        yield timed(game.handle_number_click, row, col)
+
+
+def case_check_win(cls, size, seed):
+    game = cls(grid_size=size, num_mines=dense_mines(size), seed=seed)
+    open_some(game, cell_rng(seed), 20)
+    for _ in range(50):
+        yield timed(game.check_win)
+
+
+def case_auto_place_flags(cls, size, seed):
+    game = cls(grid_size=size, num_mines=dense_mines(size), seed=seed)
+    open_some(game, cell_rng(seed), 20)
+    for _ in range(20):
+        yield timed(game.auto_place_flags)
+
+
+BACKEND_CASES = {
+    "construct": (case_construct, ["set", "bitboard", "csp"]),
+    "reveal_open": (case_reveal_open, ["set", "bitboard", "csp"]),
+    "reveal_dense": (case_reveal_dense, ["set", "bitboard", "csp"]),
+    "number_click": (case_number_click, ["set", "bitboard"]),
+    "check_win": (case_check_win, ["set", "bitboard", "csp"]),
+    "auto_place_flags": (case_auto_place_flags, ["set", "bitboard"]),
+}
+
+
+def percentile(sorted_samples, fraction):
+    index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "ops": len(samples),
+        "mean_us": round(total / len(samples) / 1000, 3),
+        "p50_us": round(percentile(samples, 0.50) / 1000, 3),
+        "p90_us": round(percentile(samples, 0.90) / 1000, 3),
+        "p99_us": round(percentile(samples, 0.99) / 1000, 3),
+        "max_us": round(samples[-1] / 1000, 3),
+        "ops_per_s": round(len(samples) * 1e9 / total, 1) if total else None,
+    }
+
+
+def collect(play, seed, budget, min_games, max_samples):
+    """Plays seeded games (seed, seed + 1, ...) until the time budget and the minimum game count are both met."""
+    samples = []
+    deadline = time.perf_counter() + budget
+    games = 0
+    while games < min_games or (time.perf_counter() < deadline and len(samples) < max_samples):
+        samples.extend(play(seed + games))
+        games += 1
+    return samples, games
+
+
+def bench_backend(case, backend, size, seed, budget, min_games, max_samples):
+    make_case = BACKEND_CASES[case][0]
+    cls = BACKENDS[backend]
+    mines = sparse_mines(size) if case == "reveal_open" else dense_mines(size)
+    record = {"case": case, "backend": backend, "size": size, "mines": mines}
+    samples, games = collect(lambda s: list(make_case(cls, size, s)), seed, budget, min_games, max_samples)
+    record["games"] = games
+    if samples:
+        record.update(summarize(samples))
+    return record
+
+
+def bench_solve(agent, size, seed, budget, min_games, timeout):
+    play = AGENTS[agent]
+    mines = max(1, size * size * 15 // 100)
+    record = {"case": "solve", "agent": agent, "size": size, "mines": mines}
+    results = []
+
+    def play_one(game_seed):
+        start = time.perf_counter_ns()
+        result, _ = play(game_seed, size, size, mines, timeout)
+        results.append(result)
+        return [time.perf_counter_ns() - start]
+
+    samples, games = collect(play_one, seed, budget, min_games, 10 ** 9)
+    record.update(summarize(samples))
+    record["games"] = games
+    record["games_per_s"] = record.pop("ops_per_s")
+    record["win_rate"] = round(results.count("win") / games, 4)
+    return record
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def result_key(record):
+    return record["case"], record.get("backend") or record.get("agent"), record["size"]
+
+
+def print_record(record, baseline):
+    name = f'{record["case"]:<17}{record.get("backend") or record.get("agent"):<13}{record["size"]:>5}'
+    if "p50_us" not in record:
+        print(f"{name}  no samples")
+        return
+    line = f'{name}  p50 {record["p50_us"]:>12.1f}us  p99 {record["p99_us"]:>12.1f}us  n={record["ops"]}'
+    if "games_per_s" in record:
+        line += f'  {record["games_per_s"]:.1f} games/s  win {record["win_rate"]:.1%}'
+    old = baseline.get(result_key(record))
+    if old and old.get("p50_us"):
+        line += f'  ({old["p50_us"] / record["p50_us"]:.2f}x vs baseline)'
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark backend operations and agent solve rate.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--cases", nargs="+", choices=sorted(BACKEND_CASES) + ["solve"],
+                        default=list(BACKEND_CASES) + ["solve"])
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(BACKENDS))
+    # csp-linear is only in AGENTS when NumPy is installed.
+    parser.add_argument("--agents", nargs="+", choices=sorted(AGENTS),
+                        default=sorted(agent for agent in SOLVE_MAX_SIZE if agent in AGENTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds spent per case, backend and size.")
+    parser.add_argument("--min-games", type=int, default=3)
+    parser.add_argument("--max-samples", type=int, default=2000)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-game time budget for solve cases.")
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--baseline", help="Earlier JSON output to compare p50 latencies against.")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {result_key(record): record for record in json.load(f)["results"]}
+
+    results = []
+    for size in args.sizes:
+        for case in args.cases:
+            if case == "solve":
+                runs = [bench_solve(agent, size, args.seed, args.budget, args.min_games, args.timeout)
+                        for agent in args.agents if size <= SOLVE_MAX_SIZE.get(agent, max(SIZES))]
+            else:
+                runs = [bench_backend(case, backend, size, args.seed, args.budget, args.min_games, args.max_samples)
+                        for backend in args.backends if backend in BACKEND_CASES[case][1]]
+            for record in runs:
+                print_record(record, baseline)
+                results.append(record)
+
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(results)} results -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
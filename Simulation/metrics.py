@@ -0,0 +1,139 @@
+"""
+Opt-in instrumentation for the agents.
+
+instrument(agent) wraps the methods listed in the agent class's METRICS on that
+one instance, timing each phase and counting calls, and subscribes to the
+game's event stream to count reveals and flags.  Agents that were never
+instrumented run their plain methods, so switching metrics off costs nothing.
+
+    metrics = instrument(agent, labels={"agent": "csp"})
+    ...play...
+    print(metrics.to_json_line())
+    print(metrics.to_prometheus())
+"""
+import json
+import time
+
+# Game event kinds (see UserPlay.events) and the counter each one increments.
+EVENT_COUNTERS = {"reveal": "reveals", "flag": "flags", "unflag": "unflags", "hide": "undone_reveals"}
+
+
+class PhaseStats:
+    __slots__ = ("calls", "seconds", "depth")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        # Calls of the phase currently running, so recursive calls are timed once.
+        self.depth = 0
+
+
+class AgentMetrics:
+    """Counters and per-phase timers for one or more instrumented agents."""
+
+    def __init__(self, labels=None):
+        self.labels = dict(labels or {})
+        self.counters = {}
+        self.phases = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def phase(self, name):
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        return stats
+
+    def to_dict(self):
+        return {
+            "labels": self.labels,
+            "counters": dict(self.counters),
+            "phases": {name: {"calls": stats.calls, "seconds": round(stats.seconds, 6)}
+                       for name, stats in self.phases.items()},
+        }
+
+    def merge(self, data):
+        """Adds a to_dict() result (e.g. from a worker process) into these totals."""
+        for name, amount in data["counters"].items():
+            self.count(name, amount)
+        for name, values in data["phases"].items():
+            stats = self.phase(name)
+            stats.calls += values["calls"]
+            stats.seconds += values["seconds"]
+
+    def to_json_line(self, **extra):
+        record = {"time": round(time.time(), 3)}
+        record.update(extra)
+        record.update(self.to_dict())
+        return json.dumps(record)
+
+    def to_prometheus(self, prefix="minesweeper_agent"):
+        """Renders the totals in the Prometheus text exposition format."""
+        def labels(**more):
+            merged = dict(self.labels, **more)
+            if not merged:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in sorted(merged.items())) + "}"
+
+        lines = []
+        for name in sorted(self.counters):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total{labels()} {self.counters[name]}")
+        if self.phases:
+            lines.append(f"# TYPE {prefix}_phase_seconds_total counter")
+            for name in sorted(self.phases):
+                lines.append(f"{prefix}_phase_seconds_total{labels(phase=name)} {self.phases[name].seconds:.6f}")
+            lines.append(f"# TYPE {prefix}_phase_calls_total counter")
+            for name in sorted(self.phases):
+                lines.append(f"{prefix}_phase_calls_total{labels(phase=name)} {self.phases[name].calls}")
+        return "\n".join(lines) + "\n"
+
+
+def _wrap(method, stats, metrics, counter, result_count):
+    def wrapper(*args, **kwargs):
+        stats.calls += 1
+        stats.depth += 1
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        finally:
+            stats.depth -= 1
+            # Recursive calls run inside the outermost one; only that one adds its time.
+            if not stats.depth:
+                stats.seconds += time.perf_counter() - start
+        if counter:
+            metrics.count(counter, result_count(result) if result_count else 1)
+        return result
+    return wrapper
+
+
+def instrument(agent, metrics=None, labels=None):
+    """
+    Starts collecting metrics for agent and returns the AgentMetrics (a new one
+    unless metrics is given, so several agents can share totals).
+    """
+    if metrics is None:
+        metrics = AgentMetrics(labels)
+    for name, phase, counter, result_count in type(agent).METRICS:
+        method = getattr(type(agent), name).__get__(agent)
+        setattr(agent, name, _wrap(method, metrics.phase(phase), metrics, counter, result_count))
+
+    def on_events(events):
+        for event in events:
+            counter = EVENT_COUNTERS.get(event.kind)
+            if counter:
+                metrics.count(counter)
+
+    agent.game.subscribe(on_events)
+    agent._metrics_subscriber = on_events
+    agent.metrics = metrics
+    return metrics
+
+
+def uninstrument(agent):
+    """Restores agent's plain methods and stops counting its game events."""
+    for name, _, _, _ in type(agent).METRICS:
+        agent.__dict__.pop(name, None)
+    agent.game.unsubscribe(agent.__dict__.pop("_metrics_subscriber", None))
+    agent.metrics = None
@@ -0,0 +1,269 @@
+"""
+SQLite store for finished games, shared by the UIs and the headless runner.
+
+Every game gets its ID from the database when it is inserted, so any number of
+processes can add results to the same file at once.  Per-configuration totals
+and a histogram of game times are updated in the same transaction as the
+insert.  Win rates, mean time and steps, and time percentiles are therefore read
+from those small tables, and their cost does not grow with the number of games.
+
+    python -m Simulation.results results.db --import CSPAgent/CSP_STAT.csv --agent csp --board 6x6x12
+    python -m Simulation.results results.db --agent csp
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "results.db"
+
+# One game.  time is in seconds; steps and seed may be None.
+GameResult = namedtuple("GameResult", ["agent", "rows", "cols", "mines", "result", "time", "steps", "seed", "source"],
+                        defaults=(None, None, None))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    time REAL NOT NULL,
+    steps INTEGER,
+    seed INTEGER,
+    source TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_agent ON games (agent, rows, cols, mines, result);
+CREATE INDEX IF NOT EXISTS games_by_board ON games (rows, cols, mines, result);
+CREATE INDEX IF NOT EXISTS games_by_result ON games (result);
+CREATE TABLE IF NOT EXISTS totals (
+    agent TEXT, rows INTEGER, cols INTEGER, mines INTEGER, result TEXT,
+    games INTEGER NOT NULL, time_total REAL NOT NULL, step_games INTEGER NOT NULL, steps_total INTEGER NOT NULL,
+    PRIMARY KEY (agent, rows, cols, mines, result)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS time_histogram (
+    agent TEXT, rows INTEGER, cols INTEGER, mines INTEGER, bucket_ms INTEGER,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (agent, rows, cols, mines, bucket_ms)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    imported REAL NOT NULL
+);
+"""
+
+INSERT_GAME = ("INSERT INTO games (agent, rows, cols, mines, result, time, steps, seed, source, created) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+ADD_TOTALS = """
+INSERT INTO totals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (agent, rows, cols, mines, result) DO UPDATE SET
+    games = games + excluded.games, time_total = time_total + excluded.time_total,
+    step_games = step_games + excluded.step_games, steps_total = steps_total + excluded.steps_total
+"""
+ADD_TIME = """
+INSERT INTO time_histogram VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (agent, rows, cols, mines, bucket_ms) DO UPDATE SET games = games + excluded.games
+"""
+
+FILTERS = ("agent", "rows", "cols", "mines")
+
+
+def time_bucket(seconds):
+    """Rounds a game time down to two significant digits of milliseconds, e.g. 1.234s -> 1200."""
+    ms = max(0, int(seconds * 1000))
+    scale = 1
+    while ms >= 100:
+        ms //= 10
+        scale *= 10
+    return ms * scale
+
+
+def _where(filters):
+    clauses = [f"{name} = ?" for name in FILTERS if filters.get(name) is not None]
+    values = [filters[name] for name in FILTERS if filters.get(name) is not None]
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), values
+
+
+class ResultStore:
+    """A results database; safe to use from several processes at once (one store per process)."""
+
+    def __init__(self, path=DEFAULT_PATH, timeout=30.0):
+        self.path = str(path)
+        # Transactions are opened explicitly (BEGIN IMMEDIATE) so concurrent writers queue instead of failing.
+        self.connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def _write(self, action):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = action(self.connection.cursor())
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _insert(cursor, games):
+        now = time.time()
+        totals, times = {}, {}
+        count = last_id = 0
+        for game in games:
+            game = GameResult(*game)
+            cursor.execute(INSERT_GAME, game + (now,))
+            count += 1
+            last_id = cursor.lastrowid
+            config = (game.agent, game.rows, game.cols, game.mines)
+            entry = totals.setdefault(config + (game.result,), [0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += game.time
+            if game.steps is not None:
+                entry[2] += 1
+                entry[3] += game.steps
+            key = config + (time_bucket(game.time),)
+            times[key] = times.get(key, 0) + 1
+        cursor.executemany(ADD_TOTALS, [key + tuple(entry) for key, entry in totals.items()])
+        cursor.executemany(ADD_TIME, [key + (games,) for key, games in times.items()])
+        return count, last_id
+
+    def add(self, agent, rows, cols, mines, result, time, steps=None, seed=None, source=None):
+        """Stores one game and returns its new game ID."""
+        game = GameResult(agent, rows, cols, mines, result, time, steps, seed, source)
+        return self._write(lambda cursor: self._insert(cursor, [game]))[1]
+
+    def add_many(self, games):
+        """Stores an iterable of GameResults (or equivalent tuples) in one transaction; returns how many."""
+        return self._write(lambda cursor: self._insert(cursor, games))[0]
+
+    def import_csv(self, path, agent, rows, cols, mines, batch_size=10000):
+        """
+        Imports a stats file written by the old UIs (GameID,Result,Time[,Steps]).
+        A file that was imported before is skipped; returns the number of games added.
+        """
+        key = os.path.abspath(path)
+        source = os.path.basename(path)
+        added = 0
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            if self.connection.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+                self.connection.execute("ROLLBACK")
+                return 0
+            # The whole import is one transaction, so a crash cannot leave half a file imported.
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                batch = []
+                for row in csv.DictReader(f):
+                    steps = row.get("Steps")
+                    batch.append(GameResult(agent, rows, cols, mines, row["Result"].strip().lower(),
+                                            float(row["Time"]), int(steps) if steps else None, None, source))
+                    if len(batch) == batch_size:
+                        added += self._insert(self.connection.cursor(), batch)[0]
+                        batch = []
+                added += self._insert(self.connection.cursor(), batch)[0]
+            self.connection.execute("INSERT INTO imports VALUES (?, ?, ?)", (key, added, time.time()))
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return added
+
+    def game_count(self):
+        return self.connection.execute("SELECT COALESCE(SUM(games), 0) FROM totals").fetchone()[0]
+
+    def summary(self, **filters):
+        """
+        Totals per (agent, rows, cols, mines) matching the filters: games, wins,
+        win_rate, mean_time and mean_steps (None if no game recorded steps).
+        """
+        where, values = _where(filters)
+        query = ("SELECT agent, rows, cols, mines, SUM(games), SUM(CASE result WHEN 'win' THEN games ELSE 0 END), "
+                 f"SUM(time_total), SUM(step_games), SUM(steps_total) FROM totals{where} "
+                 "GROUP BY agent, rows, cols, mines ORDER BY agent, rows, cols, mines")
+        summaries = []
+        for agent, rows, cols, mines, games, wins, time_total, step_games, steps_total in \
+                self.connection.execute(query, values):
+            summaries.append({
+                "agent": agent, "rows": rows, "cols": cols, "mines": mines,
+                "games": games, "wins": wins, "win_rate": wins / games,
+                "mean_time": time_total / games,
+                "mean_steps": steps_total / step_games if step_games else None,
+            })
+        return summaries
+
+    def time_percentiles(self, fractions=(0.5, 0.9, 0.99), **filters):
+        """
+        Game time percentiles in seconds over the games matching the filters,
+        accurate to the two significant digits kept by time_bucket.
+        """
+        where, values = _where(filters)
+        buckets = self.connection.execute(
+            f"SELECT bucket_ms, SUM(games) FROM time_histogram{where} GROUP BY bucket_ms ORDER BY bucket_ms",
+            values).fetchall()
+        total = sum(games for _, games in buckets)
+        percentiles = {}
+        for fraction in fractions:
+            if not total:
+                percentiles[fraction] = None
+                continue
+            target = fraction * total
+            seen = 0
+            for bucket_ms, games in buckets:
+                seen += games
+                if seen >= target:
+                    break
+            percentiles[fraction] = bucket_ms / 1000
+        return percentiles
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_board(text):
+    rows, cols, mines = (int(part) for part in text.lower().split("x"))
+    return rows, cols, mines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import old stats files into a results database or query it.")
+    parser.add_argument("path", nargs="?", default=str(DEFAULT_PATH))
+    parser.add_argument("--import", dest="imports", action="append", default=[], metavar="CSV",
+                        help="Stats CSV from the UIs (GameID,Result,Time[,Steps]); needs --agent and --board.")
+    parser.add_argument("--agent", help="Agent of imported games, or only show this agent.")
+    parser.add_argument("--board", help="ROWSxCOLSxMINES of imported games, or only show this board.")
+    args = parser.parse_args(argv)
+
+    board = parse_board(args.board) if args.board else (None, None, None)
+    with ResultStore(args.path) as store:
+        if args.imports:
+            if not args.agent or not args.board:
+                parser.error("--import needs --agent and --board")
+            for path in args.imports:
+                print(f"{path}: {store.import_csv(path, args.agent, *board)} games imported")
+        filters = dict(zip(FILTERS, (args.agent,) + board))
+        for entry in store.summary(**filters):
+            percentiles = store.time_percentiles(agent=entry["agent"], rows=entry["rows"], cols=entry["cols"],
+                                                 mines=entry["mines"])
+            steps = f'{entry["mean_steps"]:.1f}' if entry["mean_steps"] is not None else "-"
+            print(f'{entry["agent"]:<14}{entry["rows"]}x{entry["cols"]}x{entry["mines"]:<8}'
+                  f'{entry["games"]:>9} games  win {entry["win_rate"]:6.1%}  mean {entry["mean_time"]:.3f}s  '
+                  f'p50 {percentiles[0.5]}s  p90 {percentiles[0.9]}s  p99 {percentiles[0.99]}s  steps {steps}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import contextlib
+import csv
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from UserPlay.backend import Minesweeper
+from UserPlay.bitboard import BitboardMinesweeper
+from UserPlay.chunked import ChunkedMinesweeper
+from CSPAgent.user import Minesweeper as CSPMinesweeper
+from CSPAgent.CSP_BACKEND import CSPSolverAgent, Observer
+from DFSAgent.DFS_BACKEND import DFSAgent, FrontierDFSAgent
+import Probability.linear
+from UserPlay.corpus import load_corpus
+from UserPlay.noguess import first_click_of
+from UserPlay.records import GameRecord, RecordWriter
+from Simulation.metrics import AgentMetrics, instrument
+from Simulation.results import GameResult, ResultStore
+
+FIELDS = ["Seed", "Agent", "GridSize", "Mines", "Result", "Steps", "Time"]
+
+# Hard caps so a stuck agent can never stall a worker.
+MAX_STEPS = 100000
+GAME_TIMEOUT = 10.0
+
+# Rows buffered before they are written to the results database in one transaction.
+RESULTS_BATCH = 1000
+
+# BoardSet loaded in each worker when games are played from a corpus; game i plays board i.
+_board_set = None
+# The safe first click of a no-guess board set (see UserPlay.noguess), opened before the agent starts.
+_opening = None
+
+
+class GameTimeout(Exception):
+    pass
+
+
+class DeadlineObserver(Observer):
+    """Aborts the agent's search once the per-game time budget is spent."""
+    def __init__(self, timeout):
+        self.deadline = time.perf_counter() + timeout
+
+    def update(self, event_type, data=None):
+        if time.perf_counter() > self.deadline:
+            raise GameTimeout()
+
+
+def _raise_timeout(signum, frame):
+    raise GameTimeout()
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    """
+    Raises GameTimeout in the block once seconds have passed.  Needs SIGALRM, so
+    on Windows only the CSP agent (which checks its own deadline) is limited.
+    """
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def game_result(game, mines):
+    """Returns "win" if every safe tile is revealed and no mine was opened."""
+    safe_revealed = len(game.revealed_tiles) - len(game.revealed_tiles & mines)
+    if safe_revealed == game.rows * game.cols - len(mines) and not game.revealed_tiles & mines:
+        return "win"
+    return "lose"
+
+
+def play_dfs(seed, rows, cols, num_mines, timeout, board=None, metrics=None, moves=None, game_class=Minesweeper,
+             agent_class=DFSAgent, opening=None):
+    """
+    Plays one headless DFS game and returns (result, steps).
+    Fills metrics (an AgentMetrics) and moves (a list, gets the agent's move log) if given.
+    opening is a (row, col) revealed before the agent starts.
+    """
+    game = game_class(num_mines=num_mines, board=board, seed=seed, rows=rows, cols=cols)
+    if opening is not None:
+        game.reveal_tile(*opening)
+        if moves is not None:
+            moves.append(("reveal", opening))
+    agent = agent_class(game, lambda: None, lambda win: None, step_delay=0)
+    if metrics is not None:
+        instrument(agent, metrics)
+    try:
+        with time_limit(timeout), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            agent.play()
+        result = game_result(game, game.mine_positions)
+    except GameTimeout:
+        result = "timeout"
+    if moves is not None:
+        moves.extend(agent.moves)
+    return result, len(agent.moves)
+
+
+def play_csp(seed, rows, cols, num_mines, timeout, board=None, metrics=None, moves=None, opening=None, linear=False):
+    """
+    Plays one headless CSP game and returns (result, steps).
+    Fills metrics (an AgentMetrics) if given, and moves with the game's final trail
+    (reveals, including flood-filled ones, and flag toggles).
+    opening is a (row, col) revealed before the agent starts; linear turns on the
+    agent's NumPy linear deduction.
+    """
+    game = CSPMinesweeper(num_mines=num_mines, board=board, seed=seed, rows=rows, cols=cols)
+    if opening is not None:
+        game.reveal_tile(*opening)
+    mines = {(r, c) for r in range(rows) for c in range(cols) if game.grid[r][c] == "M"}
+    agent = CSPSolverAgent(game, linear=linear)
+    agent.add_observer(DeadlineObserver(timeout))
+    if metrics is not None:
+        instrument(agent, metrics)
+    steps = 0
+    try:
+        with time_limit(timeout):
+            while steps < MAX_STEPS and not game.check_loss() and not game.check_win():
+                steps += 1
+                if agent.play_step() == "failure" and agent.try_guessing() == "failure":
+                    break
+        result = game_result(game, mines)
+    except GameTimeout:
+        result = "timeout"
+    if moves is not None:
+        moves.extend(game.trail)
+    return result, steps
+
+
+AGENTS = {
+    "dfs": play_dfs,
+    "dfs-bitboard": functools.partial(play_dfs, game_class=BitboardMinesweeper),
+    "dfs-frontier": functools.partial(play_dfs, agent_class=FrontierDFSAgent),
+    "dfs-chunked": functools.partial(play_dfs, game_class=ChunkedMinesweeper, agent_class=FrontierDFSAgent),
+    "csp": play_csp,
+}
+if Probability.linear.np is not None:
+    AGENTS["csp-linear"] = functools.partial(play_csp, linear=True)
+
+
+def run_game(task):
+    """
+    Worker entry point: plays the game described by task and returns its result row,
+    plus the game's metrics as a dict when they were asked for (otherwise None).
+    """
+    agent_name, seed, rows, cols, num_mines, timeout, collect_metrics, record = task
+    board = _board_set.board(seed) if _board_set is not None else None
+    metrics = AgentMetrics({"agent": agent_name}) if collect_metrics else None
+    moves = [] if record else None
+    start = time.perf_counter()
+    result, steps = AGENTS[agent_name](seed, rows, cols, num_mines, timeout, board, metrics, moves, opening=_opening)
+    elapsed = time.perf_counter() - start
+    row = [seed, agent_name, grid_label(rows, cols), num_mines, result, steps, f"{elapsed:.6f}"]
+    encoded = None
+    if record:
+        layout = {"mines": _board_set.mask(seed)} if _board_set is not None else {"seed": seed}
+        encoded = GameRecord(rows, cols, num_mines, result, moves, elapsed_ms=int(elapsed * 1000),
+                             agent=agent_name, **layout).encode()
+    return row, metrics.to_dict() if metrics is not None else None, encoded
+
+
+def grid_label(rows, cols):
+    """The GridSize column: the side of a square board, ROWSxCOLS otherwise."""
+    return rows if rows == cols else f"{rows}x{cols}"
+
+
+def iter_tasks(agent_name, games, rows, cols, num_mines, first_seed, timeout, collect_metrics=False, record=False):
+    for seed in range(first_seed, first_seed + games):
+        yield agent_name, seed, rows, cols, num_mines, timeout, collect_metrics, record
+
+
+def load_board_set(corpus_path, set_name):
+    global _board_set, _opening
+    _board_set = load_corpus(corpus_path)[set_name] if corpus_path else None
+    _opening = first_click_of(set_name) if corpus_path else None
+
+
+def run(agent_name, games, rows, cols, num_mines, out_path, workers=None, first_seed=0, chunksize=64,
+        timeout=GAME_TIMEOUT, corpus=None, board_set=None, metrics_path=None, prometheus_path=None,
+        record_path=None, results_path=None):
+    """
+    Plays games across a process pool and streams one CSV row per game to out_path,
+    and one binary GameRecord (board, moves, outcome) per game to record_path if given.
+    Rows arrive in completion order; the Seed column identifies each game.
+    With corpus and board_set, game i plays board i of that set (see UserPlay.corpus)
+    instead of a board generated from seed i; a no-guess set (see UserPlay.noguess)
+    starts each game with its safe first click opened.
+    metrics_path gets one JSON line of agent metrics per game (see Simulation.metrics);
+    prometheus_path gets the totals over all games in Prometheus text format.
+    results_path is a results database (see Simulation.results) that also gets every game.
+    Returns the number of games won.
+    """
+    collect_metrics = bool(metrics_path or prometheus_path)
+    tasks = iter_tasks(agent_name, games, rows, cols, num_mines, first_seed, timeout, collect_metrics,
+                       bool(record_path))
+    file_exists = os.path.exists(out_path) and os.path.getsize(out_path) > 0
+    wins = 0
+    totals = AgentMetrics({"agent": agent_name})
+    pool = multiprocessing.Pool(workers, initializer=load_board_set, initargs=(corpus, board_set))
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(open(out_path, "a", newline=""))
+        metrics_file = stack.enter_context(open(metrics_path, "a")) if metrics_path else None
+        records = stack.enter_context(RecordWriter(record_path)) if record_path else None
+        store = stack.enter_context(ResultStore(results_path)) if results_path else None
+        pending = []
+        stack.enter_context(pool)
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(FIELDS)
+        for row, game_metrics, encoded in pool.imap_unordered(run_game, tasks, chunksize=chunksize):
+            writer.writerow(row)
+            if records:
+                records.write_encoded(encoded)
+            if store:
+                pending.append(GameResult(agent_name, rows, cols, num_mines, row[4], float(row[6]), row[5],
+                                          row[0], "runner"))
+                if len(pending) >= RESULTS_BATCH:
+                    store.add_many(pending)
+                    pending = []
+            if row[4] == "win":
+                wins += 1
+            if game_metrics is not None:
+                totals.merge(game_metrics)
+                if metrics_file:
+                    game_metrics.update(seed=row[0], result=row[4])
+                    metrics_file.write(json.dumps(game_metrics) + "\n")
+        if store and pending:
+            store.add_many(pending)
+    if prometheus_path:
+        with open(prometheus_path, "w") as f:
+            f.write(totals.to_prometheus())
+    return wins
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Minesweeper agent games.")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="csp")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--grid-size", type=int, default=6)
+    parser.add_argument("--rows", type=int, help="Board height for rectangular boards (default: --grid-size).")
+    parser.add_argument("--cols", type=int, help="Board width for rectangular boards (default: --grid-size).")
+    parser.add_argument("--mines", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game; game i uses seed + i.")
+    parser.add_argument("--timeout", type=float, default=GAME_TIMEOUT, help="Per-game time budget in seconds.")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--out", default="simulation.csv")
+    parser.add_argument("--corpus", help="Board corpus file from UserPlay.corpus to play instead of random boards.")
+    parser.add_argument("--board-set", help="Name of the set in --corpus; sets its size, mines and game count.")
+    parser.add_argument("--metrics", help="Append one JSON line of agent counters and phase timings per game.")
+    parser.add_argument("--prometheus", help="Write the metric totals of the run in Prometheus text format.")
+    parser.add_argument("--record", help="Append each game's board, moves and outcome to a binary record file.")
+    parser.add_argument("--results", help="Also add every game to this results database (see Simulation.results).")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        board_sets = load_corpus(args.corpus)
+        if args.board_set not in board_sets:
+            parser.error(f"--board-set must be one of {sorted(board_sets)}")
+        chosen = board_sets[args.board_set]
+        args.rows, args.cols, args.mines = chosen.rows, chosen.cols, chosen.num_mines
+        args.games = min(args.games, len(chosen) - args.seed)
+
+    start = time.perf_counter()
+    rows = args.grid_size if args.rows is None else args.rows
+    cols = args.grid_size if args.cols is None else args.cols
+    wins = run(args.agent, args.games, rows, cols, args.mines, args.out,
+               workers=args.workers, first_seed=args.seed, chunksize=args.chunksize, timeout=args.timeout,
+               corpus=args.corpus, board_set=args.board_set, metrics_path=args.metrics,
+               prometheus_path=args.prometheus, record_path=args.record, results_path=args.results)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games, {wins} wins ({wins / max(args.games, 1):.1%}) "
+          f"in {elapsed:.1f}s ({args.games / elapsed:.1f} games/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
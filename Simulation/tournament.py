@@ -0,0 +1,297 @@
+"""
+Tournament: every agent plays the same boards, and their results are compared.
+
+    python -m Simulation.tournament --board intermediate --boards 100000
+    python -m Simulation.tournament --corpus boards.msc --board-set expert --agents csp,probability
+
+Boards come from one seeded BoardSet (see UserPlay.corpus), so every agent sees
+exactly the same mines.  Each (agent, board) game runs in a worker process
+under a time budget.  The table shows each agent's win rate, mean and median
+solve time, and moves per second, each with a 95% confidence interval.  A move
+is one action that changed the board: a reveal with its flood fill, a flag, or
+a number click.
+"""
+import argparse
+import contextlib
+import csv
+import functools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from UserPlay.backend import Minesweeper
+from UserPlay.corpus import BoardSet, generate_set, load_corpus
+from UserPlay.noguess import first_click_of, parse_config
+from CSPAgent.user import Minesweeper as CSPMinesweeper
+from CSPAgent.CSP_BACKEND import CSPSolverAgent
+from DFSAgent.DFS_BACKEND import DFSAgent, FrontierDFSAgent
+import Probability.linear
+from Probability.agent import ProbabilityAgent
+from Simulation.runner import MAX_STEPS, RESULTS_BATCH, DeadlineObserver, GameTimeout, game_result, time_limit
+from Simulation.results import GameResult, ResultStore
+
+FIELDS = ["Board", "Agent", "Result", "Moves", "Time"]
+Z_95 = 1.96
+# Per-game budget in seconds; shorter than the runner's, as a tournament plays every board with every agent.
+GAME_TIMEOUT = 1.0
+
+# The boards of the tournament, set in each worker.
+_boards = None
+
+
+def _play_dfs(agent_class, game, timeout):
+    agent = agent_class(game, lambda: None, lambda win: None, step_delay=0)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        agent.play()
+
+
+def _play_csp(game, timeout, linear=False):
+    agent = CSPSolverAgent(game, linear=linear)
+    agent.add_observer(DeadlineObserver(timeout))
+    steps = 0
+    while steps < MAX_STEPS and not game.check_loss() and not game.check_win():
+        steps += 1
+        if agent.play_step() == "failure" and agent.try_guessing() == "failure":
+            break
+
+
+def _play_probability(game, timeout):
+    ProbabilityAgent(game).play()
+
+
+# Agent name -> (backend the agent plays on, function(game, timeout) that plays one game).
+ENTRANTS = {
+    "dfs": (Minesweeper, functools.partial(_play_dfs, DFSAgent)),
+    "dfs-frontier": (Minesweeper, functools.partial(_play_dfs, FrontierDFSAgent)),
+    "csp": (CSPMinesweeper, _play_csp),
+    "probability": (Minesweeper, _play_probability),
+}
+if Probability.linear.np is not None:
+    ENTRANTS["csp-linear"] = (CSPMinesweeper, functools.partial(_play_csp, linear=True))
+# Agents that read the mine positions, so they are not part of a fair comparison; they only play
+# when asked for and are marked in the table.
+ORACLES = {"dfs"}
+
+
+def init_worker(board_set):
+    global _boards
+    _boards = board_set
+
+
+def play_game(task):
+    """Worker entry point: plays board index with one agent; returns (agent, index, result, moves, seconds)."""
+    agent_name, index, timeout = task
+    game_class, play = ENTRANTS[agent_name]
+    game = game_class(num_mines=_boards.num_mines, board=_boards.board(index))
+    opening = first_click_of(_boards.name)
+    if opening is not None:
+        game.reveal_tile(*opening)
+    moves = 0
+
+    def count_move(events):
+        nonlocal moves
+        moves += 1
+
+    game.subscribe(count_move)
+    start = time.perf_counter()
+    try:
+        with time_limit(timeout):
+            play(game, timeout)
+        result = game_result(game, _boards.mine_positions(index))
+    except GameTimeout:
+        result = "timeout"
+    return agent_name, index, result, moves, time.perf_counter() - start
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Confidence interval of a success rate; stays inside [0, 1] even at 0% or 100%."""
+    if not n:
+        return 0.0, 1.0
+    rate = successes / n
+    centre = (rate + z * z / (2 * n)) / (1 + z * z / n)
+    spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def mean_interval(values, z=Z_95):
+    """(mean, low, high) with the normal approximation."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, mean, mean
+    spread = z * math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1) / n)
+    return mean, mean - spread, mean + spread
+
+
+def median_interval(values, z=Z_95):
+    """(median, low, high); the interval comes from order statistics, so it assumes nothing about the distribution."""
+    ordered = sorted(values)
+    n = len(ordered)
+    median = (ordered[(n - 1) // 2] + ordered[n // 2]) / 2
+    offset = z * math.sqrt(n) / 2
+    low = max(0, math.floor(n / 2 - offset))
+    high = min(n - 1, math.ceil(n / 2 + offset) - 1)
+    return median, ordered[low], ordered[high]
+
+
+def ratio_interval(numerators, denominators, z=Z_95):
+    """(sum of numerators / sum of denominators, low, high) with the delta method."""
+    n = len(numerators)
+    total = sum(denominators)
+    ratio = sum(numerators) / total if total else 0.0
+    if n < 2 or not total:
+        return ratio, ratio, ratio
+    mean_denominator = total / n
+    residuals = [a - ratio * b for a, b in zip(numerators, denominators)]
+    spread = z * math.sqrt(sum(r * r for r in residuals) / (n - 1) / n) / mean_denominator
+    return ratio, ratio - spread, ratio + spread
+
+
+class AgentStats:
+    """Every game of one agent in the tournament."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.wins = 0
+        self.timeouts = 0
+        self.times = []
+        self.moves = []
+
+    def add(self, result, moves, seconds):
+        self.wins += result == "win"
+        self.timeouts += result == "timeout"
+        self.times.append(seconds)
+        self.moves.append(moves)
+
+    def summary(self):
+        games = len(self.times)
+        if not games:
+            return {"agent": self.agent, "games": 0}
+        mean, mean_low, mean_high = mean_interval(self.times)
+        median, median_low, median_high = median_interval(self.times)
+        rate, rate_low, rate_high = ratio_interval(self.moves, self.times)
+        win_low, win_high = wilson_interval(self.wins, games)
+        return {
+            "agent": self.agent, "games": games, "wins": self.wins, "timeouts": self.timeouts,
+            "win_rate": self.wins / games, "win_rate_ci": [win_low, win_high],
+            "mean_time": mean, "mean_time_ci": [mean_low, mean_high],
+            "median_time": median, "median_time_ci": [median_low, median_high],
+            "moves_per_second": rate, "moves_per_second_ci": [rate_low, rate_high],
+        }
+
+
+def run_tournament(agents, board_set, timeout=GAME_TIMEOUT, workers=None, chunksize=16, out_path=None,
+                   results_path=None):
+    """
+    Plays every board of board_set with every agent across a process pool and
+    returns {agent: AgentStats}.  out_path gets one CSV row per game and
+    results_path (a results database, see Simulation.results) every game.
+    """
+    # Loaded corpora hold memoryviews, which cannot be sent to the workers.
+    board_set = BoardSet(board_set.name, board_set.rows, board_set.cols, board_set.num_mines, board_set.seed,
+                         bytes(board_set.data))
+    tasks = ((agent, index, timeout) for index in range(len(board_set)) for agent in agents)
+    stats = {agent: AgentStats(agent) for agent in agents}
+    with contextlib.ExitStack() as stack:
+        writer = csv.writer(stack.enter_context(open(out_path, "w", newline=""))) if out_path else None
+        store = stack.enter_context(ResultStore(results_path)) if results_path else None
+        pool = stack.enter_context(multiprocessing.Pool(workers, initializer=init_worker, initargs=(board_set,)))
+        if writer:
+            writer.writerow(FIELDS)
+        pending = []
+        for agent, index, result, moves, seconds in pool.imap_unordered(play_game, tasks, chunksize=chunksize):
+            stats[agent].add(result, moves, seconds)
+            if writer:
+                writer.writerow([index, agent, result, moves, f"{seconds:.6f}"])
+            if store:
+                pending.append(GameResult(agent, board_set.rows, board_set.cols, board_set.num_mines, result, seconds,
+                                          moves, index, "tournament"))
+                if len(pending) >= RESULTS_BATCH:
+                    store.add_many(pending)
+                    pending = []
+        if store and pending:
+            store.add_many(pending)
+    return stats
+
+
+def format_table(summaries):
+    def interval(low, high, scale=1.0, digits=1):
+        return f"[{low * scale:.{digits}f}, {high * scale:.{digits}f}]"
+
+    def name(agent):
+        return agent + " (oracle)" if agent in ORACLES else agent
+
+    lines = [f"{'agent':<20}{'games':>8}{'timeouts':>10}  {'win rate':<22}{'mean ms':<26}{'median ms':<26}{'moves/s':<26}"]
+    for s in summaries:
+        if not s["games"]:
+            lines.append(f"{name(s['agent']):<20}{0:>8}{0:>10}")
+            continue
+        lines.append(
+            f"{name(s['agent']):<20}{s['games']:>8}{s['timeouts']:>10}  "
+            f"{s['win_rate']:6.1%} {interval(*s['win_rate_ci'], 100):<15}"
+            f"{s['mean_time'] * 1000:8.2f} {interval(*s['mean_time_ci'], 1000, 2):<17}"
+            f"{s['median_time'] * 1000:8.2f} {interval(*s['median_time_ci'], 1000, 2):<17}"
+            f"{s['moves_per_second']:8.0f} {interval(*s['moves_per_second_ci'], 1, 0):<17}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the agents on the same boards.")
+    fair = [agent for agent in ENTRANTS if agent not in ORACLES]
+    parser.add_argument("--agents", default=",".join(fair),
+                        help=f"Comma-separated agents from {', '.join(ENTRANTS)} (default: {', '.join(fair)}).")
+    parser.add_argument("--board", default="intermediate", help="Preset name or ROWSxCOLSxMINES.")
+    parser.add_argument("--boards", type=int, default=1000, help="Number of boards.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated board set.")
+    parser.add_argument("--corpus", help="Board corpus file (see UserPlay.corpus) to take the boards from.")
+    parser.add_argument("--board-set", help="Name of the set in --corpus.")
+    parser.add_argument("--timeout", type=float, default=GAME_TIMEOUT, help="Per-game time budget in seconds.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--out", help="Write one CSV row per game.")
+    parser.add_argument("--json", help="Write the summary as JSON.")
+    parser.add_argument("--results", help="Also add every game to this results database (see Simulation.results).")
+    args = parser.parse_args(argv)
+
+    agents = [agent.strip() for agent in args.agents.split(",") if agent.strip()]
+    unknown = [agent for agent in agents if agent not in ENTRANTS]
+    if unknown:
+        parser.error(f"Unknown agents {unknown}; choose from {sorted(ENTRANTS)}")
+    if args.corpus:
+        board_sets = load_corpus(args.corpus)
+        if args.board_set not in board_sets:
+            parser.error(f"--board-set must be one of {sorted(board_sets)}")
+        board_set = board_sets[args.board_set]
+        if args.boards < len(board_set):
+            stride = board_set.stride
+            board_set = BoardSet(board_set.name, board_set.rows, board_set.cols, board_set.num_mines,
+                                 board_set.seed, board_set.data[:args.boards * stride])
+    else:
+        try:
+            rows, cols, mines = parse_config(args.board)
+        except ValueError as error:
+            parser.error(str(error))
+        board_set = generate_set(args.board, rows, cols, mines, args.boards, args.seed)
+
+    start = time.perf_counter()
+    stats = run_tournament(agents, board_set, args.timeout, args.workers, args.chunksize, args.out, args.results)
+    elapsed = time.perf_counter() - start
+    summaries = [stats[agent].summary() for agent in agents]
+    games = sum(summary["games"] for summary in summaries)
+    print(f"{len(board_set)} boards of {board_set.rows}x{board_set.cols} with {board_set.num_mines} mines, "
+          f"{games} games in {elapsed:.1f}s ({games / elapsed:.0f} games/s); 95% confidence intervals in brackets")
+    print(format_table(summaries))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": board_set.rows, "cols": board_set.cols, "mines": board_set.num_mines,
+                       "boards": len(board_set), "seed": board_set.seed, "agents": summaries}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
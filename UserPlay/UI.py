@@ -1,6 +1,12 @@
+import os
 import pygame
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.getcwd()).resolve().parent))
+
 from backend import Minesweeper
+from UserPlay.renderer import BoardRenderer, GlyphCache
 
 # Initialize PyGame
 pygame.init()
@@ -40,44 +46,46 @@ pygame.display.set_caption("Minesweeper")
 game = Minesweeper(grid_size=GRID_SIZE, num_mines=NUM_MINES)
 
 
-def draw_grid():
-    """Draws the Minesweeper-style grid with 3D-like borders."""
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE + 100  # Shift grid down for timer and flags
+GLYPHS = GlyphCache(FONT, TEXT_COLOR, FLAG_IMAGE, BOMB_IMAGE)
+HEADER_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 100)
+last_header = None
 
-            pygame.draw.rect(screen, COVERED_CELL_COLOR, (x, y, TILE_SIZE, TILE_SIZE))  # Covered cell
 
-            # Add a 3D-like border effect for each cell
-            pygame.draw.line(screen, CELL_BORDER_LIGHT, (x, y), (x + TILE_SIZE - 1, y))  # Top border
-            pygame.draw.line(screen, CELL_BORDER_LIGHT, (x, y), (x, y + TILE_SIZE - 1))  # Left border
-            pygame.draw.line(screen, CELL_BORDER_DARK, (x + TILE_SIZE - 1, y), (x + TILE_SIZE - 1, y + TILE_SIZE - 1))  # Right border
-            pygame.draw.line(screen, CELL_BORDER_DARK, (x, y + TILE_SIZE - 1), (x + TILE_SIZE - 1, y + TILE_SIZE - 1))  # Bottom border
+def draw_cell(surface, x, y, row, col):
+    """Draws one Minesweeper-style cell with 3D-like borders in its current state."""
+    pygame.draw.rect(surface, COVERED_CELL_COLOR, (x, y, TILE_SIZE, TILE_SIZE))  # Covered cell
 
+    # Add a 3D-like border effect for each cell
+    pygame.draw.line(surface, CELL_BORDER_LIGHT, (x, y), (x + TILE_SIZE - 1, y))  # Top border
+    pygame.draw.line(surface, CELL_BORDER_LIGHT, (x, y), (x, y + TILE_SIZE - 1))  # Left border
+    pygame.draw.line(surface, CELL_BORDER_DARK, (x + TILE_SIZE - 1, y), (x + TILE_SIZE - 1, y + TILE_SIZE - 1))  # Right border
+    pygame.draw.line(surface, CELL_BORDER_DARK, (x, y + TILE_SIZE - 1), (x + TILE_SIZE - 1, y + TILE_SIZE - 1))  # Bottom border
 
-def draw_tiles():
-    """Draws the Minesweeper tiles based on their current state."""
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE + 100  # Shift grid down for timer and flags
+    if (row, col) in game.revealed_tiles:
+        pygame.draw.rect(surface, UNCOVERED_CELL_COLOR, (x + 2, y + 2, TILE_SIZE - 4, TILE_SIZE - 4))
+        tile = game.grid[row][col]
+        if tile.isdigit():
+            surface.blit(GLYPHS.digit(tile), (x + TILE_SIZE // 3, y + TILE_SIZE // 4))
+        elif tile == "M":
+            surface.blit(GLYPHS.bomb, (x + 2, y + 2))
+    elif (row, col) in game.flags:
+        surface.blit(GLYPHS.flag, (x + 2, y + 2))
 
-            if (row, col) in game.revealed_tiles:
-                pygame.draw.rect(screen, UNCOVERED_CELL_COLOR, (x + 2, y + 2, TILE_SIZE - 4, TILE_SIZE - 4))
-                tile = game.grid[row][col]
-                if tile.isdigit():
-                    text = FONT.render(tile, True, TEXT_COLOR)
-                    screen.blit(text, (x + TILE_SIZE // 3, y + TILE_SIZE // 4))
-                elif tile == "M":
-                    screen.blit(BOMB_IMAGE, (x + 2, y + 2))
-            elif (row, col) in game.flags:
-                screen.blit(FLAG_IMAGE, (x + 2, y + 2))
+
+renderer = BoardRenderer(screen, game, TILE_SIZE, 100, draw_cell)
 
 
 def draw_timer_and_flags():
-    """Draws the timer and the number of flags remaining."""
+    """Draws the timer and the number of flags remaining; returns the area to update, if it changed."""
+    global last_header
     elapsed_time = game.get_elapsed_time()
+    header = (elapsed_time, game.flags_remaining)
+    if header == last_header:
+        return None
+    last_header = header
+
+    screen.set_clip(HEADER_RECT)
+    screen.fill(BACKGROUND_COLOR, HEADER_RECT)
     minutes = elapsed_time // 60
     seconds = elapsed_time % 60
     timer_text = TIMER_FONT.render(f"{minutes:02}:{seconds:02}", True, TEXT_COLOR)
@@ -86,6 +94,8 @@ def draw_timer_and_flags():
     flag_count_text = TIMER_FONT.render(str(game.flags_remaining), True, TEXT_COLOR)
     screen.blit(flag_count_text, (3 * SCREEN_WIDTH // 4 - 30, 30))
     screen.blit(FLAG_IMAGE, (3 * SCREEN_WIDTH // 4, 25))
+    screen.set_clip(None)
+    return HEADER_RECT
 
 
 def end_game_popup(win):
@@ -129,10 +139,10 @@ def main():
     """Main game loop."""
     clock = pygame.time.Clock()
     running = True
+    screen.fill(BACKGROUND_COLOR)
+    pygame.display.flip()
 
     while running:
-        screen.fill(BACKGROUND_COLOR)
-
         # Event handling
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -166,13 +176,13 @@ def main():
             end_game_popup(win=True)
             running = False
 
-        # Draw UI
-        draw_timer_and_flags()
-        draw_grid()
-        draw_tiles()
-
-        # Refresh screen
-        pygame.display.flip()
+        # Draw only what changed since the last frame
+        dirty_rects = renderer.draw()
+        header_rect = draw_timer_and_flags()
+        if header_rect:
+            dirty_rects.append(header_rect)
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
         clock.tick(30)
 
     pygame.quit()
@@ -1,28 +1,52 @@
 import random
 import time
 
+from UserPlay.boardgen import board_dimensions, board_to_grid, mine_positions
+from UserPlay.events import EventStream, batched
+
 
 class Minesweeper:
-    def __init__(self, grid_size=10, num_mines=10):
-        self.grid_size = grid_size
+    def __init__(self, grid_size=10, num_mines=10, board=None, seed=None, rows=None, cols=None):
+        """
+        The board is rows x cols (both default to grid_size).  board is an
+        optional pre-generated board (see UserPlay.boardgen) used instead of
+        placing mines at random; its shape wins over the size arguments.
+        seed makes the random placement reproducible; every game draws from
+        its own random.Random.
+        """
+        self.rows, self.cols = board_dimensions(grid_size, rows, cols, board)
+        # Kept for square boards, which older callers expect; None on rectangular ones.
+        self.grid_size = self.rows if self.rows == self.cols else None
         self.num_mines = num_mines
         self.flags_remaining = num_mines
-        self.grid = [[" " for _ in range(grid_size)] for _ in range(grid_size)]
+        self.grid = [[" " for _ in range(self.cols)] for _ in range(self.rows)]
         self.mine_positions = set()
         self.revealed_tiles = set()
         self.flags = set()
         self.game_over = False
         self.start_time = None
         self.end_time = None
+        self.events = EventStream()
+        self.rng = random.Random(seed)
 
-        self._place_mines()
-        self._calculate_neighbors()
+        if board is not None:
+            self.grid = board_to_grid(board, zero=" ")
+            self.mine_positions = mine_positions(board)
+        else:
+            self._place_mines()
+            self._calculate_neighbors()
+
+        # Running totals kept up to date by every action, so the win and auto-flag checks never scan the board.
+        self.hidden_count = self.rows * self.cols  # neither revealed nor flagged
+        self.safe_remaining = self.rows * self.cols - len(self.mine_positions)
+        self.flagged_mines = 0
+        self.wrong_flags = 0
 
     def _place_mines(self):
         """Randomly places mines on the grid."""
         while len(self.mine_positions) < self.num_mines:
-            row = random.randint(0, self.grid_size - 1)
-            col = random.randint(0, self.grid_size - 1)
+            row = self.rng.randint(0, self.rows - 1)
+            col = self.rng.randint(0, self.cols - 1)
             self.mine_positions.add((row, col))
 
     def _calculate_neighbors(self):
@@ -32,12 +56,20 @@ class Minesweeper:
             for dr in [-1, 0, 1]:
                 for dc in [-1, 0, 1]:
                     nr, nc = row + dr, col + dc
-                    if 0 <= nr < self.grid_size and 0 <= nc < self.grid_size and self.grid[nr][nc] != "M":
+                    if 0 <= nr < self.rows and 0 <= nc < self.cols and self.grid[nr][nc] != "M":
                         if self.grid[nr][nc] == " ":
                             self.grid[nr][nc] = "1"
                         else:
                             self.grid[nr][nc] = str(int(self.grid[nr][nc]) + 1)
 
+    def subscribe(self, callback):
+        """Registers callback(events) to receive each action's changes; see UserPlay.events."""
+        return self.events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.events.unsubscribe(callback)
+
+    @batched
     def reveal_tile(self, row, col):
         """Reveals the selected tile and triggers flood-fill for tiles with no neighboring bombs."""
         if not self.start_time:
@@ -49,6 +81,7 @@ class Minesweeper:
         if (row, col) in self.mine_positions:
             self.game_over = True
             self.end_time = time.time()
+            self.events.emit("lose", (row, col), "M")
             return "M"
 
         self._flood_fill(row, col)
@@ -57,29 +90,52 @@ class Minesweeper:
 
     def _flood_fill(self, row, col):
         """Flood-fill algorithm to open all connected cells with no neighboring bombs."""
-        if not (0 <= row < self.grid_size and 0 <= col < self.grid_size):
-            return
-        if (row, col) in self.revealed_tiles:
-            return
-
-        self.revealed_tiles.add((row, col))
-
-        if self.grid[row][col].isdigit() and self.grid[row][col] != "0":
-            return
+        # An explicit stack, so large open boards do not run into the recursion limit.
+        stack = [(row, col)]
+        while stack:
+            row, col = stack.pop()
+            if not (0 <= row < self.rows and 0 <= col < self.cols):
+                continue
+            if (row, col) in self.revealed_tiles:
+                continue
+
+            self.revealed_tiles.add((row, col))
+            self.safe_remaining -= 1
+            if (row, col) not in self.flags:
+                self.hidden_count -= 1
+            self.events.emit("reveal", (row, col), self.grid[row][col])
+
+            if self.grid[row][col].isdigit() and self.grid[row][col] != "0":
+                continue
 
-        for dr, dc in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
-            self._flood_fill(row + dr, col + dc)
+            for dr, dc in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
+                stack.append((row + dr, col + dc))
 
+    @batched
     def flag_tile(self, row, col):
         """Flags or unflags a tile and updates the flag counter."""
         if (row, col) in self.flags:
             self.flags.remove((row, col))
             self.flags_remaining += 1
+            self._count_flag((row, col), -1)
+            self.events.emit("unflag", (row, col))
         else:
             if self.flags_remaining > 0:
                 self.flags.add((row, col))
                 self.flags_remaining -= 1
+                self._count_flag((row, col), 1)
+                self.events.emit("flag", (row, col))
+
+    def _count_flag(self, cell, change):
+        """Updates the running totals for a flag placed (change 1) or removed (change -1) on cell."""
+        if cell in self.mine_positions:
+            self.flagged_mines += change
+        else:
+            self.wrong_flags += change
+        if cell not in self.revealed_tiles:
+            self.hidden_count -= change
 
+    @batched
     def handle_number_click(self, row, col):
         """Handles clicks on already opened blocks with numbers."""
         if (row, col) not in self.revealed_tiles or self.grid[row][col] == " ":
@@ -98,44 +154,53 @@ class Minesweeper:
         if flags_count == int(tile_value):
             for dr, dc in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
                 nr, nc = row + dr, col + dc
-                if (nr, nc) not in self.flags and 0 <= nr < self.grid_size and 0 <= nc < self.grid_size:
+                if (nr, nc) not in self.flags and 0 <= nr < self.rows and 0 <= nc < self.cols:
                     if (nr, nc) in self.mine_positions:
                         self.game_over = True
+                        self.events.emit("lose", (nr, nc), "M")
                         return True
                     self.reveal_tile(nr, nc)
         return False
 
+    @batched
     def auto_place_flags(self):
         """
         Automatically places flags on all remaining unrevealed tiles
         if the number of unrevealed tiles equals the number of flags remaining.
         """
+        if self.hidden_count != self.flags_remaining:
+            return None
+
+        # Only reached when the game is about to end, so listing the tiles here is fine.
         unrevealed_tiles = [
             (row, col)
-            for row in range(self.grid_size)
-            for col in range(self.grid_size)
+            for row in range(self.rows)
+            for col in range(self.cols)
             if (row, col) not in self.revealed_tiles and (row, col) not in self.flags
         ]
-
-        if len(unrevealed_tiles) == self.flags_remaining:
-            for tile in unrevealed_tiles:
-                self.flags.add(tile)
-
-            if self.flags == self.mine_positions:
-                self.end_time = time.time()
-                self.game_over = True
-                return "win"
-            else:
-                self.end_time = time.time()
-                self.game_over = True
-                return "lose"
-        return None
-
+        for tile in unrevealed_tiles:
+            self.flags.add(tile)
+            self._count_flag(tile, 1)
+            self.events.emit("flag", tile)
+
+        self.end_time = time.time()
+        self.game_over = True
+        result = "win" if self._all_mines_flagged() else "lose"
+        self.events.emit(result)
+        return result
+
+    def _all_mines_flagged(self):
+        """True when the flags are exactly the mines."""
+        return self.wrong_flags == 0 and self.flagged_mines == len(self.mine_positions)
+
+    @batched
     def check_win(self):
         """Checks if the player has won the game."""
-        if len(self.revealed_tiles) + len(self.flags) == self.grid_size * self.grid_size:
-            if self.flags == self.mine_positions:
+        if self.safe_remaining == 0:
+            if self._all_mines_flagged():
                 self.end_time = time.time()
+                if not self.game_over:
+                    self.events.emit("win")
                 self.game_over = True
                 return True
         return False
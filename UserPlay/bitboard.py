@@ -0,0 +1,339 @@
+import random
+import time
+from collections.abc import Set
+
+from UserPlay.boardgen import board_dimensions, mine_mask
+from UserPlay.events import EventStream, batched
+
+
+class CellSet(Set):
+    """Read-only, live (row, col) view of one of the game's bitmasks."""
+
+    def __init__(self, game, attr):
+        self._game = game
+        self._attr = attr
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __contains__(self, cell):
+        row, col = cell
+        game = self._game
+        if not (0 <= row < game.rows and 0 <= col < game.cols):
+            return False
+        return (getattr(game, self._attr) >> (row * game.cols + col)) & 1 == 1
+
+    def __iter__(self):
+        bits = getattr(self._game, self._attr)
+        cols = self._game.cols
+        while bits:
+            low = bits & -bits
+            yield divmod(low.bit_length() - 1, cols)
+            bits ^= low
+
+    def __len__(self):
+        return getattr(self._game, self._attr).bit_count()
+
+    def __repr__(self):
+        return f"CellSet({set(self)!r})"
+
+
+class GridRow:
+    """One row of the board, decoded on access into the same strings the set backend stores."""
+
+    def __init__(self, game, row):
+        self._game = game
+        self._offset = row * game.cols
+
+    def __getitem__(self, col):
+        return self._game._tile(self._offset + col)
+
+    def __len__(self):
+        return self._game.cols
+
+    def __iter__(self):
+        return (self[col] for col in range(self._game.cols))
+
+
+class Grid:
+    def __init__(self, game):
+        self._game = game
+
+    def __getitem__(self, row):
+        return GridRow(self._game, row)
+
+    def __len__(self):
+        return self._game.rows
+
+    def __iter__(self):
+        return (self[row] for row in range(self._game.rows))
+
+
+class BitboardMinesweeper:
+    """
+    Drop-in replacement for backend.Minesweeper that keeps mines, revealed tiles and flags
+    as integer bitmasks (bit row * cols + col) instead of sets of tuples.
+    Neighbour counts are stored as four bit-planes, so generation, flood fill and the
+    win checks are whole-board bitwise operations.
+    """
+
+    def __init__(self, grid_size=10, num_mines=10, board=None, seed=None, rows=None, cols=None):
+        self.rows, self.cols = board_dimensions(grid_size, rows, cols, board)
+        self.grid_size = self.rows if self.rows == self.cols else None
+        self.num_mines = num_mines
+        self.flags_remaining = num_mines
+        self.game_over = False
+        self.start_time = None
+        self.end_time = None
+        self.events = EventStream()
+        self.rng = random.Random(seed)
+
+        self.full_mask = (1 << (self.rows * self.cols)) - 1
+        first_col = self.full_mask // ((1 << self.cols) - 1)
+        self.not_first_col = self.full_mask & ~first_col
+        self.not_last_col = self.full_mask & ~(first_col << (self.cols - 1))
+
+        self.mines = 0
+        self.revealed = 0
+        self.flagged = 0
+        self.count_planes = [0, 0, 0, 0]
+
+        self.grid = Grid(self)
+        self.mine_positions = CellSet(self, "mines")
+        self.revealed_tiles = CellSet(self, "revealed")
+        self.flags = CellSet(self, "flagged")
+
+        if board is not None:
+            self.mines = mine_mask(board)
+        else:
+            self._place_mines()
+        self._calculate_neighbors()
+
+        # Running totals kept up to date by every action, so check_win and auto_place_flags are O(1).
+        self.mine_count = self.mines.bit_count()
+        self.hidden_count = self.rows * self.cols  # neither revealed nor flagged
+        self.safe_remaining = self.rows * self.cols - self.mine_count
+        self.flagged_mines = 0
+        self.wrong_flags = 0
+        self.revealed_count = 0
+        self.revealed_flags = 0  # flags on revealed cells
+
+    def _place_mines(self):
+        """Randomly places mines on the grid, drawing positions in the same order as the set backend."""
+        positions = set()
+        while len(positions) < self.num_mines:
+            row = self.rng.randint(0, self.rows - 1)
+            col = self.rng.randint(0, self.cols - 1)
+            positions.add(row * self.cols + col)
+        packed = bytearray((self.rows * self.cols + 7) // 8)
+        for index in positions:
+            packed[index >> 3] |= 1 << (index & 7)
+        self.mines = int.from_bytes(packed, "little")
+
+    def _shifted_neighbors(self, mask):
+        """Yields mask moved one step in each of the eight directions, clipped to the board."""
+        size = self.cols
+        east = (mask << 1) & self.not_first_col
+        west = (mask >> 1) & self.not_last_col
+        for row_mask in (east, west, mask):
+            yield (row_mask << size) & self.full_mask
+            yield row_mask >> size
+        yield east
+        yield west
+
+    def _spread(self, mask):
+        """Returns mask together with every neighbour of its cells."""
+        row_mask = mask | ((mask << 1) & self.not_first_col) | ((mask >> 1) & self.not_last_col)
+        return row_mask | ((row_mask << self.cols) & self.full_mask) | (row_mask >> self.cols)
+
+    def _calculate_neighbors(self):
+        """Counts neighbouring mines for every tile at once with bit-sliced addition."""
+        planes = [0, 0, 0, 0]
+        for shifted in self._shifted_neighbors(self.mines):
+            for k in range(4):
+                carry = planes[k] & shifted
+                planes[k] ^= shifted
+                shifted = carry
+                if not shifted:
+                    break
+        self.count_planes = [plane & ~self.mines for plane in planes]
+        self.zero_mask = self.full_mask & ~self.mines & ~(planes[0] | planes[1] | planes[2] | planes[3])
+
+    def _tile(self, index):
+        if (self.mines >> index) & 1:
+            return "M"
+        count = 0
+        for k, plane in enumerate(self.count_planes):
+            count |= ((plane >> index) & 1) << k
+        return str(count) if count else " "
+
+    def subscribe(self, callback):
+        """Registers callback(events) to receive each action's changes; see UserPlay.events."""
+        return self.events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.events.unsubscribe(callback)
+
+    def _emit_cells(self, kind, mask, with_value=False):
+        """Emits one event per set bit of mask, in cell order."""
+        cols = self.cols
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            self.events.emit(kind, divmod(index, cols), self._tile(index) if with_value else None)
+            mask ^= low
+
+    @batched
+    def reveal_tile(self, row, col):
+        """Reveals the selected tile and triggers flood-fill for tiles with no neighboring bombs."""
+        if not self.start_time:
+            self.start_time = time.time()
+
+        bit = 1 << (row * self.cols + col)
+        if self.revealed & bit or self.game_over:
+            return
+
+        if self.mines & bit:
+            self.game_over = True
+            self.end_time = time.time()
+            self.events.emit("lose", (row, col), "M")
+            return "M"
+
+        self._flood_fill(bit)
+
+        return self.grid[row][col]
+
+    def _flood_fill(self, seeds):
+        """Opens the seed tiles and grows through zero tiles one whole-board layer at a time."""
+        before = self.revealed
+        new = seeds & ~self.revealed
+        if not new:
+            return
+        while new:
+            self.revealed |= new
+            new = self._spread(new & self.zero_mask) & ~self.revealed
+        # One count per fill; counting every layer costs more on open boards.
+        revealed_count = self.revealed.bit_count()
+        opened = revealed_count - self.revealed_count
+        self.revealed_count = revealed_count
+        self.safe_remaining -= opened
+        if self.flagged:
+            # Flagged cells the fill opened were already not hidden.
+            revealed_flags = (self.flagged & self.revealed).bit_count()
+            opened -= revealed_flags - self.revealed_flags
+            self.revealed_flags = revealed_flags
+        self.hidden_count -= opened
+        if self.events.subscribers:
+            self._emit_cells("reveal", self.revealed ^ before, with_value=True)
+
+    @batched
+    def flag_tile(self, row, col):
+        """Flags or unflags a tile and updates the flag counter."""
+        bit = 1 << (row * self.cols + col)
+        if self.flagged & bit:
+            self.flagged &= ~bit
+            self.flags_remaining += 1
+            self._count_flag(bit, -1)
+            self.events.emit("unflag", (row, col))
+        elif self.flags_remaining > 0:
+            self.flagged |= bit
+            self.flags_remaining -= 1
+            self._count_flag(bit, 1)
+            self.events.emit("flag", (row, col))
+
+    def _count_flag(self, bit, change):
+        """Updates the running totals for a flag placed (change 1) or removed (change -1) on one cell."""
+        if self.mines & bit:
+            self.flagged_mines += change
+        else:
+            self.wrong_flags += change
+        if self.revealed & bit:
+            self.revealed_flags += change
+        else:
+            self.hidden_count -= change
+
+    @batched
+    def handle_number_click(self, row, col):
+        """Handles clicks on already opened blocks with numbers."""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return False
+        bit = 1 << (row * self.cols + col)
+        tile_value = self._tile(row * self.cols + col)
+        if not self.revealed & bit or not tile_value.isdigit():
+            return False
+
+        around = self._spread(bit) & ~bit
+        if (around & self.flagged).bit_count() == int(tile_value):
+            targets = around & ~self.flagged
+            if not targets & self.mines:
+                if not self.game_over:
+                    self._flood_fill(targets)
+                return False
+            # Open neighbours in the set backend's order until the mine is hit.
+            for dr, dc in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
+                nr, nc = row + dr, col + dc
+                if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                    neighbor = 1 << (nr * self.cols + nc)
+                    if targets & neighbor:
+                        if self.mines & neighbor:
+                            self.game_over = True
+                            self.events.emit("lose", (nr, nc), "M")
+                            return True
+                        if not self.game_over:
+                            self._flood_fill(neighbor)
+        return False
+
+    @batched
+    def auto_place_flags(self):
+        """
+        Automatically places flags on all remaining unrevealed tiles
+        if the number of unrevealed tiles equals the number of flags remaining.
+        """
+        if self.hidden_count == self.flags_remaining:
+            unrevealed = self.full_mask & ~self.revealed & ~self.flagged
+            self.flagged |= unrevealed
+            placed_on_mines = (unrevealed & self.mines).bit_count()
+            self.flagged_mines += placed_on_mines
+            self.wrong_flags += self.hidden_count - placed_on_mines
+            self.hidden_count = 0
+            if self.events.subscribers:
+                self._emit_cells("flag", unrevealed)
+            self.end_time = time.time()
+            self.game_over = True
+            result = "win" if self._all_mines_flagged() else "lose"
+            self.events.emit(result)
+            return result
+        return None
+
+    def _all_mines_flagged(self):
+        """True when the flags are exactly the mines."""
+        return self.wrong_flags == 0 and self.flagged_mines == self.mine_count
+
+    @batched
+    def check_win(self):
+        """Checks if the player has won the game."""
+        if self.safe_remaining == 0:
+            if self._all_mines_flagged():
+                self.end_time = time.time()
+                if not self.game_over:
+                    self.events.emit("win")
+                self.game_over = True
+                return True
+        return False
+
+    def is_game_over(self):
+        """Checks if the game is over."""
+        return self.game_over
+
+    def get_elapsed_time(self):
+        """Returns the elapsed time in seconds since the game started."""
+        if not self.start_time:
+            return 0
+        return int(time.time() - self.start_time)
+
+    def get_end_time(self):
+        """Returns the total time the game lasted."""
+        if self.end_time:
+            return int(self.end_time - self.start_time)
+        return 0
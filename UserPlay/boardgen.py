@@ -0,0 +1,96 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for array-based board generation.
+    np = None
+
+# Value stored for a mine in a generated board; 0-8 are neighbour counts.
+MINE = 9
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("NumPy is required for array-based board generation: pip install numpy")
+
+
+def generate_board(rows, cols, num_mines, seed=None):
+    """
+    Builds a rows x cols uint8 board with num_mines mines (value MINE) and every
+    other cell holding its neighbouring mine count, using whole-array operations.
+    """
+    _require_numpy()
+    if not 0 <= num_mines <= rows * cols:
+        raise ValueError(f"Cannot place {num_mines} mines on a {rows}x{cols} board")
+    rng = np.random.default_rng(seed)
+    mines = np.zeros(rows * cols, dtype=bool)
+    mines[rng.choice(rows * cols, size=num_mines, replace=False)] = True
+    return board_from_mines(mines.reshape(rows, cols))
+
+
+def board_from_mines(mines):
+    """Computes the uint8 board for a boolean mine mask with a padded 3x3 neighbourhood sum."""
+    _require_numpy()
+    mines = np.asarray(mines, dtype=bool)
+    rows, cols = mines.shape
+    padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = mines
+    board = np.zeros((rows, cols), dtype=np.uint8)
+    for dr in range(3):
+        for dc in range(3):
+            if dr != 1 or dc != 1:
+                board += padded[dr:dr + rows, dc:dc + cols]
+    board[mines] = MINE
+    return board
+
+
+def board_from_positions(rows, cols, positions):
+    """Pure-Python board (list of lists, same values as generate_board) for the given mine cells."""
+    board = [[0] * cols for _ in range(rows)]
+    for row, col in positions:
+        for nr in range(max(row - 1, 0), min(row + 2, rows)):
+            for nc in range(max(col - 1, 0), min(col + 2, cols)):
+                board[nr][nc] += 1
+    for row, col in positions:
+        board[row][col] = MINE
+    return board
+
+
+def board_dimensions(grid_size, rows=None, cols=None, board=None):
+    """Returns a backend's (rows, cols): the board's shape if one is given, else rows and cols defaulting to grid_size."""
+    if board is not None:
+        return len(board), len(board[0])
+    return (grid_size if rows is None else rows), (grid_size if cols is None else cols)
+
+
+def board_to_grid(board, zero="0"):
+    """Converts a generated board into the backends' list-of-lists of one-character strings."""
+    glyphs = [zero, "1", "2", "3", "4", "5", "6", "7", "8", "M"]
+    if hasattr(board, "tolist"):
+        board = board.tolist()
+    return [[glyphs[value] for value in row] for row in board]
+
+
+def grid_to_board(grid):
+    """Converts a backend's grid of one-character strings back into a list-of-lists board."""
+    return [[MINE if tile == "M" else int(tile) if tile.isdigit() else 0 for tile in row] for row in grid]
+
+
+def mine_positions(board):
+    """Returns the set of (row, col) mine positions of a generated board."""
+    if np is not None and hasattr(board, "shape"):
+        rows, cols = np.nonzero(board == MINE)
+        return set(zip(rows.tolist(), cols.tolist()))
+    return {(r, c) for r, row in enumerate(board) for c, value in enumerate(row) if value == MINE}
+
+
+def mine_mask(board):
+    """Packs a generated board's mines into an integer bitmask (bit row * cols + col)."""
+    if np is not None and hasattr(board, "shape"):
+        packed = np.packbits((np.asarray(board) == MINE).ravel(), bitorder="little")
+        return int.from_bytes(packed.tobytes(), "little")
+    mask = 0
+    cols = len(board[0]) if board else 0
+    for r, row in enumerate(board):
+        for c, value in enumerate(row):
+            if value == MINE:
+                mask |= 1 << (r * cols + c)
+    return mask
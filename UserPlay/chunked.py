@@ -0,0 +1,311 @@
+import random
+import time
+from collections.abc import Set
+
+from UserPlay.boardgen import MINE, board_dimensions
+from UserPlay.events import EventStream, batched
+
+# Tile strings for board values 0-9, as the set backend stores them.
+GLYPHS = (" ", "1", "2", "3", "4", "5", "6", "7", "8", "M")
+
+
+class MineView(Set):
+    """Live (row, col) set of the game's mines; membership only generates the chunk asked about."""
+
+    def __init__(self, game):
+        self._game = game
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __contains__(self, cell):
+        row, col = cell
+        game = self._game
+        return 0 <= row < game.rows and 0 <= col < game.cols and game._value(row, col) == MINE
+
+    def __iter__(self):
+        """Walks every chunk of the board, generating all of them; only sensible for small boards."""
+        game = self._game
+        size = game.chunk_size
+        for chunk_row in range(-(-game.rows // size)):
+            for chunk_col in range(-(-game.cols // size)):
+                layout = game._layout(chunk_row, chunk_col)
+                for index, mine in enumerate(layout):
+                    if mine:
+                        local_row, local_col = divmod(index, size)
+                        yield chunk_row * size + local_row, chunk_col * size + local_col
+
+    def __len__(self):
+        return self._game.num_mines
+
+    def __repr__(self):
+        return f"MineView({self._game.num_mines} mines)"
+
+
+class ChunkedRow:
+    def __init__(self, game, row):
+        self._game = game
+        self._row = row
+
+    def __getitem__(self, col):
+        return GLYPHS[self._game._value(self._row, col)]
+
+    def __len__(self):
+        return self._game.cols
+
+    def __iter__(self):
+        return (self[col] for col in range(self._game.cols))
+
+
+class ChunkedGrid:
+    def __init__(self, game):
+        self._game = game
+
+    def __getitem__(self, row):
+        return ChunkedRow(self._game, row)
+
+    def __len__(self):
+        return self._game.rows
+
+    def __iter__(self):
+        return (self[row] for row in range(self._game.rows))
+
+
+class ChunkedMinesweeper:
+    """
+    Drop-in replacement for backend.Minesweeper for boards far larger than memory.
+    The board is cut into chunk_size x chunk_size chunks.  Each chunk's mines are
+    drawn from a generator seeded with (seed, chunk row, chunk col) the first time
+    a reveal, flood fill or grid lookup touches it or its neighbour, so the same
+    seed always gives the same board and memory grows with the explored area only.
+    Every chunk holds round(num_mines / (rows * cols) * chunk area) mines, so
+    num_mines is adjusted to the total of those.
+    """
+
+    def __init__(self, grid_size=10, num_mines=10, board=None, seed=None, rows=None, cols=None, chunk_size=64):
+        if board is not None:
+            raise ValueError("ChunkedMinesweeper generates its own board; use backend.Minesweeper for a given one")
+        self.rows, self.cols = board_dimensions(grid_size, rows, cols)
+        self.grid_size = self.rows if self.rows == self.cols else None
+        self.chunk_size = chunk_size
+        self.density = num_mines / (self.rows * self.cols)
+        # Chunks are generated long after construction, so even an unseeded game fixes its seed now.
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.num_mines = self._count_mines()
+        self.flags_remaining = self.num_mines
+        self.revealed_tiles = set()
+        self.flags = set()
+        self.flagged_mines = 0
+        self.game_over = False
+        self.start_time = None
+        self.end_time = None
+        self.events = EventStream()
+        # Mine layouts (bytearrays of 0/1) and finished boards (bytearrays of 0-9) by (chunk row, chunk col).
+        self.layouts = {}
+        self.chunks = {}
+        self.grid = ChunkedGrid(self)
+        self.mine_positions = MineView(self)
+
+    def _chunk_mines(self, height, width):
+        return round(self.density * height * width)
+
+    def _count_mines(self):
+        """Sums the mines of every chunk without generating any: chunks only differ in their clipped size."""
+        size = self.chunk_size
+        full_rows, last_rows = divmod(self.rows, size)
+        full_cols, last_cols = divmod(self.cols, size)
+        total = 0
+        for chunks_down, height in ((full_rows, size), (1 if last_rows else 0, last_rows)):
+            for chunks_across, width in ((full_cols, size), (1 if last_cols else 0, last_cols)):
+                total += chunks_down * chunks_across * self._chunk_mines(height, width)
+        return total
+
+    def _layout(self, chunk_row, chunk_col):
+        """The chunk's mines, indexed local_row * chunk_size + local_col; generated on first use."""
+        layout = self.layouts.get((chunk_row, chunk_col))
+        if layout is None:
+            size = self.chunk_size
+            height = min(size, self.rows - chunk_row * size)
+            width = min(size, self.cols - chunk_col * size)
+            layout = bytearray(size * size)
+            if height > 0 and width > 0:
+                rng = random.Random(f"{self.seed}:{chunk_row}:{chunk_col}")
+                for index in rng.sample(range(height * width), self._chunk_mines(height, width)):
+                    local_row, local_col = divmod(index, width)
+                    layout[local_row * size + local_col] = 1
+            self.layouts[(chunk_row, chunk_col)] = layout
+        return layout
+
+    def _chunk(self, chunk_row, chunk_col):
+        """The chunk's board values (neighbour counts, MINE for mines), counted from it and its eight neighbours."""
+        chunk = self.chunks.get((chunk_row, chunk_col))
+        if chunk is not None:
+            return chunk
+        size = self.chunk_size
+        padded_size = size + 2
+        # The chunk's mines with a one-cell border taken from the neighbouring chunks.
+        padded = bytearray(padded_size * padded_size)
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                neighbor_row, neighbor_col = chunk_row + dr, chunk_col + dc
+                if neighbor_row < 0 or neighbor_col < 0 or neighbor_row * size >= self.rows \
+                        or neighbor_col * size >= self.cols:
+                    continue
+                layout = self._layout(neighbor_row, neighbor_col)
+                local_rows = range(size) if dr == 0 else [size - 1] if dr < 0 else [0]
+                local_cols = range(size) if dc == 0 else [size - 1] if dc < 0 else [0]
+                for local_row in local_rows:
+                    target = (dr * size + local_row + 1) * padded_size + 1 + dc * size
+                    for local_col in local_cols:
+                        padded[target + local_col] = layout[local_row * size + local_col]
+        chunk = bytearray(size * size)
+        for local_row in range(size):
+            above = local_row * padded_size
+            middle = above + padded_size
+            below = middle + padded_size
+            for local_col in range(size):
+                if padded[middle + local_col + 1]:
+                    chunk[local_row * size + local_col] = MINE
+                else:
+                    chunk[local_row * size + local_col] = (
+                        padded[above + local_col] + padded[above + local_col + 1] + padded[above + local_col + 2]
+                        + padded[middle + local_col] + padded[middle + local_col + 2]
+                        + padded[below + local_col] + padded[below + local_col + 1] + padded[below + local_col + 2])
+        self.chunks[(chunk_row, chunk_col)] = chunk
+        return chunk
+
+    def _value(self, row, col):
+        size = self.chunk_size
+        chunk_row, local_row = divmod(row, size)
+        chunk_col, local_col = divmod(col, size)
+        chunk = self.chunks.get((chunk_row, chunk_col)) or self._chunk(chunk_row, chunk_col)
+        return chunk[local_row * size + local_col]
+
+    def subscribe(self, callback):
+        """Registers callback(events) to receive each action's changes; see UserPlay.events."""
+        return self.events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.events.unsubscribe(callback)
+
+    @batched
+    def reveal_tile(self, row, col):
+        """Reveals the selected tile and triggers flood-fill for tiles with no neighboring bombs."""
+        if not self.start_time:
+            self.start_time = time.time()
+
+        if (row, col) in self.revealed_tiles or self.game_over:
+            return
+
+        if self._value(row, col) == MINE:
+            self.game_over = True
+            self.end_time = time.time()
+            self.events.emit("lose", (row, col), "M")
+            return "M"
+
+        self._flood_fill(row, col)
+
+        return self.grid[row][col]
+
+    def _flood_fill(self, row, col):
+        """Opens the tile and every tile reachable through tiles with no neighbouring mines."""
+        stack = [(row, col)]
+        while stack:
+            row, col = stack.pop()
+            if not (0 <= row < self.rows and 0 <= col < self.cols) or (row, col) in self.revealed_tiles:
+                continue
+            self.revealed_tiles.add((row, col))
+            value = self._value(row, col)
+            self.events.emit("reveal", (row, col), GLYPHS[value])
+            if value == 0:
+                for dr, dc in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
+                    stack.append((row + dr, col + dc))
+
+    @batched
+    def flag_tile(self, row, col):
+        """Flags or unflags a tile and updates the flag counter."""
+        if (row, col) in self.flags:
+            self.flags.remove((row, col))
+            self.flags_remaining += 1
+            if self._value(row, col) == MINE:
+                self.flagged_mines -= 1
+            self.events.emit("unflag", (row, col))
+        elif self.flags_remaining > 0:
+            self.flags.add((row, col))
+            self.flags_remaining -= 1
+            if self._value(row, col) == MINE:
+                self.flagged_mines += 1
+            self.events.emit("flag", (row, col))
+
+    def _all_mines_flagged(self):
+        return self.flagged_mines == self.num_mines == len(self.flags)
+
+    @batched
+    def handle_number_click(self, row, col):
+        """Handles clicks on already opened blocks with numbers."""
+        if (row, col) not in self.revealed_tiles:
+            return False
+        value = self._value(row, col)
+        if value in (0, MINE):
+            return False
+
+        neighbors = [(row + dr, col + dc) for dr, dc in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1),
+                                                          (1, 0), (1, 1)]
+                     if 0 <= row + dr < self.rows and 0 <= col + dc < self.cols]
+        if sum(1 for cell in neighbors if cell in self.flags) == value:
+            for nr, nc in neighbors:
+                if (nr, nc) not in self.flags:
+                    if self._value(nr, nc) == MINE:
+                        self.game_over = True
+                        self.events.emit("lose", (nr, nc), "M")
+                        return True
+                    self.reveal_tile(nr, nc)
+        return False
+
+    @batched
+    def auto_place_flags(self):
+        """
+        Automatically places flags on all remaining unrevealed tiles
+        if the number of unrevealed tiles equals the number of flags remaining.
+        """
+        unrevealed_count = self.rows * self.cols - len(self.revealed_tiles) - len(self.flags)
+        if unrevealed_count != self.flags_remaining:
+            return None
+        # Only reached at the very end of a game, so walking the whole board here is fine.
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if (row, col) not in self.revealed_tiles and (row, col) not in self.flags:
+                    self.flag_tile(row, col)
+        self.end_time = time.time()
+        self.game_over = True
+        result = "win" if self._all_mines_flagged() else "lose"
+        self.events.emit(result)
+        return result
+
+    @batched
+    def check_win(self):
+        """Checks if the player has won the game."""
+        if len(self.revealed_tiles) + len(self.flags) == self.rows * self.cols and self._all_mines_flagged():
+            self.end_time = time.time()
+            if not self.game_over:
+                self.events.emit("win")
+            self.game_over = True
+            return True
+        return False
+
+    def is_game_over(self):
+        """Checks if the game is over."""
+        return self.game_over
+
+    def get_elapsed_time(self):
+        """Returns the elapsed time in seconds since the game started."""
+        if not self.start_time:
+            return 0
+        return int(time.time() - self.start_time)
+
+    def get_end_time(self):
+        """Returns the total time the game lasted."""
+        if self.end_time:
+            return int(self.end_time - self.start_time)
+        return 0
@@ -0,0 +1,156 @@
+"""
+Named sets of pre-generated boards stored in one compact binary file.
+
+Each board is kept as its packed mine bitmask (bit row * cols + col), so an
+expert board takes 60 bytes and loading a file is a single read; boards are
+only decoded when asked for.  Usage:
+
+    python -m UserPlay.corpus boards.msc beginner:1000 expert:500 big=50x50x400:100 --seed 7
+    python -m UserPlay.corpus boards.msc --list
+"""
+import argparse
+import random
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from UserPlay.boardgen import board_from_positions
+
+MAGIC = b"MSCORP1\n"
+# name length, rows, cols, mines, board count, seed
+SET_HEADER = struct.Struct("<HIIIIq")
+
+PRESETS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+
+class BoardSet:
+    """count boards of one size, stored back to back as packed mine bitmasks."""
+
+    def __init__(self, name, rows, cols, num_mines, seed, data):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.seed = seed
+        self.data = data
+        self.stride = (rows * cols + 7) // 8
+
+    def __len__(self):
+        return len(self.data) // self.stride
+
+    def mask(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(f"{self.name} has {len(self)} boards")
+        start = index * self.stride
+        return int.from_bytes(self.data[start:start + self.stride], "little")
+
+    def mine_positions(self, index):
+        bits = self.mask(index)
+        positions = set()
+        while bits:
+            low = bits & -bits
+            positions.add(divmod(low.bit_length() - 1, self.cols))
+            bits ^= low
+        return positions
+
+    def board(self, index):
+        """The board as a list of lists, ready for any backend's board argument."""
+        return board_from_positions(self.rows, self.cols, self.mine_positions(index))
+
+
+def generate_set(name, rows, cols, num_mines, count, seed=0):
+    """Generates count boards from one seeded random.Random; the same arguments give the same set."""
+    if not 0 <= num_mines <= rows * cols:
+        raise ValueError(f"Cannot place {num_mines} mines on a {rows}x{cols} board")
+    rng = random.Random(seed)
+    stride = (rows * cols + 7) // 8
+    data = bytearray(stride * count)
+    for board in range(count):
+        base = board * stride
+        for index in rng.sample(range(rows * cols), num_mines):
+            data[base + (index >> 3)] |= 1 << (index & 7)
+    return BoardSet(name, rows, cols, num_mines, seed, bytes(data))
+
+
+def save_corpus(path, board_sets):
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(board_sets)))
+        for board_set in board_sets:
+            name = board_set.name.encode("utf-8")
+            f.write(SET_HEADER.pack(len(name), board_set.rows, board_set.cols, board_set.num_mines,
+                                    len(board_set), board_set.seed))
+            f.write(name)
+            f.write(board_set.data)
+
+
+def load_corpus(path):
+    """Returns {name: BoardSet} in file order."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a board corpus")
+    view = memoryview(raw)
+    offset = len(MAGIC)
+    (set_count,) = struct.unpack_from("<I", raw, offset)
+    offset += 4
+    board_sets = {}
+    for _ in range(set_count):
+        name_length, rows, cols, num_mines, count, seed = SET_HEADER.unpack_from(raw, offset)
+        offset += SET_HEADER.size
+        name = bytes(view[offset:offset + name_length]).decode("utf-8")
+        offset += name_length
+        size = count * ((rows * cols + 7) // 8)
+        board_sets[name] = BoardSet(name, rows, cols, num_mines, seed, view[offset:offset + size])
+        offset += size
+    return board_sets
+
+
+def parse_spec(spec):
+    """Parses "preset:count" or "name=ROWSxCOLSxMINES:count" into (name, rows, cols, mines, count)."""
+    head, _, count = spec.rpartition(":")
+    if not head:
+        raise ValueError(f"Missing board count in {spec!r}")
+    if "=" in head:
+        name, _, size = head.partition("=")
+        rows, cols, mines = (int(part) for part in size.lower().split("x"))
+    elif head in PRESETS:
+        name = head
+        rows, cols, mines = PRESETS[head]
+    else:
+        raise ValueError(f"Unknown preset {head!r}; use one of {sorted(PRESETS)} or name=ROWSxCOLSxMINES")
+    return name, rows, cols, mines, int(count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate or inspect a named board corpus.")
+    parser.add_argument("path")
+    parser.add_argument("sets", nargs="*", help='"preset:count" or "name=ROWSxCOLSxMINES:count"')
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first set; set i uses seed + i.")
+    parser.add_argument("--list", action="store_true", help="Print the sets stored in path.")
+    args = parser.parse_args(argv)
+
+    if not args.list:
+        if not args.sets:
+            parser.error("give at least one set to generate, or --list")
+        try:
+            specs = [parse_spec(spec) for spec in args.sets]
+        except ValueError as error:
+            parser.error(str(error))
+        board_sets = [generate_set(name, rows, cols, mines, count, args.seed + i)
+                      for i, (name, rows, cols, mines, count) in enumerate(specs)]
+        save_corpus(args.path, board_sets)
+
+    for board_set in load_corpus(args.path).values():
+        print(f"{board_set.name}: {len(board_set)} boards, {board_set.rows}x{board_set.cols}, "
+              f"{board_set.num_mines} mines, seed {board_set.seed}")
+
+
+if __name__ == "__main__":
+    main()
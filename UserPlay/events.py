@@ -0,0 +1,64 @@
+import functools
+from collections import namedtuple
+
+# kind is one of:
+#   "reveal"  cell was opened, value is its grid value ("M" for a mine)
+#   "hide"    a reveal was rolled back (CSP backend only)
+#   "flag"    flag placed on cell
+#   "unflag"  flag removed from cell
+#   "win"     game won, cell is None
+#   "lose"    game lost, cell is the mine that ended it (None if unknown)
+GameEvent = namedtuple("GameEvent", ["kind", "cell", "value"])
+
+
+class EventStream:
+    """
+    Collects the events of one game action and hands them to every subscriber
+    as a single list once the action finishes.  Actions that call other actions
+    (a number click revealing its neighbours) still produce one batch.
+    Nothing is recorded while nobody is subscribed.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self.pending = []
+        self.depth = 0
+
+    def subscribe(self, callback):
+        """Calls callback(events) after every action that changed the game; returns callback."""
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def emit(self, kind, cell=None, value=None):
+        if not self.subscribers:
+            return
+        self.pending.append(GameEvent(kind, cell, value))
+        if not self.depth:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch = self.pending
+        self.pending = []
+        for callback in list(self.subscribers):
+            callback(batch)
+
+
+def batched(method):
+    """Decorator for game methods whose events should reach subscribers as one batch."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        events = self.events
+        events.depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            events.depth -= 1
+            if not events.depth and events.pending:
+                events.flush()
+    return wrapper
@@ -0,0 +1,308 @@
+"""
+Boards that can be solved from a known safe first click without ever guessing.
+
+Candidates keep the first click and its neighbours free of mines, so the first
+click always opens an area.  Each candidate is then played by a deterministic
+solver that only makes certain moves: single-number rules, the subset rule for
+pairs of numbers, and the total mine count.  Candidates are checked across a
+process pool.  Accepted boards are stored as a board corpus (see
+UserPlay.corpus), so a cache file can also be played with the runner's --corpus.
+
+    python -m UserPlay.noguess expert --count 200
+    python -m UserPlay.noguess 6x6x12 --count 50 --first-click 0,0
+"""
+import argparse
+import functools
+import multiprocessing
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from UserPlay.corpus import PRESETS, BoardSet, load_corpus, save_corpus
+
+DEFAULT_CACHE = Path(__file__).resolve().parent.parent / "board_cache"
+
+# Candidates checked per pool round; rounds stop as soon as enough boards were accepted.
+ROUND_SIZE = 256
+
+
+def default_first_click(rows, cols):
+    return rows // 2, cols // 2
+
+
+def set_name(first_click):
+    return f"noguess-r{first_click[0]}c{first_click[1]}"
+
+
+def first_click_of(name):
+    """The first click encoded in a no-guess board set's name, or None for other sets."""
+    match = re.fullmatch(r"noguess-r(\d+)c(\d+)", name or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+@functools.lru_cache(maxsize=16)
+def _neighbor_table(rows, cols):
+    """Neighbour cell indexes (row * cols + col) of every cell."""
+    table = []
+    for row in range(rows):
+        for col in range(cols):
+            table.append(tuple(nr * cols + nc
+                               for nr in range(max(row - 1, 0), min(row + 2, rows))
+                               for nc in range(max(col - 1, 0), min(col + 2, cols))
+                               if nr != row or nc != col))
+    return table
+
+
+def solves_without_guessing(rows, cols, mines, first_click):
+    """
+    Plays the board with mines (cell indexes) from first_click using certain
+    deductions only; returns True if that opens every safe cell.
+    """
+    neighbors = _neighbor_table(rows, cols)
+    size = rows * cols
+    is_mine = bytearray(size)
+    for index in mines:
+        is_mine[index] = 1
+    start = first_click[0] * cols + first_click[1]
+    if is_mine[start]:
+        return False
+    counts = [sum(is_mine[n] for n in neighbors[index]) for index in range(size)]
+
+    # 0 unknown, 1 revealed, 2 known mine
+    state = bytearray(size)
+    safe_left = size - len(mines)
+    mines_left = len(mines)
+    # Revealed numbers to look at again because a neighbour changed.
+    todo = []
+
+    def reveal(index):
+        nonlocal safe_left
+        stack = [index]
+        while stack:
+            cell = stack.pop()
+            if state[cell]:
+                continue
+            state[cell] = 1
+            safe_left -= 1
+            if counts[cell]:
+                todo.append(cell)
+            else:
+                stack.extend(n for n in neighbors[cell] if not state[n])
+            todo.extend(n for n in neighbors[cell] if state[n] == 1 and counts[n])
+
+    def mark(index):
+        nonlocal mines_left
+        state[index] = 2
+        mines_left -= 1
+        todo.extend(n for n in neighbors[index] if state[n] == 1 and counts[n])
+
+    def constraint(cell):
+        unknown = [n for n in neighbors[cell] if not state[n]]
+        return unknown, counts[cell] - sum(1 for n in neighbors[cell] if state[n] == 2)
+
+    reveal(start)
+    while safe_left:
+        # Single numbers: all of a number's unknown neighbours are safe, or all are mines.
+        while todo:
+            cell = todo.pop()
+            unknown, remaining = constraint(cell)
+            if not unknown:
+                continue
+            if remaining == 0:
+                for n in unknown:
+                    reveal(n)
+            elif remaining == len(unknown):
+                for n in unknown:
+                    mark(n)
+        if not safe_left:
+            break
+
+        # Pairs of numbers: if A's unknown cells are a subset of B's, the difference holds B - A mines.
+        frontier = {}
+        for cell in range(size):
+            if state[cell] == 1 and counts[cell]:
+                unknown, remaining = constraint(cell)
+                if unknown:
+                    frontier[cell] = (frozenset(unknown), remaining)
+        progress = False
+        for cell, (unknown, remaining) in frontier.items():
+            nearby = {m for n in unknown for m in neighbors[n] if m != cell and m in frontier}
+            for other in nearby:
+                other_unknown, other_remaining = frontier[other]
+                if unknown < other_unknown:
+                    extra = other_unknown - unknown
+                    extra_mines = other_remaining - remaining
+                    if extra_mines == 0:
+                        for n in extra:
+                            if not state[n]:
+                                reveal(n)
+                        progress = True
+                    elif extra_mines == len(extra):
+                        for n in extra:
+                            if not state[n]:
+                                mark(n)
+                        progress = True
+            if progress:
+                break
+        if progress:
+            continue
+
+        # The mine count: with every mine found, the remaining cells are safe.
+        if mines_left == 0:
+            for cell in range(size):
+                if not state[cell]:
+                    reveal(cell)
+            continue
+        return False
+    return True
+
+
+def _candidate(task):
+    """Worker: the packed mine bitmask of candidate number index if it needs no guess, else None."""
+    rows, cols, num_mines, first_click, seed, index = task
+    rng = random.Random(f"noguess:{seed}:{index}")
+    row, col = first_click
+    opening = {nr * cols + nc
+               for nr in range(max(row - 1, 0), min(row + 2, rows))
+               for nc in range(max(col - 1, 0), min(col + 2, cols))}
+    mines = rng.sample([cell for cell in range(rows * cols) if cell not in opening], num_mines)
+    if not solves_without_guessing(rows, cols, mines, first_click):
+        return None
+    packed = bytearray((rows * cols + 7) // 8)
+    for cell in mines:
+        packed[cell >> 3] |= 1 << (cell & 7)
+    return bytes(packed)
+
+
+def generate_no_guess(rows, cols, num_mines, count, first_click=None, seed=0, workers=None, max_candidates=None):
+    """
+    Returns a BoardSet of count boards that need no guess from first_click
+    (default: the centre).  Candidates are checked across workers processes
+    (1 runs in this process); the same seed gives the same boards for any number
+    of workers.  Raises RuntimeError if max_candidates were tried without success.
+    """
+    first_click = first_click or default_first_click(rows, cols)
+    if not (0 <= first_click[0] < rows and 0 <= first_click[1] < cols):
+        raise ValueError(f"First click {first_click} is outside a {rows}x{cols} board")
+    opening = (min(first_click[0] + 2, rows) - max(first_click[0] - 1, 0)) * \
+              (min(first_click[1] + 2, cols) - max(first_click[1] - 1, 0))
+    if not 0 <= num_mines <= rows * cols - opening:
+        raise ValueError(f"Cannot place {num_mines} mines on a {rows}x{cols} board and keep the first click open")
+
+    found = []
+    tried = 0
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+        check = functools.partial(pool.map, chunksize=16) if pool else lambda f, tasks: list(map(f, tasks))
+        while len(found) < count:
+            if max_candidates is not None and tried >= max_candidates:
+                raise RuntimeError(f"Only {len(found)} of {count} boards needed no guess after {tried} candidates")
+            tasks = [(rows, cols, num_mines, first_click, seed, index) for index in range(tried, tried + ROUND_SIZE)]
+            tried += ROUND_SIZE
+            found.extend(packed for packed in check(_candidate, tasks) if packed is not None)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return BoardSet(set_name(first_click), rows, cols, num_mines, seed, b"".join(found[:count]))
+
+
+class BoardCache:
+    """
+    A directory of no-guess boards, one corpus file per (rows, cols, mines,
+    first click).  fill() generates boards ahead of time; take() hands them out
+    one at a time and generates one on the spot if the file is empty.  Files are
+    replaced, not locked, so only one process should take from a file at once.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE):
+        self.directory = Path(directory)
+
+    def path(self, rows, cols, num_mines, first_click=None):
+        row, col = first_click or default_first_click(rows, cols)
+        return self.directory / f"{rows}x{cols}x{num_mines}-r{row}c{col}.msc"
+
+    def load(self, rows, cols, num_mines, first_click=None):
+        """The cached BoardSet, or None if nothing is cached for this configuration."""
+        path = self.path(rows, cols, num_mines, first_click)
+        if not path.exists():
+            return None
+        return next(iter(load_corpus(path).values()))
+
+    def available(self, rows, cols, num_mines, first_click=None):
+        board_set = self.load(rows, cols, num_mines, first_click)
+        return len(board_set) if board_set else 0
+
+    def _save(self, path, board_set):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        save_corpus(temporary, [board_set])
+        os.replace(temporary, path)
+
+    def fill(self, rows, cols, num_mines, count, first_click=None, workers=None, seed=None):
+        """Generates count more boards into the cache; returns how many are cached now."""
+        first_click = first_click or default_first_click(rows, cols)
+        if seed is None:
+            seed = random.getrandbits(63)
+        new = generate_no_guess(rows, cols, num_mines, count, first_click, seed, workers)
+        old = self.load(rows, cols, num_mines, first_click)
+        if old is not None:
+            new = BoardSet(new.name, rows, cols, num_mines, old.seed, bytes(old.data) + bytes(new.data))
+        self._save(self.path(rows, cols, num_mines, first_click), new)
+        return len(new)
+
+    def take(self, rows, cols, num_mines, first_click=None):
+        """
+        Removes one board from the cache and returns (board, first_click); the
+        board is a list of lists for any backend's board argument.
+        """
+        first_click = first_click or default_first_click(rows, cols)
+        board_set = self.load(rows, cols, num_mines, first_click)
+        if not board_set:
+            board_set = generate_no_guess(rows, cols, num_mines, 1, first_click, random.getrandbits(63), workers=1)
+            return board_set.board(0), first_click
+        last = len(board_set) - 1
+        board = board_set.board(last)
+        rest = BoardSet(board_set.name, rows, cols, num_mines, board_set.seed,
+                        bytes(board_set.data[:last * board_set.stride]))
+        self._save(self.path(rows, cols, num_mines, first_click), rest)
+        return board, first_click
+
+
+def parse_config(text):
+    """Parses a corpus preset name or ROWSxCOLSxMINES."""
+    if text in PRESETS:
+        return PRESETS[text]
+    try:
+        rows, cols, mines = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Expected a preset {sorted(PRESETS)} or ROWSxCOLSxMINES, got {text!r}") from None
+    return rows, cols, mines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the cache of boards that need no guess.")
+    parser.add_argument("config", help="Preset name or ROWSxCOLSxMINES.")
+    parser.add_argument("--count", type=int, default=100, help="Boards to add.")
+    parser.add_argument("--first-click", help="ROW,COL of the first click (default: the centre).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE))
+    args = parser.parse_args(argv)
+
+    try:
+        rows, cols, mines = parse_config(args.config)
+    except ValueError as error:
+        parser.error(str(error))
+    first_click = tuple(int(part) for part in args.first_click.split(",")) if args.first_click else None
+    cache = BoardCache(args.cache)
+    total = cache.fill(rows, cols, mines, args.count, first_click, args.workers, args.seed)
+    print(f"{cache.path(rows, cols, mines, first_click)}: {total} boards")
+
+
+if __name__ == "__main__":
+    main()
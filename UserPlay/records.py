@@ -0,0 +1,234 @@
+"""
+Compact binary game records: board, moves and outcome of each game.
+
+A record file is MAGIC followed by records back to back.  Each record is a
+varint body length and a body:
+
+    outcome byte        low bits: OUTCOMES index; 0x80 set if a mine layout follows instead of a seed
+    varint rows, cols, mines, elapsed milliseconds
+    varint + utf-8      agent name
+    zigzag varint seed  or  ceil(rows * cols / 8) bytes of packed mine bitmask (bit row * cols + col)
+    varint move count, then one varint per move: zigzag(cell - previous cell) << 2 | action
+
+Frontier-DFS games on 16x16 boards average about 110 bytes with 60 moves each.
+RecordWriter appends, RecordReader memory-maps a file for scanning, and
+iter_records streams one.
+"""
+import mmap
+import os
+
+from UserPlay.boardgen import board_from_positions
+
+MAGIC = b"MSREC1\n\x00"
+OUTCOMES = ("lose", "win", "timeout", "unfinished")
+ACTIONS = ("reveal", "flag", "unflag", "chord")
+HAS_MINES = 0x80
+
+
+def _put_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class GameRecord:
+    """
+    One finished game.  Either seed (the backends' seed argument) or mines (a
+    bitmask) identifies the board; moves is a list of (action, (row, col)).
+    """
+
+    def __init__(self, rows, cols, num_mines, outcome, moves=(), seed=None, mines=None, elapsed_ms=0, agent=""):
+        if (seed is None) == (mines is None):
+            raise ValueError("A game record needs exactly one of seed and mines")
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.outcome = outcome
+        self.moves = list(moves)
+        self.seed = seed
+        self.mines = mines
+        self.elapsed_ms = elapsed_ms
+        self.agent = agent
+
+    def mine_positions(self):
+        if self.mines is None:
+            return None
+        bits, positions = self.mines, set()
+        while bits:
+            low = bits & -bits
+            positions.add(divmod(low.bit_length() - 1, self.cols))
+            bits ^= low
+        return positions
+
+    def new_game(self, game_class):
+        """Recreates the game's starting board with one of the backends (for replay or analysis)."""
+        if self.mines is not None:
+            board = board_from_positions(self.rows, self.cols, self.mine_positions())
+            return game_class(num_mines=self.num_mines, board=board)
+        return game_class(num_mines=self.num_mines, seed=self.seed, rows=self.rows, cols=self.cols)
+
+    def encode(self):
+        body = bytearray()
+        body.append(OUTCOMES.index(self.outcome) | (HAS_MINES if self.mines is not None else 0))
+        for value in (self.rows, self.cols, self.num_mines, self.elapsed_ms):
+            _put_varint(body, value)
+        agent = self.agent.encode("utf-8")
+        _put_varint(body, len(agent))
+        body += agent
+        if self.mines is not None:
+            body += self.mines.to_bytes((self.rows * self.cols + 7) // 8, "little")
+        else:
+            _put_varint(body, _zigzag(self.seed))
+        _put_varint(body, len(self.moves))
+        previous = 0
+        for action, (row, col) in self.moves:
+            cell = row * self.cols + col
+            _put_varint(body, _zigzag(cell - previous) << 2 | ACTIONS.index(action))
+            previous = cell
+        record = bytearray()
+        _put_varint(record, len(body))
+        return bytes(record + body)
+
+    @classmethod
+    def decode(cls, buf, pos=0, with_moves=True):
+        """Decodes the record whose body length starts at buf[pos]; returns (record, position after it)."""
+        length, pos = _get_varint(buf, pos)
+        end = pos + length
+        flags = buf[pos]
+        pos += 1
+        rows, pos = _get_varint(buf, pos)
+        cols, pos = _get_varint(buf, pos)
+        num_mines, pos = _get_varint(buf, pos)
+        elapsed_ms, pos = _get_varint(buf, pos)
+        agent_length, pos = _get_varint(buf, pos)
+        agent = bytes(buf[pos:pos + agent_length]).decode("utf-8")
+        pos += agent_length
+        seed = mines = None
+        if flags & HAS_MINES:
+            size = (rows * cols + 7) // 8
+            mines = int.from_bytes(buf[pos:pos + size], "little")
+            pos += size
+        else:
+            value, pos = _get_varint(buf, pos)
+            seed = _unzigzag(value)
+        moves = []
+        if with_moves:
+            count, pos = _get_varint(buf, pos)
+            cell = 0
+            for _ in range(count):
+                value, pos = _get_varint(buf, pos)
+                cell += _unzigzag(value >> 2)
+                moves.append((ACTIONS[value & 3], divmod(cell, cols)))
+        record = cls(rows, cols, num_mines, OUTCOMES[flags & 0x7F], moves, seed, mines, elapsed_ms, agent)
+        return record, end
+
+
+class RecordWriter:
+    """Appends records to a file, writing the header first if the file is new."""
+
+    def __init__(self, path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "ab")
+        if new:
+            self.file.write(MAGIC)
+
+    def write(self, record):
+        self.file.write(record.encode())
+
+    def write_encoded(self, data):
+        """Appends bytes from GameRecord.encode(), e.g. produced in a worker process."""
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_magic(head, path):
+    if head != MAGIC:
+        raise ValueError(f"{path} is not a game record file")
+
+
+class RecordReader:
+    """Memory-maps a record file; iterate it for GameRecords, or use headers() to skip the moves."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        _check_magic(self.map[:len(MAGIC)], path)
+
+    def _scan(self, with_moves):
+        pos, end = len(MAGIC), len(self.map)
+        while pos < end:
+            record, pos = GameRecord.decode(self.map, pos, with_moves)
+            yield record
+
+    def __iter__(self):
+        return self._scan(True)
+
+    def headers(self):
+        """Yields records without decoding their moves (moves is left empty), which is much faster."""
+        return self._scan(False)
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path, chunk_size=1 << 20):
+    """Streams GameRecords from path reading chunk_size bytes at a time, without mapping the whole file."""
+    with open(path, "rb") as f:
+        _check_magic(f.read(len(MAGIC)), path)
+        buf = b""
+        while True:
+            chunk = f.read(chunk_size)
+            buf += chunk
+            pos = 0
+            while pos < len(buf):
+                try:
+                    length, body = _get_varint(buf, pos)
+                except IndexError:
+                    break
+                if body + length > len(buf):
+                    break
+                record, pos = GameRecord.decode(buf, pos)
+                yield record
+            buf = buf[pos:]
+            if not chunk:
+                if buf:
+                    raise ValueError(f"{path} ends with a truncated record")
+                return
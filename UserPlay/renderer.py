@@ -0,0 +1,83 @@
+from collections import deque
+
+import pygame
+
+
+class GlyphCache:
+    """Digit, flag and mine images rendered once for one tile size."""
+
+    def __init__(self, font, text_color, flag_image, bomb_image):
+        self.digits = {str(n): font.render(str(n), True, text_color) for n in range(9)}
+        self.flag = flag_image
+        self.bomb = bomb_image
+
+    def digit(self, tile):
+        return self.digits[tile]
+
+
+class BoardRenderer:
+    """
+    Keeps the board on a persistent surface and repaints only the cells the
+    game reported as changed (through its event stream) since the previous
+    frame, plus any cell marked dirty by the UI.  paint_cell(surface, x, y, row, col)
+    draws one cell at board-local coordinates in the UI's own style.
+    """
+
+    # Past this many dirty cells one blit of the whole board is cheaper than one per cell.
+    FULL_BLIT_THRESHOLD = 64
+
+    def __init__(self, screen, game, tile_size, top, paint_cell):
+        self.screen = screen
+        self.tile_size = tile_size
+        self.top = top
+        self.paint_cell = paint_cell
+        self.game = None
+        # Filled from the game's event callbacks, which may run on an agent thread.
+        self.changed = deque()
+        self.reset(game)
+
+    def reset(self, game):
+        """Starts tracking a (new) game and schedules a full repaint."""
+        if self.game is not None:
+            self.game.unsubscribe(self._on_events)
+        self.game = game
+        game.subscribe(self._on_events)
+        self.board = pygame.Surface((game.cols * self.tile_size, game.rows * self.tile_size))
+        self.changed.clear()
+        self.invalidate()
+
+    def _on_events(self, events):
+        self.changed.extend(event.cell for event in events if event.cell is not None)
+
+    def invalidate(self):
+        """Repaints and pushes every cell on the next draw(), e.g. after a popup covered the board."""
+        self.dirty = {(row, col) for row in range(self.game.rows) for col in range(self.game.cols)}
+        self.full_blit = True
+
+    def mark_dirty(self, cell):
+        if cell is not None:
+            self.dirty.add(cell)
+
+    def draw(self):
+        """Repaints changed cells and blits them to the screen; returns the screen rects to update."""
+        dirty = self.dirty
+        self.dirty = set()
+        changed = self.changed
+        while changed:
+            dirty.add(changed.popleft())
+        if not dirty:
+            return []
+
+        size = self.tile_size
+        for row, col in dirty:
+            if 0 <= row < self.game.rows and 0 <= col < self.game.cols:
+                self.paint_cell(self.board, col * size, row * size, row, col)
+
+        if self.full_blit or len(dirty) > self.FULL_BLIT_THRESHOLD:
+            self.full_blit = False
+            return [self.screen.blit(self.board, (0, self.top))]
+        rects = []
+        for row, col in dirty:
+            area = pygame.Rect(col * size, row * size, size, size)
+            rects.append(self.screen.blit(self.board, (area.x, area.y + self.top), area))
+        return rects
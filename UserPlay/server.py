@@ -0,0 +1,478 @@
+"""
+Asyncio HTTP and WebSocket server that plays UserPlay.backend.Minesweeper games
+for remote clients, so bots and web pages play against the same engine as the UIs.
+
+    python -m UserPlay.server --port 8765
+
+Requests and replies are JSON:
+
+    POST   /games             {"rows": 16, "cols": 30, "mines": 99, "seed": 1} -> the new game's state
+    GET    /games/<id>        the game's state
+    POST   /games/<id>/moves  {"moves": [["reveal", 8, 15], ["flag", 0, 0]]} -> what the moves changed
+    DELETE /games/<id>        ends the game
+    GET    /games/<id>/ws     WebSocket: send {"moves": [...]}, receive every change to the game
+    GET    /stats             session counts
+
+A move is [action, row, col] with action "reveal", "flag" (toggles) or "chord"
+(a click on an opened number), or ["auto_flag"].  A batch is checked before any
+of it is played and stops early when the game ends.  Changes are lists of
+UserPlay.events.GameEvent, [kind, [row, col], value], with the backend's tile
+values (" " for an empty tile).  Games nobody touched for --idle-timeout
+seconds are dropped.
+"""
+import argparse
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import secrets
+import struct
+import sys
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from UserPlay.backend import Minesweeper
+
+# Every game keeps its whole board in memory, so one request cannot ask for an unbounded one.
+# Building the largest board at the densest allowed ratio takes about a second.
+MAX_CELLS = 250000
+# Mines are placed by drawing until enough distinct cells come up, which slows down sharply on denser boards.
+MAX_MINE_RATIO = 0.5
+MAX_BODY = 1 << 20
+MAX_MOVES = 10000
+# Larger batches are played in a worker thread so they cannot hold up every other client.
+INLINE_MOVES = 64
+# Messages a WebSocket client may fall behind by before it is disconnected.
+WS_QUEUE = 256
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x8, 0x9, 0xA
+
+ACTIONS = ("reveal", "flag", "chord", "auto_flag")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Session:
+    """One game, the lock that keeps its moves in order, and the WebSocket clients watching it."""
+
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = game
+        self.lock = asyncio.Lock()
+        self.watchers = set()
+        self.result = None
+        self.pending = []
+        self.last_used = time.monotonic()
+        game.subscribe(self._collect)
+
+    def _collect(self, events):
+        self.pending.extend(events)
+        for event in events:
+            if event.kind in ("win", "lose"):
+                self.result = event.kind
+
+    def state(self):
+        game = self.game
+        return {
+            "id": self.id, "rows": game.rows, "cols": game.cols, "mines": game.num_mines,
+            "revealed": [[row, col, game.grid[row][col]] for row, col in game.revealed_tiles],
+            "flags": [[row, col] for row, col in game.flags],
+            "flags_remaining": game.flags_remaining,
+            "game_over": game.game_over, "result": self.result,
+            "elapsed": game.get_elapsed_time(),
+        }
+
+    def play(self, moves):
+        """Plays checked moves until the game ends; returns (moves played, events)."""
+        game = self.game
+        played = 0
+        for action, row, col in moves:
+            if game.game_over:
+                break
+            if action == "reveal":
+                game.reveal_tile(row, col)
+            elif action == "flag":
+                game.flag_tile(row, col)
+            elif action == "chord":
+                game.handle_number_click(row, col)
+            else:
+                game.auto_place_flags()
+            if not game.game_over:
+                game.check_win()
+            played += 1
+        events, self.pending = self.pending, []
+        return played, events
+
+
+def parse_moves(moves, rows, cols):
+    """Checks a list of moves from a client; returns [(action, row, col)] or raises HTTPError."""
+    if not isinstance(moves, list) or len(moves) > MAX_MOVES:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"moves must be a list of at most {MAX_MOVES} moves")
+    parsed = []
+    for move in moves:
+        if isinstance(move, list) and move == ["auto_flag"]:
+            parsed.append(("auto_flag", None, None))
+            continue
+        if not (isinstance(move, list) and len(move) == 3 and move[0] in ACTIONS[:3]
+                and all(type(value) is int for value in move[1:])):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bad move {move!r}; expected [action, row, col]")
+        action, row, col = move
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Move {move!r} is outside the {rows}x{cols} board")
+        parsed.append((action, row, col))
+    return parsed
+
+
+class GameServer:
+    """
+    Sessions by ID, least recently used first, so dropping idle games only
+    looks at the games that are actually idle.
+    """
+
+    def __init__(self, max_sessions=10000, idle_timeout=600.0, game_class=Minesweeper):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.game_class = game_class
+        self.sessions = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+        self._evictor = None
+
+    async def create(self, rows, cols, mines, seed=None):
+        if not all(type(value) is int for value in (rows, cols, mines)) \
+                or rows < 1 or cols < 1 or rows * cols > MAX_CELLS or not 0 <= mines <= rows * cols * MAX_MINE_RATIO:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            f"Need integer rows and cols with at most {MAX_CELLS} tiles, "
+                            f"and at most {MAX_MINE_RATIO:.0%} of the tiles mines")
+        if seed is not None and type(seed) is not int:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "seed must be an integer or null")
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many games in progress")
+        # Placing mines on a large board takes long enough to stall every other client.
+        game = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.game_class, num_mines=mines, seed=seed, rows=rows, cols=cols))
+        if len(self.sessions) >= self.max_sessions:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many games in progress")
+        session = Session(secrets.token_urlsafe(12), game)
+        self.sessions[session.id] = session
+        self.created += 1
+        return session
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No game {session_id}")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No game {session_id}")
+        for queue in list(session.watchers):
+            _close_watcher(session, queue)
+
+    def evict_idle(self):
+        """Drops every game unused for idle_timeout seconds; returns how many."""
+        cutoff = time.monotonic() - self.idle_timeout
+        dropped = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_used > cutoff:
+                break
+            self.remove(session.id)
+            dropped += 1
+        self.evicted += dropped
+        return dropped
+
+    async def play(self, session, moves):
+        """Plays a batch of moves, tells the session's WebSocket clients, and returns the reply."""
+        moves = parse_moves(moves, session.game.rows, session.game.cols)
+        async with session.lock:
+            if len(moves) > INLINE_MOVES:
+                played, events = await asyncio.get_running_loop().run_in_executor(None, session.play, moves)
+            else:
+                played, events = session.play(moves)
+            reply = {"played": played, "events": events, "game_over": session.game.game_over,
+                     "result": session.result}
+            if events and session.watchers:
+                message = _frame(WS_TEXT, _json(reply))
+                for queue in list(session.watchers):
+                    _send(session, queue, message)
+        return reply
+
+    async def state(self, session):
+        # Large batches change the game from a worker thread, so reads wait for them too.
+        async with session.lock:
+            return session.state()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Starts listening and the idle-game sweeper; returns the asyncio server."""
+        self._evictor = asyncio.create_task(self._evict_loop())
+        return await asyncio.start_server(self._connection, host, port, backlog=1024)
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout / 2, 30))
+            self.evict_idle()
+
+    async def _route(self, method, path, body):
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if parts == ["stats"] and method == "GET":
+            return HTTPStatus.OK, {"sessions": len(self.sessions), "created": self.created, "evicted": self.evicted}
+        if parts == ["games"] and method == "POST":
+            request = _parse_json(body)
+            session = await self.create(request.get("rows"), request.get("cols"), request.get("mines"), request.get("seed"))
+            return HTTPStatus.CREATED, session.state()
+        if len(parts) == 2 and parts[0] == "games":
+            if method == "GET":
+                return HTTPStatus.OK, await self.state(self.get(parts[1]))
+            if method == "DELETE":
+                self.remove(parts[1])
+                return HTTPStatus.OK, {"deleted": parts[1]}
+        if len(parts) == 3 and parts[0] == "games" and parts[2] == "moves" and method == "POST":
+            session = self.get(parts[1])
+            return HTTPStatus.OK, await self.play(session, _parse_json(body).get("moves"))
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+    async def _connection(self, reader, writer):
+        """Serves one client connection: keep-alive HTTP requests, or a WebSocket after an upgrade."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body, keep_alive = request
+                    if headers.get("upgrade", "").lower() == "websocket":
+                        await self._websocket(reader, writer, path, headers)
+                        break
+                except HTTPError as error:
+                    # The request could not be read, so the connection cannot be trusted for another one.
+                    status, payload, keep_alive = error.status, {"error": str(error)}, False
+                else:
+                    try:
+                        if method == "OPTIONS":
+                            status, payload = HTTPStatus.NO_CONTENT, None
+                        else:
+                            status, payload = await self._route(method, path, body)
+                    except HTTPError as error:
+                        status, payload = error.status, {"error": str(error)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _websocket(self, reader, writer, path, headers):
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if not (len(parts) == 3 and parts[0] == "games" and parts[2] == "ws"):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No WebSocket at {path}")
+        session = self.get(parts[1])
+        key = headers.get("sec-websocket-key")
+        if not key:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+        queue = asyncio.Queue(WS_QUEUE)
+        queue.put_nowait(_frame(WS_TEXT, _json({"state": await self.state(session)})))
+        session.watchers.add(queue)
+        sender = asyncio.create_task(_ws_sender(writer, queue))
+        message = bytearray()
+        try:
+            while not sender.done():
+                fin, opcode, payload = await _read_frame(reader)
+                if opcode == WS_CLOSE:
+                    break
+                if opcode == WS_PING:
+                    _send(session, queue, _frame(WS_PONG, payload))
+                    continue
+                if opcode == WS_PONG:
+                    continue
+                message += payload
+                if len(message) > MAX_BODY:
+                    break
+                if not fin:
+                    continue
+                try:
+                    request = _parse_json(bytes(message))
+                    session = self.get(session.id)
+                    await self.play(session, request.get("moves"))
+                except HTTPError as error:
+                    _send(session, queue, _frame(WS_TEXT, _json({"error": str(error)})))
+                message = bytearray()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            _close_watcher(session, queue)
+            await sender
+
+
+def _send(session, queue, frame):
+    """Queues a frame for one WebSocket client, disconnecting it if it has fallen too far behind."""
+    if queue not in session.watchers:
+        return
+    try:
+        queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        _close_watcher(session, queue)
+
+
+def _close_watcher(session, queue):
+    session.watchers.discard(queue)
+    while True:
+        try:
+            queue.put_nowait(None)
+            return
+        except asyncio.QueueFull:
+            queue.get_nowait()
+
+
+async def _ws_sender(writer, queue):
+    """Writes queued frames to a WebSocket client; None sends a close frame and stops."""
+    try:
+        while True:
+            frame = await queue.get()
+            if frame is None:
+                writer.write(_frame(WS_CLOSE, b""))
+                await writer.drain()
+                return
+            writer.write(frame)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _read_request(reader):
+    """Reads one HTTP request; returns (method, path, headers, body, keep_alive), or None at end of stream."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if not error.partial.strip():
+            return None
+        raise
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request head too large") from None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Bad request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Send a Content-Length instead of a chunked body")
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Bad Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Bodies are limited to {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+    return method.upper(), path, headers, body, keep_alive
+
+
+def _json(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _parse_json(body):
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON") from None
+    if not isinstance(request, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+    return request
+
+
+def _response(status, payload, keep_alive):
+    body = _json(payload) if payload is not None else b""
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def _read_frame(reader):
+    """Reads one WebSocket frame; returns (fin, opcode, unmasked payload)."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_BODY:
+        raise ConnectionError("WebSocket frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask and length:
+        # XOR the whole payload at once as one big integer instead of byte by byte.
+        key = (mask * (length // 4 + 1))[:length]
+        payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+def _frame(opcode, payload):
+    """A single unmasked server-to-client frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def serve(host, port, game_server):
+    listener = await game_server.start(host, port)
+    print(f"Serving Minesweeper on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Minesweeper games over HTTP and WebSocket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-sessions", type=int, default=10000, help="Games kept at once.")
+    parser.add_argument("--idle-timeout", type=float, default=600.0, help="Seconds before an unused game is dropped.")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, GameServer(args.max_sessions, args.idle_timeout)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
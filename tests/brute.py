@@ -0,0 +1,43 @@
+"""Brute-force answers for small boards, to check the solvers against."""
+import random
+from itertools import combinations
+
+from Probability.probability import constraints_from_game
+
+
+def layouts(game):
+    """Every placement of game.num_mines mines on the unrevealed cells that matches the visible numbers."""
+    constraints, _, _ = constraints_from_game(game, trust_flags=False)
+    unknown = [(row, col) for row in range(game.rows) for col in range(game.cols)
+               if (row, col) not in game.revealed_tiles]
+    found = []
+    for mines in combinations(unknown, game.num_mines):
+        mines = set(mines)
+        if all(sum(cell in mines for cell in cells) == count for cells, count in constraints):
+            found.append(mines)
+    return found
+
+
+def certain(game):
+    """(safe, mines): the unrevealed cells that are safe, or mines, in every matching layout."""
+    found = layouts(game)
+    unknown = {(row, col) for row in range(game.rows) for col in range(game.cols)
+               if (row, col) not in game.revealed_tiles}
+    mines = set.intersection(*found)
+    safe = unknown - set.union(*found)
+    return safe, mines
+
+
+def positions(game_class, count, rows=4, cols=5, num_mines=4):
+    """Yields games part-way through: random safe reveals on count seeded boards."""
+    for seed in range(count):
+        game = game_class(num_mines=num_mines, rows=rows, cols=cols, seed=seed)
+        mines = {(row, col) for row in range(rows) for col in range(cols) if game.grid[row][col] == "M"}
+        rng = random.Random(seed)
+        while True:
+            hidden = [(row, col) for row in range(rows) for col in range(cols)
+                      if (row, col) not in game.revealed_tiles and (row, col) not in mines]
+            if not hidden:
+                break
+            game.reveal_tile(*rng.choice(hidden))
+            yield game
@@ -0,0 +1,139 @@
+"""The set and bitboard backends, played side by side on the same seeded moves."""
+import random
+
+import pytest
+
+from UserPlay.backend import Minesweeper
+from UserPlay.bitboard import BitboardMinesweeper
+
+BACKENDS = [Minesweeper, BitboardMinesweeper]
+
+
+def random_moves(rng, game, count):
+    """
+    count random moves: chords anywhere, the odd auto-flag, and reveals and flag
+    toggles that mostly pick the right cells, so games get far enough to chord.
+    """
+    cells = [(row, col) for row in range(game.rows) for col in range(game.cols)]
+    safe = [cell for cell in cells if cell not in game.mine_positions]
+    mines = sorted(game.mine_positions)
+    moves = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.02:
+            moves.append(("auto_flag", None))
+        elif roll < 0.3:
+            moves.append(("flag", rng.choice(mines if rng.random() < 0.9 else cells)))
+        elif roll < 0.5:
+            moves.append(("chord", rng.choice(cells)))
+        else:
+            moves.append(("reveal", rng.choice(safe if rng.random() < 0.97 else cells)))
+    return moves
+
+
+def apply(game, action, cell):
+    if action == "reveal":
+        return game.reveal_tile(*cell)
+    if action == "flag":
+        return game.flag_tile(*cell)
+    if action == "chord":
+        return game.handle_number_click(*cell)
+    return game.auto_place_flags()
+
+
+def state(game):
+    return (set(game.revealed_tiles), set(game.flags), game.flags_remaining, game.game_over,
+            game.hidden_count, game.safe_remaining, game.flagged_mines, game.wrong_flags)
+
+
+def counters(game):
+    """The running totals recomputed from scratch."""
+    cells = {(row, col) for row in range(game.rows) for col in range(game.cols)}
+    mines = set(game.mine_positions)
+    flags = set(game.flags)
+    revealed = set(game.revealed_tiles)
+    return (len(cells - revealed - flags), len(cells - mines - revealed), len(flags & mines), len(flags - mines))
+
+
+def games(count, rows=6, cols=7, num_mines=7):
+    for seed in range(count):
+        yield seed, [backend(num_mines=num_mines, rows=rows, cols=cols, seed=seed) for backend in BACKENDS]
+
+
+def test_same_seed_places_the_same_mines():
+    for _, (game, bitboard) in games(50):
+        assert set(bitboard.mine_positions) == game.mine_positions
+        assert [list(row) for row in bitboard.grid] == game.grid
+
+
+def finishing_moves(game):
+    """Moves that win the game from here: clear wrong flags, open every safe cell, flag every mine."""
+    cells = [(row, col) for row in range(game.rows) for col in range(game.cols)]
+    return ([("flag", cell) for cell in cells if cell in game.flags and cell not in game.mine_positions]
+            + [("reveal", cell) for cell in cells if cell not in game.mine_positions]
+            + [("flag", cell) for cell in cells if cell in game.mine_positions and cell not in game.flags])
+
+
+def play_both(games, batches, action, cell):
+    """Plays one move on each backend and checks they agree on the result, the state and the events."""
+    game, bitboard = games
+    assert apply(game, action, cell) == apply(bitboard, action, cell)
+    assert game.check_win() == bitboard.check_win()
+    assert state(game) == state(bitboard)
+    # Flood fills may open cells in a different order.
+    assert [sorted(batch, key=repr) for batch in batches[0]] == [sorted(batch, key=repr) for batch in batches[1]]
+
+
+def test_bitboard_matches_the_set_backend():
+    won = 0
+    for seed, pair in games(200):
+        batches = ([], [])
+        for game, batch in zip(pair, batches):
+            game.subscribe(batch.append)
+        game = pair[0]
+        for action, cell in random_moves(random.Random(seed), game, 80):
+            play_both(pair, batches, action, cell)
+        for action, cell in finishing_moves(game):
+            play_both(pair, batches, action, cell)
+        won += game.check_win()
+    # Games that did not hit a mine on the way were finished, so the win paths were compared too.
+    assert won
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_running_totals_match_a_recount(backend):
+    for seed in range(100):
+        game = backend(num_mines=7, rows=6, cols=7, seed=seed)
+        for action, cell in random_moves(random.Random(seed), game, 80):
+            apply(game, action, cell)
+            assert (game.hidden_count, game.safe_remaining, game.flagged_mines, game.wrong_flags) == counters(game)
+            assert game.check_win() == (not game.safe_remaining and counters(game)[3] == 0
+                                        and counters(game)[2] == len(game.mine_positions))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_events_arrive_as_one_batch_per_action(backend):
+    for seed in range(100):
+        game = backend(num_mines=7, rows=6, cols=7, seed=seed)
+        batches = []
+        game.subscribe(batches.append)
+        revealed, flags = set(), set()
+        for action, cell in random_moves(random.Random(seed), game, 80):
+            if game.game_over:
+                break
+            before, seen = len(batches), (set(game.revealed_tiles), set(game.flags), game.game_over)
+            apply(game, action, cell)
+            # A chord reveals several neighbours, each with its own flood fill, and still reports once.
+            changed = seen != (set(game.revealed_tiles), set(game.flags), game.game_over)
+            assert len(batches) - before == changed
+            if len(batches) == before:
+                continue
+            for event in batches[-1]:
+                if event.kind == "reveal":
+                    revealed.add(event.cell)
+                    assert event.value == game.grid[event.cell[0]][event.cell[1]]
+                elif event.kind == "flag":
+                    flags.add(event.cell)
+                elif event.kind == "unflag":
+                    flags.discard(event.cell)
+            assert (revealed, flags) == (set(game.revealed_tiles), set(game.flags))
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from brute import certain, positions
+from Probability import linear
+from Probability.linear import linear_deductions, reduce_rows
+from Probability.probability import constraints_from_game
+from UserPlay.backend import Minesweeper
+
+
+def unknown_cells(game):
+    return [(row, col) for row in range(game.rows) for col in range(game.cols)
+            if (row, col) not in game.revealed_tiles]
+
+
+def test_deductions_are_sound_against_brute_force():
+    found = 0
+    for game in positions(Minesweeper, 60):
+        constraints, _, _ = constraints_from_game(game)
+        safe, mines = certain(game)
+        for mine_count in (None, (unknown_cells(game), game.num_mines)):
+            linear_safe, linear_mines = linear_deductions(constraints, mine_count)
+            assert set(linear_safe) <= safe
+            assert set(linear_mines) <= mines
+            found += len(linear_safe) + len(linear_mines)
+    assert found
+
+
+def test_mine_count_row_finds_the_last_cells():
+    # Two cells left, one mine, and no number touches them.
+    assert linear_deductions([], ([(0, 0)], 0)) == ([(0, 0)], [])
+    assert sorted(linear_deductions([(((0, 0), (0, 1)), 1)], ([(0, 0), (0, 1), (0, 2)], 1))[0]) == [(0, 2)]
+
+
+def test_one_two_one_against_a_wall():
+    # Numbers 1 2 1 on the bottom row see the three cells above them.
+    constraints = [(((0, 0), (0, 1)), 1), (((0, 0), (0, 1), (0, 2)), 2), (((0, 1), (0, 2)), 1)]
+    safe, mines = linear_deductions(constraints)
+    assert sorted(safe) == [(0, 1)]
+    assert sorted(mines) == [(0, 0), (0, 2)]
+
+
+def test_large_entries_switch_to_python_ints(monkeypatch):
+    system = np.array([[1, 1, 0, 1], [0, 1, 1, 1], [1, 1, 1, 2]], dtype=np.int64)
+    expected = reduce_rows(system)
+    monkeypatch.setattr(linear, "INT64_LIMIT", 0)
+    reduced = reduce_rows(system)
+    assert reduced.dtype == object
+    assert reduced.tolist() == expected.tolist()
+    for game in positions(Minesweeper, 20):
+        constraints, _, _ = constraints_from_game(game)
+        safe, mines = certain(game)
+        linear_safe, linear_mines = linear_deductions(constraints, (unknown_cells(game), game.num_mines))
+        assert set(linear_safe) <= safe and set(linear_mines) <= mines
@@ -0,0 +1,59 @@
+from brute import certain, positions
+from CSPAgent.CSP_BACKEND import FrontierIndex
+from CSPAgent.patterns import (MAGIC, MAX_MINES, MAX_ONLY, MAX_SHARED, ONLY_A_STEP, ONLY_B_STEP, PATTERN_FILE,
+                               REM_A_STEP, SHARED_STEP, build_table, load_table, pattern_index)
+from CSPAgent.user import Minesweeper
+from UserPlay.boardgen import board_from_positions
+
+
+def test_shipped_table_matches_a_fresh_build():
+    assert PATTERN_FILE.read_bytes() == MAGIC + build_table()
+    assert load_table() == build_table()
+
+
+def test_missing_table_is_built_in_memory(tmp_path):
+    assert load_table(tmp_path / "missing.bin") == build_table()
+
+
+def test_split_index_matches_pattern_index():
+    # FrontierIndex.deduce adds the index up from a's part and b's part.
+    for only_a in range(MAX_ONLY + 1):
+        for shared in range(MAX_SHARED + 1):
+            for only_b in range(MAX_ONLY + 1):
+                for rem_a in range(MAX_MINES + 1):
+                    for rem_b in range(MAX_MINES + 1):
+                        base = (only_a + shared) * ONLY_A_STEP + rem_a * REM_A_STEP
+                        split = base + (only_b + shared) * ONLY_B_STEP + rem_b \
+                            + shared * (SHARED_STEP - ONLY_A_STEP - ONLY_B_STEP)
+                        assert split == pattern_index(only_a, shared, only_b, rem_a, rem_b)
+
+
+def test_one_two_one_against_a_wall():
+    game = Minesweeper(num_mines=2, board=board_from_positions(2, 3, {(0, 0), (0, 2)}))
+    for col in range(3):
+        game.reveal_tile(1, col)
+    frontier = FrontierIndex(game)
+    frontier.sync()
+    safe, mines = frontier.deduce()
+    assert safe == []
+    assert sorted(mines) == [(0, 0), (0, 2)]
+    # With the mines flagged, the 2 is satisfied and the middle cell opens.
+    for cell in mines:
+        game.flag_tile(*cell)
+    frontier.sync()
+    safe, mines = frontier.deduce()
+    assert safe == [(0, 1)]
+
+
+def test_deductions_are_sound_against_brute_force():
+    found = 0
+    for game in positions(Minesweeper, 80):
+        frontier = FrontierIndex(game)
+        frontier.sync()
+        frontier.dirty = set(frontier.unknown)
+        safe, mines = frontier.deduce()
+        certain_safe, certain_mines = certain(game)
+        assert set(safe) <= certain_safe
+        assert set(mines) <= certain_mines
+        found += len(safe) + len(mines)
+    assert found
@@ -0,0 +1,26 @@
+from fractions import Fraction
+
+from brute import layouts, positions
+from Probability.probability import TallyCache, game_probabilities
+from UserPlay.backend import Minesweeper
+
+
+def brute_probabilities(game):
+    found = layouts(game)
+    return {(row, col): Fraction(sum((row, col) in mines for mines in found), len(found))
+            for row in range(game.rows) for col in range(game.cols) if (row, col) not in game.revealed_tiles}
+
+
+def test_probabilities_match_brute_force():
+    for game in positions(Minesweeper, 60):
+        frontier, interior = game_probabilities(game)
+        expected = brute_probabilities(game)
+        for cell, p in expected.items():
+            assert frontier.get(cell, interior) == p, cell
+
+
+def test_cached_tallies_give_the_same_probabilities():
+    cache = TallyCache(maxsize=8)
+    for game in positions(Minesweeper, 60):
+        assert game_probabilities(game, cache=cache) == game_probabilities(game)
+    assert cache.hits and len(cache.entries) <= 8
@@ -0,0 +1,56 @@
+import pytest
+
+from UserPlay.records import MAGIC, GameRecord, RecordReader, RecordWriter, iter_records
+
+
+def fields(record):
+    return (record.rows, record.cols, record.num_mines, record.outcome, record.moves, record.seed, record.mines,
+            record.elapsed_ms, record.agent)
+
+
+RECORDS = [
+    GameRecord(16, 30, 99, "win", [("reveal", (8, 15)), ("flag", (0, 0)), ("unflag", (0, 0)),
+                                   ("chord", (15, 29)), ("reveal", (3, 2))], seed=12345, elapsed_ms=870, agent="csp"),
+    GameRecord(9, 9, 10, "lose", [("reveal", (4, 4))], seed=-7, agent="dfs-frontier"),
+    GameRecord(3, 5, 2, "timeout", mines=(1 << 0) | (1 << 14), elapsed_ms=10000, agent="probabilité"),
+    GameRecord(1, 1, 0, "unfinished", seed=0),
+]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_encode_decode_round_trip(record):
+    data = record.encode()
+    decoded, end = GameRecord.decode(data)
+    assert end == len(data)
+    assert fields(decoded) == fields(record)
+
+
+def test_mine_layout_survives_the_round_trip():
+    decoded, _ = GameRecord.decode(RECORDS[2].encode())
+    assert decoded.mine_positions() == {(0, 0), (2, 4)}
+
+
+def test_file_round_trip(tmp_path):
+    path = tmp_path / "games.msr"
+    with RecordWriter(path) as writer:
+        for record in RECORDS[:2]:
+            writer.write(record)
+    # A second writer appends without writing the header again.
+    with RecordWriter(path) as writer:
+        for record in RECORDS[2:]:
+            writer.write_encoded(record.encode())
+
+    with RecordReader(path) as reader:
+        assert [fields(record) for record in reader] == [fields(record) for record in RECORDS]
+        assert [record.moves for record in reader.headers()] == [[]] * len(RECORDS)
+    assert [fields(record) for record in iter_records(path, chunk_size=7)] == [fields(record) for record in RECORDS]
+
+
+def test_truncated_file_and_wrong_header(tmp_path):
+    path = tmp_path / "games.msr"
+    path.write_bytes(MAGIC + RECORDS[0].encode()[:-1])
+    with pytest.raises(ValueError):
+        list(iter_records(path))
+    path.write_bytes(b"not a record file")
+    with pytest.raises(ValueError):
+        RecordReader(path)
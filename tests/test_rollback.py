@@ -0,0 +1,68 @@
+import random
+
+from CSPAgent.CSP_BACKEND import FrontierIndex
+from CSPAgent.user import Minesweeper
+
+
+def play(game, rng, moves):
+    """Random reveals and flag toggles, mines included."""
+    cells = [(row, col) for row in range(game.rows) for col in range(game.cols)]
+    for _ in range(moves):
+        if game.game_over:
+            break
+        cell = rng.choice(cells)
+        if rng.random() < 0.3:
+            game.flag_tile(*cell)
+        else:
+            game.reveal_tile(*cell)
+
+
+def fresh(game):
+    index = FrontierIndex(game)
+    index.sync()
+    return index
+
+
+def test_rewind_matches_a_fresh_index():
+    for seed in range(100):
+        rng = random.Random(seed)
+        game = Minesweeper(num_mines=8, rows=6, cols=7, seed=seed)
+        index = FrontierIndex(game)
+        play(game, rng, 4)
+        index.sync()
+        mark = game.checkpoint()
+        revealed, flags = set(game.revealed_tiles), set(game.flags)
+        play(game, rng, 6)
+        index.sync()
+        index.rewind(game.rollback(mark))
+        assert game.revealed_tiles == revealed and game.flags == flags
+        expected = fresh(game)
+        assert index.unknown == expected.unknown
+        assert index.remaining == expected.remaining
+
+
+def test_sync_after_an_unreported_rollback_rebuilds():
+    game = Minesweeper(num_mines=8, rows=6, cols=7, seed=3)
+    index = FrontierIndex(game)
+    mark = game.checkpoint()
+    play(game, random.Random(3), 8)
+    index.sync()
+    game.rollback(mark)
+    game.reveal_tile(0, 0)
+    index.sync()
+    expected = fresh(game)
+    assert index.unknown == expected.unknown
+    assert index.remaining == expected.remaining
+
+
+def test_rollback_reports_hidden_cells_in_one_batch():
+    game = Minesweeper(num_mines=8, rows=6, cols=7, seed=5)
+    mark = game.checkpoint()
+    play(game, random.Random(5), 6)
+    revealed = set(game.revealed_tiles)
+    batches = []
+    game.subscribe(batches.append)
+    game.rollback(mark)
+    assert len(batches) == 1
+    assert {event.cell for event in batches[0] if event.kind == "hide"} == revealed
+    assert not game.revealed_tiles and not game.game_over